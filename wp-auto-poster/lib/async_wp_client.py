@@ -0,0 +1,1650 @@
+"""
+WordPress REST API 非同期クライアント
+
+httpx.AsyncClient を使い、1つのイベントループ上で独立したAPI呼び出し
+（カテゴリ・タグ解決など）を並行実行する。
+lib/wp_client.py の WordPressClient はこのクラスの同期ラッパーである。
+"""
+
+import asyncio
+import json
+import mimetypes
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+
+# ──────────────────────────────────────────────
+# config読み込み（直接実行 / パッケージインポート両対応）
+# ──────────────────────────────────────────────
+try:
+    from lib.config import WP_URL, WP_USER, WP_APP_PASSWORD, WP_UPLOAD_WORKERS
+    from lib.content_transform import image_dimensions, transform_content
+    from lib.draft_build import bundle_for_push
+    from lib.http_cache import HTTPCache, cache_route, is_cacheable
+    from lib.media_index import MediaIndex, file_sha256
+    from lib.pipeline import Pipeline, PipelineContext, Stage, print_timings
+    from lib.publish_journal import PublishJournal, content_hash, source_hashes
+    from lib.taxonomy_cache import TaxonomyCache, term_key
+    from lib.wp_batch import BATCH_METHODS, BatchCollector, BatchUnsupported, batching_enabled
+    from lib.wp_metrics import RequestMetrics
+    from lib.wp_retry import (
+        DEFAULT_RETRY_POLICIES, RetryPolicy, classify_request, parse_retry_after,
+    )
+except ImportError:
+    from config import WP_URL, WP_USER, WP_APP_PASSWORD, WP_UPLOAD_WORKERS
+    from content_transform import image_dimensions, transform_content
+    from draft_build import bundle_for_push
+    from http_cache import HTTPCache, cache_route, is_cacheable
+    from media_index import MediaIndex, file_sha256
+    from pipeline import Pipeline, PipelineContext, Stage, print_timings
+    from publish_journal import PublishJournal, content_hash, source_hashes
+    from taxonomy_cache import TaxonomyCache, term_key
+    from wp_batch import BATCH_METHODS, BatchCollector, BatchUnsupported, batching_enabled
+    from wp_metrics import RequestMetrics
+    from wp_retry import (
+        DEFAULT_RETRY_POLICIES, RetryPolicy, classify_request, parse_retry_after,
+    )
+
+# アップロード時にファイルから一度に読み込むバイト数
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# アップロード進捗コールバック: (ファイル名, 送信済みバイト数, 合計バイト数)
+ProgressCallback = Callable[[str, int, int], None]
+
+# 各レスポンスから実際に使うフィールド。_fields で要求し、本文の rendered や
+# _links、全サイズの media_details などを転送・解析しないようにする
+POST_FIELDS = ("id", "link")
+MEDIA_FIELDS = ("id", "source_url", "alt_text")
+TERM_FIELDS = ("id", "name")
+USER_FIELDS = ("id", "name", "slug", "roles")
+
+
+class WordPressClientError(Exception):
+    """WordPress API操作で発生するエラーの基底クラス"""
+    pass
+
+
+class WordPressAuthError(WordPressClientError):
+    """認証エラー"""
+    pass
+
+
+class WordPressAPIError(WordPressClientError):
+    """APIリクエストエラー"""
+
+    def __init__(self, message: str, status_code: int = None,
+                 error_code: str = None, error_data: dict = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # WordPressが返すエラーコード（例: "term_exists"）と付加情報
+        self.error_code = error_code
+        self.error_data = error_data or {}
+
+
+class AsyncWordPressClient:
+    """
+    WordPress REST API 非同期クライアント
+
+    WordPressClient と同じメソッド群をコルーチンとして提供する。
+    接続は httpx.AsyncClient のコネクションプールで使い回される。
+
+    使用例:
+        async with AsyncWordPressClient() as client:
+            result = await client.publish_draft_from_dir("drafts/slug/")
+    """
+
+    def __init__(self, url: str = None, user: str = None, password: str = None,
+                 upload_workers: int = None,
+                 retry_policies: dict[str, RetryPolicy] = None,
+                 use_media_index: bool = True,
+                 use_taxonomy_cache: bool = True,
+                 use_http_cache: bool = True,
+                 use_journal: bool = True):
+        """
+        クライアントを初期化する。
+
+        Args:
+            url: WordPressサイトのURL（省略時は config.WP_URL）
+            user: ユーザー名（省略時は config.WP_USER）
+            password: アプリケーションパスワード（省略時は config.WP_APP_PASSWORD）
+            upload_workers: メディアの同時アップロード数（省略時は config.WP_UPLOAD_WORKERS）
+            retry_policies: リクエスト種別（"read" / "update" / "create"）ごとの
+                            リトライ方針。指定した種別だけデフォルトを上書きする
+            use_media_index: False にするとメディア索引を使わず常にアップロードする
+            use_taxonomy_cache: False にするとカテゴリ・タグを毎回検索APIで解決する
+            use_http_cache: False にすると GET レスポンスのキャッシュ（条件付きリクエスト）を使わない
+            use_journal: False にすると下書きディレクトリの投稿ジャーナルを使わず、
+                         毎回最初から処理する
+        """
+        self.site_url = (url or WP_URL).rstrip("/")
+        self.user = user or WP_USER
+        self.password = password or WP_APP_PASSWORD
+        self.rest_base = f"{self.site_url}/wp-json/wp/v2"
+        self.auth = (self.user, self.password)
+        self.retry_policies = {**DEFAULT_RETRY_POLICIES, **(retry_policies or {})}
+
+        # サーバー側のサムネイル生成を待つ間に他のファイルを送れるよう、
+        # アップロードは upload_workers 件まで並行させる
+        self.upload_workers = max(1, upload_workers or WP_UPLOAD_WORKERS)
+        self._upload_slots = asyncio.Semaphore(self.upload_workers)
+        # multipart での一括アップロード可否（None: 未確認 / True: 可 / False: 不可）
+        self._multipart_upload = None
+
+        # 同じ内容のファイルを再アップロードしないためのメディア索引
+        self.media_index = MediaIndex() if use_media_index else None
+        self._digest_locks: dict[str, asyncio.Lock] = {}
+
+        # カテゴリ・タグ名 → ID のキャッシュ（全件を先読みしてディスクに保存）
+        self.taxonomy_cache = TaxonomyCache(self.site_url) if use_taxonomy_cache else None
+        self._taxonomy_locks: dict[str, asyncio.Lock] = {}
+
+        # ETag / Last-Modified による GET レスポンスのキャッシュ
+        self.http_cache = HTTPCache() if use_http_cache else None
+
+        # 下書きの投稿を途中から再開するためのジャーナル（lib/publish_journal.py）
+        self.use_journal = use_journal
+
+        # 送ったリクエストの件数・レイテンシ・バイト数・リトライ回数の記録
+        self.metrics = RequestMetrics()
+
+        # batch() コンテキスト内の書き込みを batch/v1 にまとめるコレクター
+        self._batcher = BatchCollector(self._send_batch, f"{self.site_url}/wp-json")
+
+        # コネクションプールを使い回して並行リクエストを効率化
+        self.http = httpx.AsyncClient(
+            auth=self.auth,
+            headers={"User-Agent": "wp-auto-poster/1.0"},
+            timeout=30,
+        )
+
+    async def __aenter__(self) -> "AsyncWordPressClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """コネクションプールとローカルの索引・キャッシュを閉じる。"""
+        await self.http.aclose()
+        if self.media_index is not None:
+            self.media_index.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+
+    # ──────────────────────────────────────────
+    # 内部ヘルパー
+    # ──────────────────────────────────────────
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """
+        REST APIへのリクエストを送り、レスポンスを検証して返す。
+
+        一時的な障害（接続失敗・429・5xx 等）は retry_policies に従って再試行する。
+        新規作成の POST は、サーバーが処理していないことが確実な場合にしか
+        再送しないため、リトライによる重複作成は起きない（lib/wp_retry.py 参照）。
+
+        GET は http_cache で条件付きリクエストになり、変更がなければ保存済みの
+        レスポンスが返る（context=edit の GET はキャッシュを使わない）。
+        書き込みを行うと同じコレクションのキャッシュは破棄される。
+        batch() コンテキスト内の JSON 書き込みは batch/v1 にまとめて送られる。
+
+        Args:
+            method: HTTPメソッド（GET, POST, PUT, DELETE）
+            endpoint: エンドポイントパス（例: /posts）
+            **kwargs: httpx に渡す追加引数
+
+        Returns:
+            httpx.Response オブジェクト
+
+        Raises:
+            WordPressAuthError: 401/403 エラー時
+            WordPressAPIError: その他のHTTPエラー時
+        """
+        url = f"{self.rest_base}{endpoint}"
+
+        if self.http_cache is not None:
+            if (method.upper() == "GET" and set(kwargs) <= {"params"}
+                    and is_cacheable(kwargs.get("params"))):
+                resp = await self._cached_get(
+                    url, endpoint, kwargs.get("params"), self.user,
+                    lambda headers: self._send("GET", url, endpoint, headers=headers, **kwargs),
+                )
+                return self._check_response(method, url, resp)
+            if method.upper() != "GET":
+                self.http_cache.invalidate(self.site_url, cache_route(endpoint))
+
+        if self._is_batchable(method, endpoint, kwargs):
+            future = self._batcher.submit(
+                method, f"/wp/v2{endpoint}",
+                body=kwargs.get("json"), params=kwargs.get("params"),
+            )
+            try:
+                return self._check_response(method, url, await future)
+            except BatchUnsupported:
+                pass  # 個別リクエストで送り直す
+
+        resp = await self._send(method, url, endpoint, **kwargs)
+        return self._check_response(method, url, resp)
+
+    async def _send(self, method: str, url: str, endpoint: str, **kwargs) -> httpx.Response:
+        """
+        HTTPリクエストを送信する。一時的な障害はリトライポリシーに従って再試行する。
+
+        リトライを含めた1回の呼び出しを metrics に1件として記録する。
+
+        Args:
+            method: HTTPメソッド
+            url: 送信先URL
+            endpoint: リトライ種別の判定に使うエンドポイントパス
+            **kwargs: httpx に渡す追加引数
+
+        Returns:
+            httpx.Response オブジェクト（ステータスは未検証）
+
+        Raises:
+            WordPressClientError: 接続エラー・タイムアウトが解消しなかった場合
+        """
+        policy = self.retry_policies[classify_request(method, endpoint)]
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                resp = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                delay = None
+                if policy.can_retry_error(e):
+                    delay = policy.next_delay(attempt, time.monotonic() - started)
+                if delay is None:
+                    self.metrics.record(
+                        method, endpoint, 0, time.monotonic() - started,
+                        retries=attempt - 1,
+                    )
+                    if isinstance(e, httpx.TimeoutException):
+                        raise WordPressClientError(
+                            f"タイムアウト: {url} からの応答がありません。"
+                        )
+                    raise WordPressClientError(
+                        f"接続エラー: {self.site_url} に接続できません。\n詳細: {e}"
+                    )
+                print(f"  [リトライ] {method} {endpoint}: {type(e).__name__} "
+                      f"- {delay:.1f}秒後に再試行 ({attempt}/{policy.max_attempts})")
+                await asyncio.sleep(delay)
+                continue
+
+            if policy.can_retry_status(resp.status_code):
+                delay = policy.next_delay(
+                    attempt, time.monotonic() - started,
+                    retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+                )
+                if delay is not None:
+                    print(f"  [リトライ] {method} {endpoint}: HTTP {resp.status_code} "
+                          f"- {delay:.1f}秒後に再試行 ({attempt}/{policy.max_attempts})")
+                    await asyncio.sleep(delay)
+                    continue
+
+            self.metrics.record(
+                method, endpoint, resp.status_code, time.monotonic() - started,
+                sent=int(resp.request.headers.get("Content-Length") or 0),
+                received=resp.num_bytes_downloaded,
+                retries=attempt - 1,
+            )
+            return resp
+
+    async def _cached_get(self, url: str, endpoint: str, params: Optional[dict],
+                          user: str, fetch) -> httpx.Response:
+        """
+        http_cache を使って GET する。
+
+        max-age の期限内ならサーバーに問い合わせずに保存済みのレスポンスを返す。
+        それ以外は検証子を付けて fetch(headers) を呼び、304 なら保存済みのレスポンスを、
+        200 なら保存したうえでそのレスポンスを返す。
+
+        Args:
+            url: リクエストURL（クエリを除く）
+            endpoint: キャッシュの無効化単位を決めるエンドポイントパス
+            params: クエリパラメータ
+            user: キャッシュキーに含める認証ユーザー（認証なしなら空文字）
+            fetch: 追加ヘッダーを受け取りレスポンスを返すコルーチン関数
+        """
+        cache = self.http_cache
+        key = cache.key(user, url, params)
+        full_url = str(httpx.URL(url, params=params))
+        entry = cache.lookup(key)
+        if entry is not None and cache.is_fresh(entry):
+            cache.touch(key)
+            self.metrics.record_cache_hit(endpoint)
+            return cache.to_response(entry, full_url)
+
+        resp = await fetch(cache.conditional_headers(entry))
+        if resp.status_code == 304 and entry is not None:
+            cache.revalidated(key, resp)
+            return cache.to_response(entry, full_url)
+        cache.store(key, self.site_url, cache_route(endpoint), resp)
+        return resp
+
+    def _check_response(self, method: str, url: str, resp: httpx.Response) -> httpx.Response:
+        """
+        レスポンスのステータスを検証する。
+
+        Raises:
+            WordPressAuthError: 401/403 エラー時
+            WordPressAPIError: その他のHTTPエラー時
+        """
+        if resp.status_code in (401, 403):
+            raise WordPressAuthError(
+                f"認証エラー ({resp.status_code}): "
+                f"ユーザー名またはアプリケーションパスワードを確認してください。\n"
+                f"レスポンス: {resp.text[:300]}"
+            )
+
+        if not resp.is_success:
+            # APIが返すエラーメッセージを抽出
+            try:
+                err_data = resp.json()
+                msg = err_data.get("message", resp.text[:300])
+            except (ValueError, KeyError, AttributeError):
+                err_data = {}
+                msg = resp.text[:300]
+            if not isinstance(err_data, dict):
+                err_data = {}
+            raise WordPressAPIError(
+                f"APIエラー ({resp.status_code}): {msg}\n"
+                f"エンドポイント: {method} {url}",
+                status_code=resp.status_code,
+                error_code=err_data.get("code"),
+                error_data=err_data.get("data") if isinstance(err_data.get("data"), dict) else None,
+            )
+
+        return resp
+
+    # ──────────────────────────────────────────
+    # バッチAPI（/wp-json/batch/v1）
+    # ──────────────────────────────────────────
+
+    @asynccontextmanager
+    async def batch(self):
+        """
+        コンテキスト内で発行された JSON の書き込みを batch/v1 にまとめて送る。
+
+        対象はタームの作成、メディアのメタ更新、記事フィールドの更新など、
+        JSON ボディだけを持つ POST / PUT / PATCH / DELETE。ファイル送信は対象外。
+        並行して発行されたリクエストは最大25件ずつ1回の通信にまとめられ、
+        各呼び出し元には通常どおり自分のレスポンスが返る。
+        サーバーがバッチAPIに対応していなければ自動的に個別リクエストに戻る。
+
+        使用例:
+            async with client.batch():
+                ids = await asyncio.gather(*(client.get_or_create_tag(n) for n in names))
+        """
+        token = batching_enabled.set(True)
+        try:
+            yield self
+        finally:
+            batching_enabled.reset(token)
+            await self._batcher.flush()
+
+    async def batch_requests(self, requests: list[dict]) -> list:
+        """
+        複数の書き込みリクエストを batch/v1 でまとめて実行する。
+
+        Args:
+            requests: [{"method": "POST", "endpoint": "/posts/12", "json": {...}}, ...]
+
+        Returns:
+            list: 各リクエストのレスポンスJSON。失敗したリクエストの位置には
+                  WordPressClientError のインスタンスが入る（入力順）
+        """
+        async with self.batch():
+            responses = await asyncio.gather(
+                *(
+                    self._request(
+                        req.get("method", "POST"), req["endpoint"],
+                        **({"json": req["json"]} if "json" in req else {}),
+                    )
+                    for req in requests
+                ),
+                return_exceptions=True,
+            )
+        return [
+            resp if isinstance(resp, BaseException) else resp.json()
+            for resp in responses
+        ]
+
+    def _is_batchable(self, method: str, endpoint: str, kwargs: dict) -> bool:
+        """このリクエストをバッチに入れられるかどうか。"""
+        return (
+            batching_enabled.get()
+            and method.upper() in BATCH_METHODS
+            and set(kwargs) <= {"json", "params"}
+            and self._batcher.accepts(f"/wp/v2{endpoint}")
+        )
+
+    async def _send_batch(self, sub_requests: list[dict]) -> Optional[list[dict]]:
+        """
+        サブリクエストを batch/v1 に送り、サブレスポンスのリストを返す。
+
+        Returns:
+            list[dict]: [{"status": ..., "headers": {...}, "body": ...}, ...]。
+                        サーバーがバッチAPIに対応していなければ None
+        """
+        url = f"{self.site_url}/wp-json/batch/v1"
+        print(f"  バッチ送信: {len(sub_requests)}件")
+        resp = await self._send("POST", url, "/batch/v1", json={"requests": sub_requests})
+        if resp.status_code in (404, 405, 501):
+            print("  [情報] batch/v1 に対応していないため個別リクエストで送信します")
+            return None
+        self._check_response("POST", url, resp)
+        return resp.json().get("responses", [])
+
+    async def _get(self, endpoint: str, params: dict = None) -> httpx.Response:
+        """GETリクエストのショートカット"""
+        return await self._request("GET", endpoint, params=params)
+
+    async def _post(self, endpoint: str, **kwargs) -> httpx.Response:
+        """POSTリクエストのショートカット"""
+        return await self._request("POST", endpoint, **kwargs)
+
+    @staticmethod
+    def _fields_param(defaults: tuple, extra: tuple = None) -> dict:
+        """
+        _fields クエリパラメータを作る。
+
+        Args:
+            defaults: 呼び出し側のコードが必ず読むフィールド
+            extra: 追加で要求するフィールド。空のタプルなら _fields を付けず全フィールド
+        """
+        if extra is not None and not extra:
+            return {}
+        return {"_fields": ",".join(dict.fromkeys((*defaults, *(extra or ()))))}
+
+    # ──────────────────────────────────────────
+    # 接続・認証テスト
+    # ──────────────────────────────────────────
+
+    async def check_connection(self) -> bool:
+        """
+        REST APIへの接続を確認する。
+
+        Returns:
+            True: 接続成功
+            False: 接続失敗
+
+        Note:
+            認証なしで /wp-json/ にアクセスし、APIの存在を確認する。
+        """
+        url = f"{self.site_url}/wp-json/"
+
+        async def fetch(headers: dict = None) -> httpx.Response:
+            # 接続確認はリトライせず、すぐに結果を返す
+            started = time.monotonic()
+            resp = await self.http.get(url, auth=None, timeout=10, headers=headers)
+            self.metrics.record(
+                "GET", "/", resp.status_code, time.monotonic() - started,
+                received=resp.num_bytes_downloaded,
+            )
+            return resp
+
+        try:
+            if self.http_cache is not None:
+                resp = await self._cached_get(url, "/", None, "", fetch)
+            else:
+                resp = await fetch()
+            if resp.is_success:
+                data = resp.json()
+                site_name = data.get("name", "(不明)")
+                print(f"[OK] REST API接続成功: {site_name} ({self.site_url})")
+                return True
+            else:
+                print(f"[NG] REST API応答エラー: HTTP {resp.status_code}")
+                return False
+        except httpx.ConnectError:
+            print(f"[NG] 接続失敗: {self.site_url} に到達できません")
+            return False
+        except Exception as e:
+            print(f"[NG] 予期しないエラー: {e}")
+            return False
+
+    async def check_authentication(self) -> dict:
+        """
+        認証テストを行い、ログインユーザーの情報を返す。
+
+        Returns:
+            dict: {"id": user_id, "name": display_name, "roles": [...]}
+
+        Raises:
+            WordPressAuthError: 認証失敗時
+        """
+        resp = await self._get(
+            "/users/me", params={"context": "edit", **self._fields_param(USER_FIELDS)},
+        )
+        user_data = resp.json()
+
+        result = {
+            "id": user_data.get("id"),
+            "name": user_data.get("name", ""),
+            "slug": user_data.get("slug", ""),
+            "roles": user_data.get("roles", []),
+        }
+        print(f"[OK] 認証成功: {result['name']} (ID: {result['id']}, "
+              f"権限: {', '.join(result['roles'])})")
+        return result
+
+    # ──────────────────────────────────────────
+    # メディアアップロード
+    # ──────────────────────────────────────────
+
+    async def upload_media(self, file_path: str, alt_text: str = "",
+                           title: str = "", caption: str = "",
+                           progress: Optional[ProgressCallback] = None,
+                           fields: tuple = None) -> dict:
+        """
+        画像をメディアライブラリにアップロードする。
+
+        alt_text / title / caption がある場合は、ファイルと一緒に
+        multipart/form-data で送り、1回のリクエストで作成とメタ設定を済ませる。
+        サーバー（WAF等）が multipart を拒否した場合のみ、従来の
+        「バイナリ送信 → POST /media/{id} でメタ更新」の2段階方式に切り替える。
+
+        ファイルは UPLOAD_CHUNK_SIZE ずつ読みながら送信するため、
+        ファイルサイズや同時アップロード数に関わらずメモリ使用量は一定に保たれる。
+
+        メディア索引が有効な場合は、ファイルの SHA-256 が同じメディアが
+        このサイトに既にあればアップロードせずにそれを返す。
+
+        Args:
+            file_path: アップロードするファイルのパス
+            alt_text: 代替テキスト（SEO用）
+            title: メディアのタイトル
+            caption: キャプション
+            progress: チャンク送信ごとに呼ばれるコールバック
+                      progress(ファイル名, 送信済みバイト数, 合計バイト数)
+            fields: MEDIA_FIELDS に加えて受け取るフィールド（例: ("media_details",)）。
+                    指定すると結果の "media" にレスポンスのメディアが入る。
+                    空のタプルなら全フィールド。省略時は MEDIA_FIELDS だけを要求する
+
+        Returns:
+            dict: {"id": media_id, "url": source_url, "alt": alt_text}
+                  （fields 指定時は "media" を含む）
+
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+            WordPressAPIError: アップロード失敗時
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
+
+        # MIMEタイプを推定
+        mime_type, _ = mimetypes.guess_type(str(path))
+        if mime_type is None:
+            mime_type = "application/octet-stream"
+
+        # alt_text, title, caption（指定がある場合）
+        meta_fields = {}
+        if alt_text:
+            meta_fields["alt_text"] = alt_text
+        if title:
+            meta_fields["title"] = title
+        if caption:
+            meta_fields["caption"] = caption
+
+        if self.media_index is None:
+            return await self._upload_new_media(
+                path, mime_type, meta_fields, alt_text, progress, fields,
+            )
+
+        digest = await asyncio.to_thread(file_sha256, path)
+        # 同じ内容のファイルが同時に渡されても、アップロードは1回にする
+        async with self._digest_locks.setdefault(digest, asyncio.Lock()):
+            reused = await self._find_indexed_media(digest, fields)
+            if reused is not None:
+                print(f"  [OK] 既存メディアを再利用: {path.name} (ID={reused['id']})")
+                result = {
+                    "id": reused["id"],
+                    "url": reused["url"],
+                    "alt": alt_text,
+                }
+                if fields is not None:
+                    result["media"] = reused["media"]
+                return result
+            result = await self._upload_new_media(
+                path, mime_type, meta_fields, alt_text, progress, fields,
+            )
+            self.media_index.record(
+                self.site_url, digest, result["id"], result["url"],
+                filename=path.name, size=path.stat().st_size,
+            )
+            return result
+
+    async def _find_indexed_media(self, digest: str, fields: tuple = None) -> Optional[dict]:
+        """
+        メディア索引からハッシュに一致するメディアを探す。
+
+        しばらく検証していないエントリや fields の指定があるときは GET /media/{id} を送り、
+        サーバー側で削除されていれば索引から取り除いて None を返す。
+
+        Args:
+            digest: ファイルの SHA-256
+            fields: upload_media の fields と同じ（指定時は結果に "media" を含める）
+
+        Returns:
+            dict: {"id": media_id, "url": source_url}（fields 指定時は "media" も）。
+                  見つからなければ None
+        """
+        entry = self.media_index.lookup(self.site_url, digest)
+        if entry is None:
+            return None
+        if fields is None and not self.media_index.needs_verify(entry):
+            return {"id": entry["media_id"], "url": entry["source_url"]}
+
+        try:
+            resp = await self._get(
+                f"/media/{entry['media_id']}",
+                params=(
+                    self._fields_param(MEDIA_FIELDS, fields) if fields is not None
+                    else self._fields_param(("id", "source_url"))
+                ),
+            )
+        except WordPressAPIError as e:
+            if e.status_code in (404, 410):
+                self.media_index.forget(self.site_url, digest)
+                return None
+            raise
+        media = resp.json()
+        entry["source_url"] = media.get("source_url", entry["source_url"])
+        self.media_index.mark_verified(self.site_url, digest, entry["source_url"])
+        found = {"id": entry["media_id"], "url": entry["source_url"]}
+        if fields is not None:
+            found["media"] = media
+        return found
+
+    async def _upload_new_media(self, path: Path, mime_type: str, meta_fields: dict,
+                                alt_text: str,
+                                progress: Optional[ProgressCallback],
+                                fields: tuple = None) -> dict:
+        """ファイルを新規メディアとしてアップロードする（upload_media の本体）。"""
+        params = self._fields_param(MEDIA_FIELDS, fields)
+        async with self._upload_slots:
+            print(f"  アップロード中: {path.name} ({path.stat().st_size / 1024:.1f} KB)")
+
+            media = None
+            if meta_fields and self._multipart_upload is not False:
+                body = _FileUploadStream.multipart(path, mime_type, meta_fields, progress)
+                try:
+                    resp = await self._post(
+                        "/media",
+                        params=params,
+                        headers=body.headers,
+                        content=body,
+                    )
+                    media = resp.json()
+                    self._multipart_upload = True
+                except WordPressAPIError as e:
+                    if self._multipart_upload is True or not _is_rejection(e):
+                        raise
+                    print(f"  [情報] multipart アップロードが拒否されたため"
+                          f"2段階方式に切り替えます: {e.status_code}")
+                    self._multipart_upload = False
+
+            if media is None:
+                body = _FileUploadStream.raw(path, mime_type, progress)
+                resp = await self._post(
+                    "/media", params=params, headers=body.headers, content=body,
+                )
+                media = resp.json()
+                if meta_fields:
+                    await self._request(
+                        "POST", f"/media/{media['id']}",
+                        params=self._fields_param(("id",)), json=meta_fields,
+                    )
+
+        media_id = media["id"]
+        result = {
+            "id": media_id,
+            "url": media.get("source_url", ""),
+            "alt": alt_text or media.get("alt_text", ""),
+        }
+        if fields is not None:
+            result["media"] = media
+        print(f"  [OK] アップロード完了: ID={media_id}")
+        return result
+
+    async def upload_multiple_media(self, files: list[dict],
+                                    progress: Optional[ProgressCallback] = None) -> list[dict]:
+        """
+        複数の画像を一括アップロードする。
+
+        最大 upload_workers 件を並行してアップロードする。
+        結果は完了順ではなく入力順に並ぶ。
+
+        Args:
+            files: アップロードファイルのリスト
+                   [{"path": "...", "alt": "...", "title": "...", "caption": "..."}]
+            progress: 各ファイルのチャンク送信ごとに呼ばれるコールバック
+
+        Returns:
+            list[dict]: 各ファイルのアップロード結果リスト
+        """
+        total = len(files)
+
+        async def upload_one(i: int, file_info: dict) -> dict:
+            try:
+                return await self.upload_media(
+                    file_path=file_info["path"],
+                    alt_text=file_info.get("alt", ""),
+                    title=file_info.get("title", ""),
+                    caption=file_info.get("caption", ""),
+                    progress=progress,
+                )
+            except Exception as e:
+                print(f"  [NG] [{i}/{total}] 失敗: {file_info['path']} - {e}")
+                return {
+                    "id": None,
+                    "url": None,
+                    "alt": file_info.get("alt", ""),
+                    "error": str(e),
+                }
+
+        print(f"画像アップロード開始（全{total}件、同時{self.upload_workers}件）")
+        results = list(await asyncio.gather(
+            *(upload_one(i, file_info) for i, file_info in enumerate(files, 1))
+        ))
+
+        success_count = sum(1 for r in results if r.get("id") is not None)
+        print(f"画像アップロード完了: {success_count}/{total} 件成功")
+        return results
+
+    async def _upload_draft_images(self, draft_path: Path, images: list[dict],
+                                   journal: PublishJournal = None) -> tuple[dict, list[int], int]:
+        """
+        バンドルの画像マニフェストにある画像を並行アップロードし、画像マップを組み立てる。
+
+        アイキャッチは完了順に左右されないよう、全件完了後にファイル名順で
+        「eyecatch フラグ → ファイル名に eyecatch を含む → 先頭の画像」の順に決める。
+
+        ジャーナルを渡すと、1件アップロードが終わるたびに記録し、
+        記録済みで内容の変わっていない画像はアップロードしない。
+
+        Args:
+            draft_path: 下書きディレクトリのパス
+            images: バンドルの "images"（ファイル名順。lib/draft_build.py 参照）
+            journal: 下書きの投稿ジャーナル（省略可）
+
+        Returns:
+            tuple: (image_map, media_ids, featured_media_id)
+        """
+        image_map = {}  # image_id -> {"url": ..., "media_id": ...}
+        media_ids = []
+        if not images:
+            return image_map, media_ids, None
+
+        print(f"\n画像アップロード（{len(images)}件、同時{self.upload_workers}件）:")
+        image_files = [draft_path / img["file"] for img in images]
+
+        async def upload_one(img_path: Path, img_info: dict) -> dict:
+            if journal is not None:
+                saved = journal.upload(img_path)
+                if saved is not None and "width" not in saved:
+                    # 寸法を記録する前のジャーナル。media_details だけ取得して記録し直す
+                    saved = await self._with_image_sizes(saved)
+                    if saved is not None:
+                        journal.record_upload(img_path, saved)
+                if saved is not None:
+                    print(f"  {img_path.name}: ジャーナルの記録を再利用 (ID={saved['id']})")
+                    return saved
+            # 画像ブロックの width/height に使う寸法もアップロードのレスポンスで受け取る
+            result = await self.upload_media(
+                file_path=str(img_path),
+                alt_text=img_info.get("alt", ""),
+                title=img_info.get("title", ""),
+                caption=img_info.get("caption", ""),
+                fields=("media_details",),
+            )
+            result.update(image_dimensions(result.pop("media", None)))
+            if journal is not None and result.get("id"):
+                journal.record_upload(img_path, result)
+            return result
+
+        # 2段階方式になった場合のメタ更新（POST /media/{id}）は batch/v1 にまとめる
+        async with self.batch():
+            outcomes = await asyncio.gather(
+                *(upload_one(p, img) for p, img in zip(image_files, images)),
+                return_exceptions=True,
+            )
+        # 1件でも失敗したら、他のアップロードが終わるのを待ってから送出する
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+        by_flag = by_name = None
+        for img_path, img_info, result in zip(image_files, images, outcomes):
+            if not result.get("id"):
+                continue
+            image_map[img_info["image_id"]] = {
+                "url": result["url"],
+                "media_id": result["id"],
+                "alt": result.get("alt", img_info["alt"]),
+                "width": result.get("width"),
+                "height": result.get("height"),
+            }
+            media_ids.append(result["id"])
+            if by_flag is None and img_info["eyecatch"]:
+                by_flag = result["id"]
+            if by_name is None and "eyecatch" in img_path.stem.lower():
+                by_name = result["id"]
+
+        featured_media_id = by_flag or by_name or (media_ids[0] if media_ids else None)
+        return image_map, media_ids, featured_media_id
+
+    async def _with_image_sizes(self, saved: dict) -> Optional[dict]:
+        """
+        ジャーナルに記録されたメディアに、寸法（image_dimensions）を加えて返す。
+
+        Returns:
+            dict: 寸法を加えた記録。メディアがサーバーで削除されていれば None
+        """
+        try:
+            resp = await self._get(
+                f"/media/{saved['id']}",
+                params=self._fields_param(("id", "source_url", "media_details")),
+            )
+        except WordPressAPIError as e:
+            if e.status_code in (404, 410):
+                return None
+            raise
+        # 寸法の分からない画像（SVG など）も再取得しないよう、空でも width を入れておく
+        return {**saved, "width": None, "height": None, **image_dimensions(resp.json())}
+
+    # ──────────────────────────────────────────
+    # 記事投稿
+    # ──────────────────────────────────────────
+
+    async def create_draft(self, title: str, content: str,
+                           featured_media_id: int = None,
+                           categories: list[int] = None,
+                           tags: list[int] = None,
+                           meta: dict = None,
+                           slug: str = None,
+                           fields: tuple = None) -> dict:
+        """
+        下書き記事を作成する。
+
+        Args:
+            title: 記事タイトル
+            content: 記事本文（Gutenbergブロック形式HTML）
+            featured_media_id: アイキャッチ画像のメディアID
+            categories: カテゴリIDのリスト
+            tags: タグIDのリスト
+            meta: メタフィールド（Yoast SEO等）
+            slug: URLスラッグ
+            fields: POST_FIELDS に加えて受け取るフィールド。指定すると結果の
+                    "post" にレスポンスの記事が入る（空のタプルなら全フィールド）。
+                    省略時は POST_FIELDS だけを要求する
+
+        Returns:
+            dict: {"id": post_id, "url": edit_url, "preview_url": preview_url}
+                  （fields 指定時は "post" を含む）
+
+        Note:
+            status は常に 'draft' で投稿される。
+            meta に Yoast SEO フィールドを含めることが可能:
+            - _yoast_wpseo_title: SEOタイトル
+            - _yoast_wpseo_metadesc: メタディスクリプション
+            - _yoast_wpseo_focuskw: フォーカスキーワード
+        """
+        post_data = {
+            "title": title,
+            "content": content,
+            "status": "draft",
+        }
+
+        if featured_media_id:
+            post_data["featured_media"] = featured_media_id
+        if categories:
+            post_data["categories"] = categories
+        if tags:
+            post_data["tags"] = tags
+        if slug:
+            post_data["slug"] = slug
+
+        # Yoast SEO メタフィールド
+        if meta:
+            post_data["meta"] = {}
+            yoast_fields = [
+                "_yoast_wpseo_title",
+                "_yoast_wpseo_metadesc",
+                "_yoast_wpseo_focuskw",
+            ]
+            for field in yoast_fields:
+                if field in meta:
+                    post_data["meta"][field] = meta[field]
+            # その他のカスタムメタフィールドもそのまま渡す
+            for key, value in meta.items():
+                if key not in yoast_fields:
+                    post_data["meta"][key] = value
+
+        print(f"下書き投稿中: 「{title}」")
+        resp = await self._post(
+            "/posts",
+            params=self._fields_param(POST_FIELDS, fields),
+            json=post_data,
+        )
+        post = resp.json()
+
+        post_id = post["id"]
+        # WordPress管理画面の編集URL
+        edit_url = f"{self.site_url}/wp-admin/post.php?post={post_id}&action=edit"
+        # プレビューURL
+        preview_url = post.get("link", "")
+        if preview_url:
+            preview_url += "?preview=true" if "?" not in preview_url else "&preview=true"
+
+        result = {
+            "id": post_id,
+            "url": edit_url,
+            "preview_url": preview_url,
+        }
+        if fields is not None:
+            result["post"] = post
+        print(f"[OK] 下書き作成完了: ID={post_id}")
+        print(f"     編集URL: {edit_url}")
+        return result
+
+    async def update_post(self, post_id: int, content: str = None,
+                          title: str = None,
+                          featured_media_id: int = None,
+                          categories: list[int] = None,
+                          tags: list[int] = None,
+                          meta: dict = None,
+                          slug: str = None,
+                          fields: tuple = None,
+                          only_changed: bool = True) -> dict:
+        """
+        既存の記事を更新する（本文・タイトル・メタ等）。
+
+        only_changed が True（デフォルト）の場合は、指定されたフィールドの現在値を
+        GET /posts/{id} で1回だけ取得し、値が変わったフィールドだけを送る。
+        何も変わっていなければ更新リクエスト自体を送らない。
+        本文を毎回送り直したり、変更のない更新でリビジョンが増えたりするのを防ぐ。
+
+        Args:
+            post_id: 更新対象の記事ID
+            content: 新しい記事本文（Gutenbergブロック形式HTML。省略時は変更しない）
+            title: 新しいタイトル（省略時は変更しない）
+            featured_media_id: アイキャッチ画像のメディアID（省略時は変更しない）
+            categories: カテゴリIDのリスト（省略時は変更しない）
+            tags: タグIDのリスト（省略時は変更しない）
+            meta: メタフィールド（Yoast SEO等）
+            slug: URLスラッグ（省略時は変更しない）
+            fields: POST_FIELDS に加えて受け取るフィールド。指定すると結果の
+                    "post" にレスポンスの記事が入る（空のタプルなら全フィールド）。
+                    省略時は POST_FIELDS だけを要求する
+            only_changed: False にすると現在値と比較せず、指定されたフィールドをすべて送る
+
+        Returns:
+            dict: {"id": post_id, "url": edit_url, "preview_url": preview_url,
+                   "changed": [送ったフィールド名, ...]}
+                  （fields 指定時は "post" を含む）
+
+        Note:
+            status は変更しない（現在のステータスを維持する）。
+        """
+        post_data: dict = {}
+
+        if content is not None:
+            post_data["content"] = content
+
+        if title is not None:
+            post_data["title"] = title
+        if featured_media_id is not None:
+            post_data["featured_media"] = featured_media_id
+        if categories is not None:
+            post_data["categories"] = categories
+        if tags is not None:
+            post_data["tags"] = tags
+        if slug is not None:
+            post_data["slug"] = slug
+
+        # Yoast SEO メタフィールド
+        if meta:
+            post_data["meta"] = {}
+            yoast_fields = [
+                "_yoast_wpseo_title",
+                "_yoast_wpseo_metadesc",
+                "_yoast_wpseo_focuskw",
+            ]
+            for field in yoast_fields:
+                if field in meta:
+                    post_data["meta"][field] = meta[field]
+            for key, value in meta.items():
+                if key not in yoast_fields:
+                    post_data["meta"][key] = value
+
+        edit_url = f"{self.site_url}/wp-admin/post.php?post={post_id}&action=edit"
+
+        post = None
+        if only_changed and post_data:
+            current = await self._get_post_fields(post_id, post_data)
+            post_data = _changed_post_fields(current, post_data)
+            if not post_data:
+                post = current
+
+        if post is None:
+            print(f"記事更新中: ID={post_id}" + (f" 「{title}」" if title else "")
+                  + f" ({', '.join(post_data)})")
+            resp = await self._request(
+                "POST", f"/posts/{post_id}",
+                params=self._fields_param(POST_FIELDS, fields),
+                json=post_data,
+            )
+            post = resp.json()
+            print(f"[OK] 記事更新完了: ID={post_id}")
+        else:
+            print(f"[OK] 変更なし: ID={post_id}（更新リクエストを省略）")
+
+        preview_url = post.get("link", "")
+        if preview_url:
+            preview_url += "?preview=true" if "?" not in preview_url else "&preview=true"
+
+        result = {
+            "id": post_id,
+            "url": edit_url,
+            "preview_url": preview_url,
+            "changed": list(post_data),
+        }
+        if fields is not None:
+            result["post"] = post
+        print(f"     編集URL: {edit_url}")
+        return result
+
+    async def _get_post_fields(self, post_id: int, post_data: dict) -> dict:
+        """
+        更新しようとしているフィールドの現在値を取得する（差分更新用）。
+
+        本文・タイトルは編集用の raw だけを要求し、rendered は転送させない。
+        """
+        names = ["id", "link"]
+        for key in post_data:
+            names.append(f"{key}.raw" if key in ("content", "title") else key)
+        resp = await self._get(
+            f"/posts/{post_id}",
+            params={"context": "edit", **self._fields_param(tuple(names))},
+        )
+        return resp.json()
+
+    async def update_post_from_dir(self, post_id: int, draft_dir: str) -> dict:
+        """
+        drafts/{slug}/ ディレクトリの内容で既存の記事を更新する。
+
+        既存画像（images/）は再アップロードせず、image_results.json の
+        アップロード済み情報（media_id / url）を再利用する。
+        新しい画像がある場合のみアップロードする。
+        記事は現在値と異なるフィールドだけが送られる（update_post 参照）。
+
+        Args:
+            post_id: 更新対象の記事ID
+            draft_dir: 下書きディレクトリのパス
+
+        Returns:
+            dict: {"post_id": ..., "edit_url": ..., "media_ids": [...],
+                   "changed": [更新したフィールド名, ...], "timings": {...}}
+        """
+        draft_path = Path(draft_dir)
+        if not draft_path.is_dir():
+            raise FileNotFoundError(f"下書きディレクトリが見つかりません: {draft_dir}")
+
+        print(f"{'='*60}")
+        print(f"記事更新開始: ID={post_id} / {draft_path.name}")
+        print(f"{'='*60}")
+
+        ctx = await self.draft_pipeline().run(
+            PipelineContext(draft_path=draft_path, post_id=post_id,
+                            journal=self._open_journal(draft_path),
+                            require_built=False)
+        )
+        result = ctx["post"]
+
+        print_timings(ctx)
+        print(f"\n{'='*60}")
+        print(f"更新完了!")
+        print(f"  記事ID: {result['post_id']}")
+        print(f"  編集URL: {result['edit_url']}")
+        print(f"{'='*60}")
+
+        return result
+
+    # ──────────────────────────────────────────
+    # カテゴリ・タグ管理
+    # ──────────────────────────────────────────
+
+    async def get_or_create_category(self, name: str) -> int:
+        """
+        カテゴリ名からIDを取得する。存在しなければ新規作成する。
+
+        Args:
+            name: カテゴリ名
+
+        Returns:
+            int: カテゴリID
+        """
+        return await self._get_or_create_term("categories", name, "カテゴリ")
+
+    async def get_or_create_tag(self, name: str) -> int:
+        """
+        タグ名からIDを取得する。存在しなければ新規作成する。
+
+        Args:
+            name: タグ名
+
+        Returns:
+            int: タグID
+        """
+        return await self._get_or_create_term("tags", name, "タグ")
+
+    async def _get_or_create_term(self, taxonomy: str, name: str, label: str) -> int:
+        """
+        ターム名をIDに解決する（get_or_create_category / get_or_create_tag の本体）。
+
+        タクソノミーキャッシュが有効なら全タームを先読みした辞書から引き、
+        ない名前はそのまま作成を試みる（既にあれば term_exists の term_id を使う）。
+        キャッシュが無効なら従来どおり検索し、見つからなければ作成する。
+
+        Args:
+            taxonomy: "categories" または "tags"
+            name: ターム名
+            label: ログ表示用の名称（「カテゴリ」「タグ」）
+
+        Returns:
+            int: タームID
+        """
+        if self.taxonomy_cache is not None:
+            await self._ensure_taxonomy_loaded(taxonomy)
+            term_id = self.taxonomy_cache.get(taxonomy, name)
+            if term_id is not None:
+                print(f"  {label}取得: 「{name}」 (ID: {term_id}, キャッシュ)")
+                return term_id
+        else:
+            # まず既存タームを検索
+            resp = await self._get(f"/{taxonomy}", params={
+                "search": name, "per_page": 100, **self._fields_param(TERM_FIELDS),
+            })
+            for term in resp.json():
+                if term_key(term["name"]) == term_key(name):
+                    print(f"  {label}取得: 「{name}」 (ID: {term['id']})")
+                    return term["id"]
+
+        # 見つからなければ作成
+        try:
+            resp = await self._post(
+                f"/{taxonomy}", params=self._fields_param(("id",)), json={"name": name},
+            )
+        except WordPressAPIError as e:
+            # キャッシュ取得後に管理画面などで作られていた場合
+            if e.error_code != "term_exists" or "term_id" not in e.error_data:
+                raise
+            term_id = e.error_data["term_id"]
+            print(f"  {label}取得: 「{name}」 (ID: {term_id})")
+        else:
+            term_id = resp.json()["id"]
+            print(f"  {label}作成: 「{name}」 (ID: {term_id})")
+
+        if self.taxonomy_cache is not None:
+            self.taxonomy_cache.add(taxonomy, name, term_id)
+        return term_id
+
+    async def _ensure_taxonomy_loaded(self, taxonomy: str) -> None:
+        """
+        タクソノミーの全タームをキャッシュに読み込む（有効期限内なら何もしない）。
+
+        1ページ目で総ページ数（X-WP-TotalPages）を知り、残りのページは並行取得する。
+        同時に複数の名前解決が走っても、取得は1回にまとめる。
+        """
+        async with self._taxonomy_locks.setdefault(taxonomy, asyncio.Lock()):
+            if self.taxonomy_cache.is_fresh(taxonomy):
+                return
+
+            params = {"per_page": 100, "context": "view", **self._fields_param(TERM_FIELDS)}
+            first = await self._get(f"/{taxonomy}", params={**params, "page": 1})
+            terms = list(first.json())
+            total_pages = int(first.headers.get("X-WP-TotalPages", "1") or 1)
+            if total_pages > 1:
+                pages = await asyncio.gather(*(
+                    self._get(f"/{taxonomy}", params={**params, "page": page})
+                    for page in range(2, total_pages + 1)
+                ))
+                for resp in pages:
+                    terms.extend(resp.json())
+
+            self.taxonomy_cache.replace(taxonomy, terms)
+            print(f"  {taxonomy} を一括取得: {len(terms)}件（{total_pages}ページ）")
+
+    async def _resolve_terms(self, category_names: list[str],
+                             tag_names: list[str]) -> tuple[list[int], list[int]]:
+        """
+        カテゴリ名・タグ名をまとめてIDに解決する。
+
+        各名前の検索・作成は互いに独立しているため、並行して実行する。
+        新規作成は batch/v1 にまとめ、重複した名前は1回だけ解決する。
+
+        Args:
+            category_names: カテゴリ名のリスト
+            tag_names: タグ名のリスト
+
+        Returns:
+            tuple: (カテゴリIDのリスト, タグIDのリスト)
+        """
+        category_names = list(dict.fromkeys(category_names or []))
+        tag_names = list(dict.fromkeys(tag_names or []))
+        if not category_names and not tag_names:
+            return [], []
+
+        print(f"\nカテゴリ・タグ解決:")
+        # 新規タームの作成は batch/v1 でまとめて送る
+        async with self.batch():
+            ids = await asyncio.gather(
+                *(self.get_or_create_category(name) for name in category_names),
+                *(self.get_or_create_tag(name) for name in tag_names),
+            )
+        return list(ids[:len(category_names)]), list(ids[len(category_names):])
+
+    # ──────────────────────────────────────────
+    # ディレクトリからの一括投稿
+    # ──────────────────────────────────────────
+
+    async def publish_draft_from_dir(self, draft_dir: str, require_built: bool = False) -> dict:
+        """
+        drafts/{slug}/ ディレクトリから一括で下書き投稿を行う。
+
+        ディレクトリ構成:
+            drafts/{slug}/
+                article.html       - 記事本文（Gutenbergブロック形式）
+                meta.json          - メタ情報（タイトル、カテゴリ等）
+                images/            - アップロードする画像
+                image_results.json - 画像生成結果（IDとファイル名のマッピング）
+
+        処理は draft_pipeline() のステージとして実行される
+        （画像アップロードとカテゴリ・タグ解決は並行）。
+        本文等はビルド済みのバンドル（lib/draft_build.py）を使い、
+        ないか古ければその場でビルドする。
+
+        Args:
+            draft_dir: 下書きディレクトリのパス
+            require_built: True ならその場でビルドせず、ビルド済みのバンドルだけを
+                           投稿する（push）。ない・古い場合は BundleError
+
+        Returns:
+            dict: {"post_id": ..., "edit_url": ..., "media_ids": [...], "timings": {...}}
+        """
+        draft_path = Path(draft_dir)
+        if not draft_path.is_dir():
+            raise FileNotFoundError(f"下書きディレクトリが見つかりません: {draft_dir}")
+
+        print(f"{'='*60}")
+        print(f"下書き投稿開始: {draft_path.name}")
+        print(f"{'='*60}")
+
+        ctx = await self.draft_pipeline().run(
+            PipelineContext(draft_path=draft_path, post_id=None,
+                            journal=self._open_journal(draft_path),
+                            require_built=require_built)
+        )
+        result = ctx["post"]
+
+        print_timings(ctx)
+        print(f"\n{'='*60}")
+        print(f"投稿完了!")
+        print(f"  記事ID: {result['post_id']}")
+        print(f"  編集URL: {result['edit_url']}")
+        print(f"  画像数: {len(result['media_ids'])}")
+        print(f"{'='*60}")
+
+        return result
+
+    def _open_journal(self, draft_path: Path) -> Optional[PublishJournal]:
+        """下書きディレクトリの投稿ジャーナルを開く（use_journal=False なら None）。"""
+        if not self.use_journal:
+            return None
+        journal = PublishJournal(draft_path, self.site_url)
+        if not journal.is_empty():
+            print(f"投稿ジャーナルあり: 前回までに完了した処理を再利用します")
+            changed = journal.changed_sources(draft_path)
+            if changed is not None:
+                print(f"  前回の投稿からの変更: {', '.join(changed) if changed else 'なし'}")
+        return journal
+
+    # ──────────────────────────────────────────
+    # 下書き投稿パイプライン
+    # ──────────────────────────────────────────
+
+    def draft_pipeline(self) -> Pipeline:
+        """
+        下書きディレクトリを投稿・更新するパイプラインを返す。
+
+        ステージ:
+            bundle  : ビルド済みバンドルの読み込み（ない・古ければビルド）
+            uploads : 画像アップロード（bundle の後）
+            terms   : カテゴリ・タグのID解決（bundle の後。uploads と並行）
+            link    : 本文の画像プレースホルダーを画像ブロックに置換（uploads の後）
+            post    : 下書き作成 / 記事更新（すべての後）
+
+        通信しない前処理（meta の対応付け・アフィリエイト挿入など）は
+        lib/draft_build.py のビルドで済ませ、ここでは I/O だけを行う。
+
+        コンテキストの入力は draft_path、post_id（None なら新規投稿）、
+        journal（PublishJournal または None）と require_built（True ならビルドしない）。
+        journal があれば uploads / terms / post の各ステップの完了を記録し、
+        記録済みのステップは再実行しない。
+        """
+        return Pipeline([
+            Stage("bundle", self._stage_bundle),
+            Stage("uploads", self._stage_uploads, requires=("bundle",)),
+            Stage("terms", self._stage_terms, requires=("bundle",)),
+            Stage("link", self._stage_link, requires=("bundle", "uploads")),
+            Stage("post", self._stage_post, requires=("terms", "link")),
+        ])
+
+    def _stage_bundle(self, ctx: PipelineContext) -> dict:
+        """ビルド済みのバンドルを読み込む（require_built でなければ必要に応じてビルドする）。"""
+        bundle = bundle_for_push(ctx.draft_path, require_built=ctx.require_built)
+        title = bundle["meta"]["title"]
+        # 新規投稿ではタイトルがなければディレクトリ名を使い、更新では変更しない
+        if title is None and ctx.post_id is None:
+            title = ctx.draft_path.name
+        print(f"タイトル: {title}")
+        for warning in bundle["warnings"]:
+            print(f"  [警告] {warning}")
+        return {**bundle, "meta": {**bundle["meta"], "title": title}}
+
+    async def _stage_uploads(self, ctx: PipelineContext) -> tuple[dict, list[int], Optional[int]]:
+        """
+        画像をアップロードし、(image_map, media_ids, featured_media_id) を返す。
+
+        ジャーナルに記録があれば、内容が変わった画像・新しい画像だけをアップロードする。
+        ジャーナルがなく、更新時に image_results.json へ uploaded_media が
+        記録されていれば、アップロードせずにその情報を再利用する。
+        """
+        bundle = ctx["bundle"]
+        uploaded = bundle["uploaded_media"]
+        use_journal = ctx.journal is not None and ctx.journal.has_uploads()
+        if ctx.post_id is None or not uploaded or use_journal:
+            return await self._upload_draft_images(
+                ctx.draft_path, bundle["images"], journal=ctx.journal,
+            )
+
+        print("\n画像: アップロード済み情報を再利用します")
+        image_map = {}
+        media_ids = []
+        featured_media_id = None
+        for img_id, img_data in uploaded.items():
+            image_map[img_id] = img_data
+            media_ids.append(img_data.get("media_id"))
+            if img_data.get("eyecatch"):
+                featured_media_id = img_data.get("media_id")
+        if featured_media_id is None and media_ids:
+            featured_media_id = media_ids[0]
+        return image_map, media_ids, featured_media_id
+
+    async def _stage_terms(self, ctx: PipelineContext,
+                           refresh: bool = False) -> tuple[list[int], list[int]]:
+        """
+        カテゴリ・タグ名をIDに解決する（ジャーナルに記録があればそれを使う）。
+
+        refresh=True ならタクソノミーキャッシュとジャーナルの記録を使わずに解決し直す。
+        """
+        meta = ctx["bundle"]["meta"]
+        if refresh:
+            if self.taxonomy_cache is not None:
+                self.taxonomy_cache.invalidate()
+        elif ctx.journal is not None:
+            saved = ctx.journal.terms(meta["category_names"], meta["tag_names"])
+            if saved is not None:
+                print("カテゴリ・タグ: ジャーナルの記録を再利用します")
+                return saved
+        category_ids, tag_ids = await self._resolve_terms(
+            meta["category_names"], meta["tag_names"],
+        )
+        if ctx.journal is not None:
+            ctx.journal.record_terms(
+                meta["category_names"], meta["tag_names"], category_ids, tag_ids,
+            )
+        return category_ids, tag_ids
+
+    def _stage_link(self, ctx: PipelineContext) -> str:
+        """バンドルの本文の画像プレースホルダーを、アップロード結果の画像ブロックに置換する。"""
+        bundle = ctx["bundle"]
+        image_map, _, _ = ctx["uploads"]
+        content = transform_content(bundle["html"], {"image_map": image_map})
+        if bundle["affiliate"]:
+            print(f"  アフィリエイトリンク挿入完了")
+        print(f"\n記事本文: {len(content)} 文字")
+        return content
+
+    async def _stage_post(self, ctx: PipelineContext) -> dict:
+        """
+        下書きを作成する（post_id があれば既存記事を更新する）。
+
+        新規投稿でも、ジャーナルに作成済みの記事IDがあれば重複して作成せず
+        その記事を更新する（記事がサイトから削除されていれば作り直す）。
+        送る内容が前回ジャーナルに記録した書き込みと同一なら、リクエスト自体を省略する
+        （WordPress 側で直接編集した内容は上書きしない。上書きするには --no-journal）。
+        meta.json の yoast_seo は、従来どおり post_id を指定した更新のときだけ送る。
+        """
+        meta = ctx["bundle"]["meta"]
+        category_ids, tag_ids = ctx["terms"]
+        _, media_ids, featured_media_id = ctx["uploads"]
+        seo_meta = dict(meta["seo_meta"])
+        if ctx.post_id is not None:
+            seo_meta.update(meta["yoast_seo"])
+        fields = dict(
+            title=meta["title"],
+            content=ctx["link"],
+            featured_media_id=featured_media_id,
+            categories=category_ids if category_ids else None,
+            tags=tag_ids if tag_ids else None,
+            meta=seo_meta if seo_meta else None,
+            slug=meta["slug"],
+        )
+
+        post_id = ctx.post_id
+        if post_id is None and ctx.journal is not None:
+            post_id = ctx.journal.post_id
+
+        post_hash = content_hash(fields)
+        unchanged = (
+            ctx.journal.unchanged_post(post_id, post_hash)
+            if ctx.journal is not None and post_id is not None else None
+        )
+        if unchanged is not None:
+            print(f"\n変更なし: ID={post_id}（前回の書き込みと同じ内容のため省略）")
+            post_result = {
+                "id": post_id,
+                "url": unchanged["edit_url"],
+                "preview_url": unchanged.get("preview_url", ""),
+                "changed": [],
+            }
+        else:
+            try:
+                post_result = await self._write_post(ctx, post_id, fields)
+            except WordPressAPIError as e:
+                if e.error_code != "rest_invalid_term":
+                    raise
+                # キャッシュやジャーナルにあったタームIDがサーバー側で削除されていた
+                print("  存在しないカテゴリ・タグIDが含まれていたため、解決し直して再送します")
+                category_ids, tag_ids = await self._stage_terms(ctx, refresh=True)
+                fields["categories"] = category_ids if category_ids else None
+                fields["tags"] = tag_ids if tag_ids else None
+                post_hash = content_hash(fields)
+                post_result = await self._write_post(ctx, post_id, fields)
+        if ctx.journal is not None:
+            ctx.journal.record_post(
+                post_result["id"], post_result["url"], post_result.get("preview_url", ""),
+                post_hash=post_hash, sources=source_hashes(ctx.draft_path),
+            )
+
+        result = {
+            "post_id": post_result["id"],
+            "edit_url": post_result["url"],
+            "preview_url": post_result.get("preview_url", ""),
+            "media_ids": media_ids,
+            "timings": ctx.timings,
+        }
+        if "changed" in post_result:
+            result["changed"] = post_result["changed"]
+        return result
+
+    async def _write_post(self, ctx: PipelineContext, post_id: Optional[int],
+                          fields: dict) -> dict:
+        """
+        記事を更新する（post_id がなければ作成する）。
+
+        ジャーナルの記事IDがサイトから削除されていた場合は新規に作成する。
+        """
+        if post_id is not None:
+            if ctx.post_id is None:
+                print(f"\n更新処理（ジャーナルに記録された作成済みの記事 ID={post_id}）:")
+            else:
+                print(f"\n更新処理:")
+            try:
+                return await self.update_post(post_id=post_id, **fields)
+            except WordPressAPIError as e:
+                if ctx.post_id is not None or e.status_code not in (404, 410):
+                    raise
+                print(f"  記事 ID={post_id} が見つからないため、新規に作成します")
+        print(f"\n投稿処理:")
+        return await self.create_draft(**fields)
+
+
+class _FileUploadStream:
+    """
+    ファイルをチャンク単位で読みながら送信するリクエストボディ。
+
+    ファイル全体をメモリに載せず、UPLOAD_CHUNK_SIZE ずつ読み込んで送る。
+    async for で反復するたびにファイルを開き直すため、同じボディを
+    再送（リトライ）に使うこともできる。
+    """
+
+    def __init__(self, path: Path, content_type: str,
+                 preamble: bytes = b"", epilogue: bytes = b"",
+                 progress: Optional[ProgressCallback] = None,
+                 extra_headers: dict = None):
+        self.path = path
+        self.preamble = preamble
+        self.epilogue = epilogue
+        self.progress = progress
+        self.file_size = path.stat().st_size
+        self.total = len(preamble) + self.file_size + len(epilogue)
+        self.headers = {
+            "Content-Type": content_type,
+            # 長さを明示してチャンク転送エンコーディングを避ける
+            "Content-Length": str(self.total),
+            **(extra_headers or {}),
+        }
+
+    @classmethod
+    def raw(cls, path: Path, mime_type: str,
+            progress: Optional[ProgressCallback] = None) -> "_FileUploadStream":
+        """ファイル本体のみを送るボディ（POST /media のバイナリ送信用）。"""
+        return cls(
+            path, mime_type, progress=progress,
+            extra_headers={
+                "Content-Disposition": f'attachment; filename="{path.name}"',
+            },
+        )
+
+    @classmethod
+    def multipart(cls, path: Path, mime_type: str, fields: dict,
+                  progress: Optional[ProgressCallback] = None) -> "_FileUploadStream":
+        """フォームフィールドとファイルを multipart/form-data で送るボディ。"""
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        filename = path.name.replace('"', "%22").replace("\r", "").replace("\n", "")
+        parts.append(
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: {mime_type}\r\n\r\n'
+        )
+        return cls(
+            path,
+            f"multipart/form-data; boundary={boundary}",
+            preamble="".join(parts).encode("utf-8"),
+            epilogue=f"\r\n--{boundary}--\r\n".encode("ascii"),
+            progress=progress,
+        )
+
+    async def __aiter__(self):
+        sent = 0
+        if self.preamble:
+            yield self.preamble
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                sent += len(chunk)
+                if self.progress:
+                    self.progress(self.path.name, sent, self.file_size)
+                yield chunk
+        if self.epilogue:
+            yield self.epilogue
+
+
+# ──────────────────────────────────────────────
+# ユーティリティ関数
+# ──────────────────────────────────────────────
+
+def _is_rejection(error: WordPressAPIError) -> bool:
+    """
+    リクエスト形式そのものをサーバーが受け付けなかったエラーかどうかを判定する。
+
+    400（不正なリクエスト）/ 406 / 413 / 415（未対応のメディアタイプ）/
+    501 は、別の送信方式に切り替えれば成功する可能性がある。
+    """
+    return error.status_code in (400, 406, 413, 415, 501)
+
+
+def _changed_post_fields(current: dict, post_data: dict) -> dict:
+    """
+    更新データのうち、記事の現在値と異なるフィールドだけを返す。
+
+    カテゴリ・タグは順序を無視して比較する。meta はキーごとに比較し、
+    REST API に公開されていない（現在値が取れない）キーは変更ありとして扱う。
+
+    Args:
+        current: GET /posts/{id}?context=edit のレスポンス
+        post_data: update_post が送ろうとしている更新データ
+
+    Returns:
+        dict: 送る必要のある更新データ
+    """
+    changed = {}
+    for key, value in post_data.items():
+        now = current.get(key)
+        if key in ("content", "title"):
+            if not isinstance(now, dict) or now.get("raw") != value:
+                changed[key] = value
+        elif key in ("categories", "tags"):
+            if sorted(now or []) != sorted(value):
+                changed[key] = value
+        elif key == "meta":
+            now_meta = now if isinstance(now, dict) else {}
+            meta = {
+                k: v for k, v in value.items()
+                if k not in now_meta or now_meta[k] != v
+            }
+            if meta:
+                changed[key] = meta
+        elif now != value:
+            changed[key] = value
+    return changed
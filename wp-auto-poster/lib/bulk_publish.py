@@ -0,0 +1,166 @@
+"""
+複数の下書きディレクトリの一括投稿・一括更新
+
+DRAFTS_DIR 以下の下書きをまとめて処理する。1つの AsyncWordPressClient
+（コネクション・認証・タクソノミーキャッシュ・メディア索引）を全下書きで共有し、
+同時に処理する下書き数は workers で制限する。
+最後に下書きごとの成否と、全体のスループット（件/分・アップロードMB/秒）を表示する。
+
+更新対象の記事IDは各下書きの meta.json の "post_id"
+（サイトごとに異なる場合は "post_ids": {"サイト名": ID}）から読む。
+meta.json になければ、投稿ジャーナルに記録された作成済みの記事IDを使う。
+"""
+
+import asyncio
+import glob
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from lib.config import DRAFTS_DIR
+    from lib.async_wp_client import AsyncWordPressClient
+    from lib.publish_journal import PublishJournal
+except ImportError:
+    from config import DRAFTS_DIR
+    from async_wp_client import AsyncWordPressClient
+    from publish_journal import PublishJournal
+
+# 同時に処理する下書き数のデフォルト
+DEFAULT_BULK_WORKERS = 3
+
+BULK_ACTIONS = ("publish-all", "update-all")
+
+
+def find_draft_dirs(patterns: list[str], base: Path = None) -> list[Path]:
+    """
+    パターンに一致する下書きディレクトリ（meta.json を含むもの）を返す。
+
+    Args:
+        patterns: ディレクトリのパスまたはグロブ（例: "2026-03-*"）。
+                  相対パスは base からの相対として解決する
+        base: 基準ディレクトリ（省略時は DRAFTS_DIR）
+
+    Returns:
+        list[Path]: 名前順・重複なしの下書きディレクトリ
+    """
+    base = Path(base or DRAFTS_DIR)
+    found: dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = [path]
+        else:
+            full = pattern if path.is_absolute() else str(base / pattern)
+            candidates = [Path(p) for p in sorted(glob.glob(full))]
+        for candidate in candidates:
+            if (candidate / "meta.json").is_file():
+                found[candidate.resolve()] = None
+    return sorted(found, key=lambda p: p.name)
+
+
+def read_post_id(draft_path: Path, site_name: str = None,
+                 site_url: str = None) -> Optional[int]:
+    """
+    更新対象の記事IDを読む。
+
+    meta.json の "post_ids" にサイト名のエントリがあればそれを、なければ "post_id" を返す。
+    どちらもなく site_url が指定されていれば、投稿ジャーナルの記事IDを返す。
+    """
+    try:
+        with open(draft_path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    post_ids = meta.get("post_ids") or {}
+    if site_name and site_name in post_ids:
+        return int(post_ids[site_name])
+    if meta.get("post_id"):
+        return int(meta["post_id"])
+    return PublishJournal(draft_path, site_url).post_id if site_url else None
+
+
+async def run_bulk(client: AsyncWordPressClient, action: str,
+                   draft_paths: list[Path], workers: int = DEFAULT_BULK_WORKERS,
+                   site_name: str = None) -> dict:
+    """
+    下書きを一括で投稿または更新する。
+
+    1件の失敗は他の下書きの処理を止めない。
+
+    Args:
+        client: 全下書きで共有するクライアント
+        action: "publish-all" または "update-all"
+        draft_paths: 処理する下書きディレクトリ
+        workers: 同時に処理する下書き数
+        site_name: 記事IDを meta.json の post_ids から引くときのサイト名
+
+    Returns:
+        dict: {"results": [{"draft", "ok", "result" / "error", "seconds"}, ...],
+               "elapsed": 秒, "uploaded_bytes": バイト数}
+    """
+    slots = asyncio.Semaphore(max(1, workers))
+    sent_before = _media_bytes_sent(client)
+    started = time.monotonic()
+
+    async def process(draft_path: Path) -> dict:
+        async with slots:
+            draft_started = time.monotonic()
+            outcome = {"draft": draft_path.name}
+            try:
+                if action == "publish-all":
+                    outcome["result"] = await client.publish_draft_from_dir(str(draft_path))
+                else:
+                    post_id = read_post_id(draft_path, site_name, client.site_url)
+                    if post_id is None:
+                        raise ValueError("meta.json・投稿ジャーナルに post_id がありません")
+                    outcome["result"] = await client.update_post_from_dir(
+                        post_id, str(draft_path),
+                    )
+                outcome["ok"] = True
+            except Exception as e:
+                outcome["ok"] = False
+                outcome["error"] = f"{type(e).__name__}: {e}"
+                print(f"\n[エラー] {draft_path.name}: {e}")
+            outcome["seconds"] = time.monotonic() - draft_started
+            return outcome
+
+    results = await asyncio.gather(*(process(path) for path in draft_paths))
+    return {
+        "results": results,
+        "elapsed": time.monotonic() - started,
+        "uploaded_bytes": _media_bytes_sent(client) - sent_before,
+    }
+
+
+def print_bulk_report(report: dict, title: str = "一括処理の結果") -> None:
+    """下書きごとの成否とスループットを表示する。"""
+    results = report["results"]
+    elapsed = report["elapsed"]
+    ok_count = sum(1 for r in results if r["ok"])
+
+    print(f"\n{'='*60}")
+    print(title)
+    print(f"{'='*60}")
+    for r in results:
+        if r["ok"]:
+            note = " (変更なし)" if r["result"].get("changed") == [] else ""
+            print(f"  [OK] {r['draft']} ({r['seconds']:.1f}秒) {r['result']['edit_url']}{note}")
+        else:
+            print(f"  [NG] {r['draft']} ({r['seconds']:.1f}秒) {r['error']}")
+
+    mb = report["uploaded_bytes"] / (1024 * 1024)
+    per_minute = len(results) / elapsed * 60 if elapsed > 0 else 0.0
+    mb_per_sec = mb / elapsed if elapsed > 0 else 0.0
+    print(f"\n  成功: {ok_count}/{len(results)}件  所要時間: {elapsed:.1f}秒")
+    print(f"  スループット: {per_minute:.1f}件/分  アップロード: {mb:.2f}MB "
+          f"({mb_per_sec:.2f}MB/秒)")
+
+
+def _media_bytes_sent(client: AsyncWordPressClient) -> int:
+    """これまでに /media へ送ったボディのバイト数。"""
+    return sum(
+        record["sent"] for record in client.metrics.records
+        if record["endpoint"] == "/media"
+    )
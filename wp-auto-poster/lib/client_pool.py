@@ -0,0 +1,109 @@
+"""
+複数サイト向けの WordPress クライアントプール
+
+サイトごとに AsyncWordPressClient を1つだけ作って使い回し、
+コネクション・キャッシュ・リトライ状態をサイト単位で分離する。
+各サイトの同時処理数は SiteConfig.max_concurrent_posts で制限するため、
+1つのサイトが遅くても他のサイトの処理は待たされない。
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+try:
+    from lib.async_wp_client import AsyncWordPressClient
+    from lib.site_registry import SiteConfig
+except ImportError:
+    from async_wp_client import AsyncWordPressClient
+    from site_registry import SiteConfig
+
+# ClientPool.run_all に渡すジョブ: (サイト名, クライアントを受け取るコルーチン関数)
+SiteJob = tuple[str, Callable[[AsyncWordPressClient], Awaitable]]
+
+
+class ClientPool:
+    """
+    サイト名 → AsyncWordPressClient のプール。
+
+    使用例:
+        async with ClientPool(select_sites(load_sites(), ["a", "b"])) as pool:
+            results = await pool.run_all([
+                ("a", lambda c: c.publish_draft_from_dir("drafts/x")),
+                ("b", lambda c: c.publish_draft_from_dir("drafts/x")),
+            ])
+    """
+
+    def __init__(self, sites: list[SiteConfig], upload_workers: int = None,
+                 max_concurrent_posts: int = None, **client_options):
+        """
+        Args:
+            sites: 扱うサイトの設定
+            upload_workers: 全サイト共通のメディアの同時アップロード数
+                            （省略時は各サイトの upload_workers）
+            max_concurrent_posts: 全サイト共通の同時処理数（省略時は各サイトの max_concurrent_posts）
+            **client_options: 各 AsyncWordPressClient に共通で渡す引数
+                              （use_media_index, use_http_cache など）
+        """
+        self.sites = {site.name: site for site in sites}
+        self._upload_workers = upload_workers
+        self._client_options = client_options
+        self._clients: dict[str, AsyncWordPressClient] = {}
+        self._limits = {
+            site.name: max_concurrent_posts or site.max_concurrent_posts for site in sites
+        }
+        self._slots = {name: asyncio.Semaphore(limit) for name, limit in self._limits.items()}
+
+    async def __aenter__(self) -> "ClientPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """作成済みのクライアントをすべて閉じる。"""
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+    def client(self, name: str) -> AsyncWordPressClient:
+        """サイトのクライアントを返す（初回のみ作成する）。"""
+        if name not in self._clients:
+            site = self.sites[name]
+            self._clients[name] = AsyncWordPressClient(
+                url=site.url, user=site.user, password=site.password,
+                upload_workers=self._upload_workers or site.upload_workers,
+                **self._client_options,
+            )
+        return self._clients[name]
+
+    def max_concurrent_posts(self, name: str) -> int:
+        """サイトの同時処理数。"""
+        return self._limits[name]
+
+    def clients(self) -> dict[str, AsyncWordPressClient]:
+        """作成済みのクライアント（サイト名 → クライアント）を返す。"""
+        return dict(self._clients)
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        """サイトの同時処理数の枠を1つ確保し、そのサイトのクライアントを渡す。"""
+        async with self._slots[name]:
+            yield self.client(name)
+
+    async def run(self, name: str, job: Callable[[AsyncWordPressClient], Awaitable]):
+        """サイトの枠を確保してジョブを1つ実行する。"""
+        async with self.slot(name) as client:
+            return await job(client)
+
+    async def run_all(self, jobs: list[SiteJob]) -> list:
+        """
+        複数サイトのジョブを並行実行する。
+
+        Returns:
+            list: 各ジョブの戻り値（入力順）。失敗したジョブの位置には例外が入り、
+                  他のジョブは中断されない
+        """
+        return await asyncio.gather(
+            *(self.run(name, job) for name, job in jobs),
+            return_exceptions=True,
+        )
@@ -22,6 +22,12 @@ WP_APP_PASSWORD: str = os.getenv("WP_APP_PASSWORD", "")
 
 WP_REST_BASE: str = f"{WP_URL}/wp-json/wp/v2"
 
+# メディアの同時アップロード数（共有ホスティングでは増やしすぎないこと）
+WP_UPLOAD_WORKERS: int = int(os.getenv("WP_UPLOAD_WORKERS", "4"))
+
+# 複数サイトを扱う場合のサイト登録簿（lib/site_registry.py 参照）
+WP_SITES_FILE: Path = Path(os.getenv("WP_SITES_FILE", str(_project_root / "sites.json")))
+
 # ──────────────────────────────────────────────
 # Google Gemini API設定
 # ──────────────────────────────────────────────
@@ -35,6 +41,13 @@ EYECATCH_ASPECT: str = "16:9"
 ILLUSTRATION_MODEL: str = "gemini-3.1-flash-image-preview"
 ILLUSTRATION_ASPECT: str = "4:3"
 
+# 画像生成APIの流量制限（1分あたりのリクエスト数 / 同時に生成する枚数）
+# Google AI Studio のプロジェクトの割り当て（RPM）に合わせて設定する
+GEMINI_IMAGE_RPM: float = float(os.getenv("GEMINI_IMAGE_RPM", "10"))
+GEMINI_IMAGE_CONCURRENCY: int = int(os.getenv("GEMINI_IMAGE_CONCURRENCY", "8"))
+# 生成した画像のキャッシュ容量の上限（MB）。超えた分は使われていない順に捨てる
+GEMINI_IMAGE_CACHE_MB: int = int(os.getenv("GEMINI_IMAGE_CACHE_MB", "512"))
+
 # ──────────────────────────────────────────────
 # もしもアフィリエイト設定
 # ──────────────────────────────────────────────
@@ -60,6 +73,21 @@ DRAFTS_DIR: Path = PROJECT_ROOT / "drafts"
 LOGS_DIR: Path = PROJECT_ROOT / "logs"
 PROMPTS_DIR: Path = _project_root / "prompts"
 MERMAID_CONFIG: Path = _project_root / "mermaid-config.json"
+CACHE_DIR: Path = _project_root / ".cache"  # メディア索引などのローカルキャッシュ
+
+# ──────────────────────────────────────────────
+# ジョブキュー設定（lib/job_queue.py）
+# ──────────────────────────────────────────────
+JOBS_DB_PATH: Path = Path(os.getenv("JOBS_DB_PATH", str(_project_root / ".cache" / "jobs.sqlite3")))
+JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+
+# バックエンドごとの流量制限（1分あたりに開始するジョブ数 / 同時に実行するジョブ数）
+GEMINI_JOBS_PER_MINUTE: float = float(os.getenv("GEMINI_JOBS_PER_MINUTE", "10"))
+GEMINI_MAX_CONCURRENT: int = int(os.getenv("GEMINI_MAX_CONCURRENT", "2"))
+WORDPRESS_JOBS_PER_MINUTE: float = float(os.getenv("WORDPRESS_JOBS_PER_MINUTE", "30"))
+WORDPRESS_MAX_CONCURRENT: int = int(os.getenv("WORDPRESS_MAX_CONCURRENT", "2"))
+CHROMIUM_JOBS_PER_MINUTE: float = float(os.getenv("CHROMIUM_JOBS_PER_MINUTE", "60"))
+CHROMIUM_MAX_CONCURRENT: int = int(os.getenv("CHROMIUM_MAX_CONCURRENT", "2"))
 
 # ──────────────────────────────────────────────
 # バリデーション
@@ -0,0 +1,309 @@
+"""
+記事本文のプレースホルダー変換エンジン
+
+article.html の <!-- NAME ... --> 形式のプレースホルダーを、登録したハンドラーの出力に置き換える。
+本文はコンパイル済みの正規表現1つで先頭から1回だけ走査し、
+プレースホルダー以外の部分とハンドラーの出力を1つのバッファに順に書き出す。
+
+プレースホルダー形式:
+    <!-- AFFILIATE_BOOKS -->
+    <!-- IMAGE: {image_id} -->
+    <!-- IMAGE: {image_id} alt="説明文" caption="キャプション" -->
+
+ハンドラーは (placeholder, context) を受け取り、置き換える文字列を返す。
+None を返すか、名前に対応するハンドラーがなければプレースホルダーはそのまま残る。
+context に必要な値がないハンドラーは None を返すため、例えばビルド時は
+affiliate_html だけを渡してアフィリエイトだけを挿入し、画像は push 時に置き換えられる。
+
+新しいプレースホルダーは register_placeholder で追加する:
+
+    @register_placeholder("TOC")
+    def _render_toc(placeholder, context):
+        ...
+
+ベンチマーク（従来の複数回の re.sub との比較）:
+    python lib/content_transform.py --benchmark --size-kb 500 --images 200
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Callable, Optional
+
+# プレースホルダー1つ分: 名前（大文字）、":" の後の引数、key="value" 形式の属性
+_PLACEHOLDER_RE = re.compile(
+    r'<!-- (?P<name>[A-Z][A-Z0-9_]*)'
+    r'(?::\s*(?P<arg>\S+)(?P<attrs>(?:\s+\w+="[^"]*")*))?'
+    r'\s*-->'
+)
+
+_ATTR_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+class Placeholder:
+    """本文中のプレースホルダー1つ。"""
+
+    __slots__ = ("name", "arg", "attrs_text", "raw", "_attrs")
+
+    def __init__(self, name: str, arg: Optional[str], attrs_text: str, raw: str):
+        self.name = name
+        self.arg = arg
+        self.attrs_text = attrs_text
+        self.raw = raw
+        self._attrs = None
+
+    @property
+    def attrs(self) -> dict[str, str]:
+        """属性（同じ名前が複数あれば最初のもの）。初めて参照したときに解析する。"""
+        if self._attrs is None:
+            self._attrs = {}
+            for key, value in _ATTR_RE.findall(self.attrs_text):
+                self._attrs.setdefault(key, value)
+        return self._attrs
+
+    def __repr__(self) -> str:
+        return f"Placeholder(name={self.name!r}, arg={self.arg!r})"
+
+
+# ハンドラー: (プレースホルダー, コンテキスト) → 置き換える文字列（None ならそのまま残す）
+PlaceholderHandler = Callable[[Placeholder, dict], Optional[str]]
+
+# プレースホルダー名 → ハンドラー
+PLACEHOLDER_HANDLERS: dict[str, PlaceholderHandler] = {}
+
+
+def register_placeholder(name: str):
+    """プレースホルダーのハンドラーを登録するデコレーター。"""
+    def decorator(handler: PlaceholderHandler) -> PlaceholderHandler:
+        PLACEHOLDER_HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+def transform_content(html: str, context: dict,
+                      found: list[Placeholder] = None) -> str:
+    """
+    本文のプレースホルダーを1回の走査で置き換える。
+
+    Args:
+        html: 記事HTML
+        context: ハンドラーに渡す値（affiliate_html / image_map など）
+        found: 指定すると、見つけたプレースホルダーを（置き換えたかに関わらず）順に追加する
+
+    Returns:
+        str: 置換後の記事HTML
+    """
+    parts = []
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(html):
+        handler = PLACEHOLDER_HANDLERS.get(match["name"])
+        if handler is None and found is None:
+            continue
+        placeholder = Placeholder(match["name"], match["arg"], match["attrs"] or "", match[0])
+        if found is not None:
+            found.append(placeholder)
+        replacement = handler(placeholder, context) if handler is not None else None
+        if replacement is None:
+            continue
+        parts.append(html[pos:match.start()])
+        parts.append(replacement)
+        pos = match.end()
+    if pos == 0:
+        return html
+    parts.append(html[pos:])
+    return "".join(parts)
+
+
+# ──────────────────────────────────────────────
+# ハンドラー
+# ──────────────────────────────────────────────
+
+@register_placeholder("AFFILIATE_BOOKS")
+def _render_affiliate(placeholder: Placeholder, context: dict) -> Optional[str]:
+    """
+    アフィリエイトセクションを挿入する（context["affiliate_html"]）。
+    アフィリエイトHTMLが空の場合はプレースホルダーを削除する。
+    """
+    if "affiliate_html" not in context:
+        return None
+    affiliate_html = context["affiliate_html"]
+    if not affiliate_html or not affiliate_html.strip():
+        return ""
+    return affiliate_html
+
+
+@register_placeholder("IMAGE")
+def _render_image(placeholder: Placeholder, context: dict) -> Optional[str]:
+    """
+    画像プレースホルダーを Gutenberg の画像ブロックに置き換える（context["image_map"]）。
+
+    image_map: image_id -> {"url": ..., "media_id": ..., "alt": ..., "width": ..., "height": ...}
+    alt / caption はプレースホルダー側の指定を優先する。
+
+    寸法はブロック属性（id / width / height / sizeSlug）と <img> の width/height に入れ、
+    エディタの save() と同じマークアップにする。srcset・loading・fetchpriority などは
+    WordPress が表示時に付けるため、保存する本文には含めない。
+    """
+    image_map = context.get("image_map")
+    if image_map is None or placeholder.arg is None:
+        return None
+    image_id = placeholder.arg.strip()
+    if image_id not in image_map:
+        print(f"  [警告] 画像ID '{image_id}' のマッピングが見つかりません。"
+              f"プレースホルダーをそのまま残します。")
+        return None
+
+    img_data = image_map[image_id]
+    url = img_data["url"]
+    media_id = img_data.get("media_id", "")
+    attrs = placeholder.attrs
+    alt = attrs.get("alt", img_data.get("alt", ""))
+    caption = attrs.get("caption", "")
+
+    if media_id:
+        block_attrs = {"id": media_id}
+        figure_class = f"wp-block-image size-full wp-image-{media_id}"
+        size_attrs = ""
+        width, height = img_data.get("width"), img_data.get("height")
+        if width and height:
+            block_attrs.update(width=width, height=height)
+            figure_class = f"wp-block-image size-full is-resized wp-image-{media_id}"
+            size_attrs = f' width="{width}" height="{height}"'
+        block_attrs["sizeSlug"] = "full"
+        block_open = f"<!-- wp:image {json.dumps(block_attrs)} -->"
+        img_tag = f'<img src="{url}" alt="{alt}" class="wp-image-{media_id}"{size_attrs}/>'
+    else:
+        block_open = "<!-- wp:image -->"
+        figure_class = "wp-block-image"
+        img_tag = f'<img src="{url}" alt="{alt}"/>'
+
+    if caption:
+        inner_html = (
+            f'<figure class="{figure_class}">{img_tag}'
+            f'<figcaption class="wp-element-caption">{caption}</figcaption></figure>'
+        )
+    else:
+        inner_html = f'<figure class="{figure_class}">{img_tag}</figure>'
+    return f"{block_open}\n{inner_html}\n<!-- /wp:image -->"
+
+
+def image_dimensions(media: dict) -> dict:
+    """
+    REST API のメディア（media_details を含む）から、画像ブロックに使うフルサイズの寸法を取り出す。
+
+    Returns:
+        dict: {"width", "height"}。寸法が分からなければ（SVG など）空の dict
+    """
+    details = (media or {}).get("media_details") or {}
+    width, height = details.get("width"), details.get("height")
+    if not width or not height:
+        return {}
+    return {"width": int(width), "height": int(height)}
+
+
+# ──────────────────────────────────────────────
+# ベンチマーク
+# ──────────────────────────────────────────────
+
+def _legacy_transform(html: str, affiliate_html: str, image_map: dict) -> str:
+    """比較用: 従来の実装（プレースホルダーの種類ごとに re.sub で全体を走査する）。"""
+    pattern = r'<!-- AFFILIATE_BOOKS -->'
+    result = re.sub(pattern, affiliate_html, html)
+    if result == html and pattern in html:
+        result = html.replace(pattern, affiliate_html)
+    html = result
+
+    def replace_match(match):
+        image_id = match.group(1).strip()
+        attrs_str = match.group(2) or ""
+        if image_id not in image_map:
+            return match.group(0)
+        img_data = image_map[image_id]
+        media_id = img_data.get("media_id", "")
+        alt = img_data.get("alt", "")
+        caption = ""
+        alt_match = re.search(r'alt="([^"]*)"', attrs_str)
+        if alt_match:
+            alt = alt_match.group(1)
+        caption_match = re.search(r'caption="([^"]*)"', attrs_str)
+        if caption_match:
+            caption = caption_match.group(1)
+        block_open = f"<!-- wp:image {json.dumps({'id': media_id})} -->"
+        img_tag = f'<img src="{img_data["url"]}" alt="{alt}" class="wp-image-{media_id}"/>'
+        figcaption = f'<figcaption class="wp-element-caption">{caption}</figcaption>' if caption else ""
+        return (f'{block_open}\n<figure class="wp-block-image wp-image-{media_id}">'
+                f'{img_tag}{figcaption}</figure>\n<!-- /wp:image -->')
+
+    return re.sub(r'<!-- IMAGE:\s*(\S+)((?:\s+\w+="[^"]*")*)\s*-->', replace_match, html)
+
+
+def _sample_article(size_kb: int, images: int) -> tuple[str, dict]:
+    """ベンチマーク用の記事HTMLと image_map を作る。"""
+    paragraph = (
+        "<!-- wp:paragraph -->\n<p>WordPress の REST API を使って記事を自動投稿する手順を、"
+        "画像のアップロードからカテゴリ・タグの設定まで順に説明します。</p>\n"
+        "<!-- /wp:paragraph -->\n"
+    )
+    count = max(1, size_kb * 1024 // len(paragraph.encode("utf-8")))
+    every = max(1, count // max(1, images))
+    parts = []
+    for i in range(count):
+        parts.append(paragraph)
+        if i % every == 0 and i // every < images:
+            n = i // every + 1
+            parts.append(f'<!-- IMAGE: illust_{n} alt="図{n}" caption="図{n}の説明" -->\n')
+        if i == count // 2:
+            parts.append("<!-- AFFILIATE_BOOKS -->\n")
+    image_map = {
+        f"illust_{n}": {
+            "url": f"https://example.com/wp-content/uploads/illust_{n}.png",
+            "media_id": 1000 + n, "alt": f"挿絵{n}", "width": 1536, "height": 1024,
+        }
+        for n in range(1, images + 1)
+    }
+    return "".join(parts), image_map
+
+
+def run_benchmark(size_kb: int = 500, images: int = 200, repeat: int = 20) -> None:
+    """従来の実装と transform_content の所要時間を比較して表示する。"""
+    html, image_map = _sample_article(size_kb, images)
+    affiliate_html = "<div class=\"affiliate\">おすすめの本</div>"
+    context = {"affiliate_html": affiliate_html, "image_map": image_map}
+
+    output = transform_content(html, context)
+    if "<!-- IMAGE:" in output or "<!-- AFFILIATE_BOOKS -->" in output:
+        raise AssertionError("置き換えられていないプレースホルダーがあります")
+
+    def measure(func) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    legacy = measure(lambda: _legacy_transform(html, affiliate_html, image_map))
+    single = measure(lambda: transform_content(html, context))
+    print(f"本文: {len(html.encode('utf-8')) / 1024:.0f}KB、画像プレースホルダー {images}件"
+          f"（{repeat}回の最速値）")
+    print(f"  {'legacy (re.sub x2)':<22} {legacy * 1000:>8.2f}ms")
+    print(f"  {'single-pass':<22} {single * 1000:>8.2f}ms  ({legacy / single:.2f}x)")
+
+
+def main():
+    """コマンドラインからの実行エントリーポイント"""
+    parser = argparse.ArgumentParser(
+        description="記事本文のプレースホルダー変換のベンチマーク",
+    )
+    parser.add_argument("--benchmark", action="store_true", required=True,
+                        help="従来の実装と所要時間を比較する")
+    parser.add_argument("--size-kb", type=int, default=500, help="本文のサイズ（KB、既定: 500）")
+    parser.add_argument("--images", type=int, default=200, help="画像プレースホルダー数（既定: 200）")
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数（既定: 20）")
+    args = parser.parse_args()
+    run_benchmark(args.size_kb, args.images, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
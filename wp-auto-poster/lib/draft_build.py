@@ -0,0 +1,309 @@
+"""
+下書きディレクトリのビルド（ネットワークを使わない前処理）
+
+下書きディレクトリ（meta.json / image_results.json / article.html /
+affiliate_section.html / images/）を、投稿に必要な情報だけをまとめた
+バンドル（.publish_bundle.json）に変換する。
+
+バンドルに入るもの:
+  - meta   : タイトル・スラッグ・カテゴリ/タグ名・Yoast SEO のメタ
+  - images : 正規化した画像マニフェスト（ファイル・画像ID・alt・キャプション・SHA-256）
+  - html   : アフィリエイト挿入済みの本文。画像は <!-- IMAGE: id --> の
+             記号参照のまま残し、push 時にアップロード結果で画像ブロックに置き換える
+  - hashes : 元ファイル・画像・本文のハッシュ（バンドルが古くないかの判定に使う）
+
+ビルドは通信しないため、複数の下書きをプロセスプールで並列に処理でき、
+投稿（push: アップロード・カテゴリ解決・記事作成）とは別に所要時間を測れる。
+
+使用例:
+    report = build_drafts(find_draft_dirs(["2026-03-*"]), workers=4)
+    print_build_report(report)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+try:
+    from lib.content_transform import transform_content
+    from lib.image_manifest import ImageManifest, ImageRecord
+    from lib.media_index import file_sha256
+    from lib.publish_journal import content_hash, source_hashes
+except ImportError:
+    from content_transform import transform_content
+    from image_manifest import ImageManifest, ImageRecord
+    from media_index import file_sha256
+    from publish_journal import content_hash, source_hashes
+
+# 下書きディレクトリ内のバンドルのファイル名
+BUNDLE_FILENAME = ".publish_bundle.json"
+
+BUNDLE_VERSION = 2
+
+# images/ 内でアップロード対象とする拡張子
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg")
+
+
+class BundleError(Exception):
+    """バンドルがない・古い場合のエラー"""
+    pass
+
+
+# ──────────────────────────────────────────────
+# ビルド
+# ──────────────────────────────────────────────
+
+def build_draft(draft_path: Path, write: bool = True) -> dict:
+    """
+    下書きディレクトリを1つビルドしてバンドルを返す。
+
+    Args:
+        draft_path: 下書きディレクトリのパス
+        write: True なら下書きディレクトリに .publish_bundle.json を書き出す
+
+    Returns:
+        dict: バンドル
+
+    Raises:
+        FileNotFoundError: meta.json / article.html がない場合
+    """
+    draft_path = Path(draft_path)
+    meta = _build_meta(draft_path)
+    manifest = ImageManifest.load(draft_path / "image_results.json")
+    images = _build_images(draft_path, manifest)
+
+    article_file = draft_path / "article.html"
+    if not article_file.exists():
+        raise FileNotFoundError(f"article.html が見つかりません: {article_file}")
+    html = article_file.read_text(encoding="utf-8")
+
+    # affiliate_section.html がない・空の場合はプレースホルダーを削除
+    affiliate_file = draft_path / "affiliate_section.html"
+    affiliate_html = affiliate_file.read_text(encoding="utf-8") if affiliate_file.exists() else ""
+    # 画像は記号参照のまま残し（同じ走査で参照を集める）、参照先が images/ にないものだけ警告する
+    found = []
+    html = transform_content(html, {"affiliate_html": affiliate_html}, found=found)
+    media_refs = list(dict.fromkeys(
+        p.arg.strip() for p in found if p.name == "IMAGE" and p.arg is not None
+    ))
+    image_ids = {img["image_id"] for img in images}
+    uploaded = manifest.uploaded_media
+    warnings = [
+        f"画像ID '{ref}' に対応する画像がありません"
+        for ref in media_refs if ref not in image_ids and ref not in uploaded
+    ]
+
+    bundle = {
+        "version": BUNDLE_VERSION,
+        "built_at": round(time.time(), 3),
+        "draft": draft_path.name,
+        "meta": meta,
+        "images": images,
+        "uploaded_media": uploaded,
+        "html": html,
+        "affiliate": bool(affiliate_html.strip()),
+        "media_refs": media_refs,
+        "warnings": warnings,
+        "hashes": {
+            "sources": source_hashes(draft_path),
+            "html": content_hash(html),
+        },
+    }
+    if write:
+        _write_bundle(draft_path, bundle)
+    return bundle
+
+
+def _build_meta(draft_path: Path) -> dict:
+    """meta.json を読み込み、投稿に使う値（Yoast SEO のメタキーへの対応付け済み）を返す。"""
+    meta_file = draft_path / "meta.json"
+    if not meta_file.exists():
+        raise FileNotFoundError(f"meta.json が見つかりません: {meta_file}")
+    meta = _read_json(meta_file)
+
+    seo_meta = {}
+    if "seo_title" in meta:
+        seo_meta["_yoast_wpseo_title"] = meta["seo_title"]
+    if "seo_description" in meta:
+        seo_meta["_yoast_wpseo_metadesc"] = meta["seo_description"]
+    if "focus_keyword" in meta:
+        seo_meta["_yoast_wpseo_focuskw"] = meta["focus_keyword"]
+
+    return {
+        # None のままにしておき、新規投稿時だけディレクトリ名で補う
+        "title": meta.get("title"),
+        "slug": meta.get("slug") or None,
+        "category_names": meta.get("categories", []),
+        "tag_names": meta.get("tags", []),
+        "seo_meta": seo_meta,
+        # yoast_seo フィールドはそのままのメタキーで渡す（既存記事の更新時のみ）
+        "yoast_seo": meta.get("yoast_seo", {}),
+    }
+
+
+def _build_images(draft_path: Path, manifest: ImageManifest) -> list[dict]:
+    """images/ の画像とマニフェストの情報を、ファイル名順の正規化したリストにする。"""
+    images_dir = draft_path / "images"
+    if not images_dir.is_dir():
+        return []
+    images = []
+    for path in sorted(p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES):
+        record = manifest.lookup(path.name) or ImageRecord(None, path.name)
+        stat = path.stat()
+        images.append({
+            "file": f"images/{path.name}",
+            "image_id": record.id or path.stem,
+            "alt": record.alt,
+            "title": record.title,
+            "caption": record.caption,
+            "eyecatch": record.eyecatch,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(path),
+        })
+    return images
+
+
+def _read_json(path: Path):
+    """JSONファイルを読み込む（ない場合は空の dict）。"""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_bundle(draft_path: Path, bundle: dict) -> None:
+    """バンドルを書き出す（一時ファイル経由で置き換える）。"""
+    path = draft_path / BUNDLE_FILENAME
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(bundle, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+# ──────────────────────────────────────────────
+# 読み込み
+# ──────────────────────────────────────────────
+
+def load_bundle(draft_path: Path) -> Optional[dict]:
+    """
+    ビルド済みのバンドルを読み込む。
+
+    Returns:
+        dict: バンドル。ない・壊れている・元ファイルがビルド後に変わっている場合は None
+    """
+    draft_path = Path(draft_path)
+    try:
+        bundle = json.loads((draft_path / BUNDLE_FILENAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(bundle, dict) or bundle.get("version") != BUNDLE_VERSION:
+        return None
+    return bundle if _is_current(bundle, draft_path) else None
+
+
+def _is_current(bundle: dict, draft_path: Path) -> bool:
+    """バンドルのビルド後に元ファイル・画像が変わっていなければ True。"""
+    if bundle["hashes"]["sources"] != source_hashes(draft_path):
+        return False
+    images_dir = draft_path / "images"
+    files = sorted(
+        p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES
+    ) if images_dir.is_dir() else []
+    if [f"images/{p.name}" for p in files] != [img["file"] for img in bundle["images"]]:
+        return False
+    for path, img in zip(files, bundle["images"]):
+        stat = path.stat()
+        if stat.st_size != img["size"] or stat.st_mtime_ns != img["mtime_ns"]:
+            # 更新時刻だけ変わった場合は内容で判定する
+            if stat.st_size != img["size"] or file_sha256(path) != img["sha256"]:
+                return False
+    return True
+
+
+def bundle_for_push(draft_path: Path, require_built: bool = False) -> dict:
+    """
+    push に使うバンドルを返す。ビルド済みで最新ならそれを、なければその場でビルドする。
+
+    Args:
+        draft_path: 下書きディレクトリのパス
+        require_built: True ならビルドせず、ない・古い場合は BundleError
+
+    Raises:
+        BundleError: require_built=True でバンドルがない・古い場合
+    """
+    bundle = load_bundle(draft_path)
+    if bundle is not None:
+        return bundle
+    if require_built:
+        raise BundleError(
+            f"ビルド済みのバンドルがないか、ビルド後に下書きが変更されています: {draft_path}"
+            f"（先に --action build を実行してください）"
+        )
+    return build_draft(draft_path)
+
+
+# ──────────────────────────────────────────────
+# 複数の下書きの並列ビルド
+# ──────────────────────────────────────────────
+
+def build_drafts(draft_paths: list[Path], workers: int = None) -> dict:
+    """
+    複数の下書きをプロセスプールで並列にビルドする。1件の失敗は他を止めない。
+
+    Args:
+        draft_paths: 下書きディレクトリのパス
+        workers: プロセス数（省略時は CPU 数。1 ならプールを使わずに順に処理する）
+
+    Returns:
+        dict: {"results": [{"draft", "ok", "seconds", "bytes" / "error", "warnings"}, ...],
+               "elapsed": 秒, "workers": プロセス数}
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    started = time.monotonic()
+    if workers == 1 or len(draft_paths) <= 1:
+        results = [_build_one(path) for path in draft_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_build_one, draft_paths))
+    return {"results": results, "elapsed": time.monotonic() - started, "workers": workers}
+
+
+def _build_one(draft_path: Path) -> dict:
+    """プロセスプールで実行する1件分のビルド（例外は結果に入れて返す）。"""
+    started = time.monotonic()
+    outcome = {"draft": Path(draft_path).name}
+    try:
+        bundle = build_draft(draft_path)
+        outcome["ok"] = True
+        outcome["bytes"] = len(bundle["html"].encode("utf-8"))
+        outcome["warnings"] = bundle["warnings"]
+    except Exception as e:
+        outcome["ok"] = False
+        outcome["error"] = f"{type(e).__name__}: {e}"
+    outcome["seconds"] = time.monotonic() - started
+    return outcome
+
+
+def print_build_report(report: dict) -> None:
+    """下書きごとのビルド結果とスループットを表示する。"""
+    results = report["results"]
+    elapsed = report["elapsed"]
+    ok_count = sum(1 for r in results if r["ok"])
+
+    print(f"\n{'='*60}")
+    print(f"ビルド結果（{report['workers']}プロセス）")
+    print(f"{'='*60}")
+    for r in results:
+        if r["ok"]:
+            print(f"  [OK] {r['draft']} ({r['seconds'] * 1000:.1f}ms, {r['bytes']:,}バイト)")
+            for warning in r["warnings"]:
+                print(f"       [警告] {warning}")
+        else:
+            print(f"  [NG] {r['draft']} {r['error']}")
+
+    per_second = len(results) / elapsed if elapsed > 0 else 0.0
+    print(f"\n  成功: {ok_count}/{len(results)}件  所要時間: {elapsed:.2f}秒"
+          f"  スループット: {per_second:.1f}件/秒")
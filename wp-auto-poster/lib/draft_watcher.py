@@ -0,0 +1,229 @@
+"""
+下書きの変更を監視して記事を自動更新するウォッチモード
+
+DRAFTS_DIR 以下のファイル変更を監視し、変更のあった下書きだけを
+起動したままのクライアントで update_post_from_dir に流す。
+コネクション・タクソノミーキャッシュ・メディア索引はメモリ上に保持されたままなので、
+投稿ジャーナル（lib/publish_journal.py）と組み合わせると、本文を直して保存してから
+プレビューに反映されるまでは、通常 記事の現在値の取得（GET）と
+変わったフィールドだけの POST /posts/{id} で済む。
+
+変更の検出には watchdog（inotify 等）を使い、インストールされていなければ
+一定間隔でファイルの更新時刻を比較するポーリングに切り替える。
+エディタの保存などで短時間に続けて届く変更は debounce 秒まとめてから処理する。
+
+対象は記事IDが分かる下書き（meta.json の post_id / post_ids、または投稿ジャーナル）のみ。
+記事IDのない下書きは、書きかけのまま投稿されないよう自動では publish しない。
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    # watchdog がなければポーリングで監視する
+    FileSystemEventHandler = object
+    Observer = None
+
+try:
+    from lib.config import DRAFTS_DIR
+    from lib.async_wp_client import AsyncWordPressClient
+    from lib.bulk_publish import read_post_id
+    from lib.draft_build import BUNDLE_FILENAME
+    from lib.publish_journal import JOURNAL_FILENAME
+except ImportError:
+    from config import DRAFTS_DIR
+    from async_wp_client import AsyncWordPressClient
+    from bulk_publish import read_post_id
+    from draft_build import BUNDLE_FILENAME
+    from publish_journal import JOURNAL_FILENAME
+
+# 最後の変更からこの秒数だけ新しい変更がなければ処理を始める
+DEFAULT_DEBOUNCE = 1.0
+
+# ポーリング時のスキャン間隔（秒）
+DEFAULT_POLL_INTERVAL = 1.0
+
+# 自分で書き出すファイル。これらの変更で更新が再度走らないよう無視する
+IGNORED_NAMES = (JOURNAL_FILENAME, BUNDLE_FILENAME)
+
+# 内容の変更を表す watchdog のイベント（opened / closed など読み込みだけのものは除く）
+CHANGE_EVENTS = ("created", "modified", "moved", "deleted")
+
+
+class DraftWatcher:
+    """
+    DRAFTS_DIR を監視し、変更のあった下書きの記事を更新する。
+
+    使用例:
+        async with AsyncWordPressClient() as client:
+            await DraftWatcher(client).run()
+    """
+
+    def __init__(self, client: AsyncWordPressClient, base: Path = None,
+                 debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_watchdog: bool = True, site_name: str = None):
+        """
+        Args:
+            client: 監視中ずっと使い回すクライアント
+            base: 監視するディレクトリ（省略時は DRAFTS_DIR）
+            debounce: 変更をまとめる待ち時間（秒）
+            poll_interval: ポーリング時のスキャン間隔（秒）
+            use_watchdog: False にすると watchdog があってもポーリングで監視する
+            site_name: 記事IDを meta.json の post_ids から引くときのサイト名
+        """
+        self.client = client
+        self.base = Path(base or DRAFTS_DIR).resolve()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_watchdog = use_watchdog and Observer is not None
+        self.site_name = site_name
+        # 下書きディレクトリ → 処理を始める時刻（loop.time()）
+        self._pending: dict[Path, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def run(self) -> None:
+        """キャンセルされるまで監視を続ける。"""
+        if not self.base.is_dir():
+            raise FileNotFoundError(f"監視するディレクトリが見つかりません: {self.base}")
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+        observer = poller = None
+        if self.use_watchdog:
+            observer = Observer()
+            observer.schedule(_ChangeHandler(self), str(self.base), recursive=True)
+            observer.start()
+            method = "watchdog"
+        else:
+            poller = asyncio.ensure_future(self._poll())
+            method = f"ポーリング {self.poll_interval:g}秒間隔"
+        print(f"監視開始: {self.base}（{method}、{self.debounce:g}秒まとめて処理）")
+        print("終了するには Ctrl+C を押してください")
+
+        try:
+            while True:
+                await self._wait_for_due()
+                for draft_path in self._take_due():
+                    await self._update(draft_path)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            if poller is not None:
+                poller.cancel()
+
+    def notify(self, path: Path) -> None:
+        """ファイルの変更を受け取り、その下書きの処理を debounce 秒後に予約する。"""
+        draft_path = self._draft_for(Path(path))
+        if draft_path is None:
+            return
+        self._pending[draft_path] = self._loop.time() + self.debounce
+        self._wakeup.set()
+
+    def _draft_for(self, path: Path) -> Optional[Path]:
+        """変更されたファイルが属する下書きディレクトリ（対象外なら None）。"""
+        try:
+            rel = path.resolve().relative_to(self.base)
+        except ValueError:
+            return None
+        if len(rel.parts) < 2:
+            return None
+        name = rel.parts[-1]
+        if name in IGNORED_NAMES or name.endswith(".tmp") or name.startswith(".#"):
+            return None
+        draft_path = self.base / rel.parts[0]
+        return draft_path if (draft_path / "meta.json").is_file() else None
+
+    async def _wait_for_due(self) -> None:
+        """予約のうち最も早いものの時刻まで（新しい変更が届けばそこまで）待つ。"""
+        self._wakeup.clear()
+        if not self._pending:
+            await self._wakeup.wait()
+            return
+        timeout = min(self._pending.values()) - self._loop.time()
+        if timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _take_due(self) -> list[Path]:
+        """処理時刻になった下書きを予約から取り出す。"""
+        now = self._loop.time()
+        due = [path for path, at in self._pending.items() if at <= now]
+        for path in due:
+            del self._pending[path]
+        return due
+
+    async def _update(self, draft_path: Path) -> None:
+        """下書き1件の記事を更新する。失敗しても監視は続ける。"""
+        post_id = read_post_id(draft_path, self.site_name, self.client.site_url)
+        if post_id is None:
+            print(f"\n[スキップ] {draft_path.name}: 記事IDがありません"
+                  f"（先に --action publish で投稿してください）")
+            return
+
+        started = time.monotonic()
+        try:
+            await self.client.update_post_from_dir(post_id, str(draft_path))
+        except Exception as e:
+            print(f"\n[エラー] {draft_path.name}: {e}")
+            return
+        print(f"反映までの所要時間: {time.monotonic() - started:.2f}秒（監視を継続中）")
+
+    # ── ポーリング ──
+
+    async def _poll(self) -> None:
+        """一定間隔でファイルの更新時刻とサイズを比較し、変わったものを通知する。"""
+        previous = await asyncio.to_thread(self._snapshot)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = await asyncio.to_thread(self._snapshot)
+            for path, stat in current.items():
+                if previous.get(path) != stat:
+                    self.notify(path)
+            for path in previous.keys() - current.keys():
+                self.notify(path)
+            previous = current
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        """下書きディレクトリ直下と images/ のファイル → (更新時刻, サイズ)。"""
+        snapshot = {}
+        for draft_path in self.base.iterdir():
+            if not (draft_path / "meta.json").is_file():
+                continue
+            for directory in (draft_path, draft_path / "images"):
+                if not directory.is_dir():
+                    continue
+                for path in directory.iterdir():
+                    if path.name in IGNORED_NAMES or not path.is_file():
+                        continue
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """watchdog のイベントを（監視スレッドから）イベントループ側へ渡す。"""
+
+    def __init__(self, watcher: DraftWatcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory or event.event_type not in CHANGE_EVENTS:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path:
+                self.watcher._loop.call_soon_threadsafe(self.watcher.notify, Path(path))
@@ -0,0 +1,249 @@
+"""
+REST API の GET レスポンスのディスクキャッシュ（条件付きリクエスト）
+
+ETag / Last-Modified 付きで返ってきた GET レスポンスを SQLite に保存し、
+次回は If-None-Match / If-Modified-Since を付けて再検証する。
+304 Not Modified が返れば本文を転送せずに保存済みのレスポンスを使う。
+Cache-Control: max-age が指定されていれば、期限内はサーバーに問い合わせない。
+
+容量は max_bytes を上限とし、超えた分は最後に使われた時刻が古い順に捨てる（LRU）。
+このクライアント自身が書き込みを行ったコレクションのエントリは破棄する。
+
+context=edit のレスポンス（下書き本文・非公開メタなどを含む）は保存しない。
+キャッシュファイルは所有者だけが読み書きできる権限（0600）で作成する。
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+
+import httpx
+
+try:
+    from lib.config import CACHE_DIR
+    from lib.sqlite_lru import evict_lru
+except ImportError:
+    from config import CACHE_DIR
+    from sqlite_lru import evict_lru
+
+# キャッシュファイルのデフォルトパス
+DEFAULT_DB_PATH: Path = CACHE_DIR / "http_cache.sqlite3"
+
+# キャッシュ全体の容量上限（バイト）
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# 保存済みの本文とは対応しなくなるため、キャッシュに残さないヘッダー
+_DROP_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def is_cacheable(params: Optional[dict]) -> bool:
+    """
+    このクエリの GET レスポンスをディスクに保存してよいか。
+
+    context=edit は認証ユーザーにしか見えない下書き・非公開メタを返すため保存しない。
+    """
+    return (params or {}).get("context") != "edit"
+
+
+def cache_route(endpoint: str) -> str:
+    """
+    エンドポイントが属するコレクションを返す（無効化の単位）。
+
+    例: /posts/12 → /posts, /tags?search=x → /tags, / → /
+    """
+    path = endpoint.split("?", 1)[0].strip("/")
+    return "/" + path.split("/", 1)[0]
+
+
+class HTTPCache:
+    """
+    GET レスポンスのキャッシュ（サイト・ユーザー単位）。
+
+    複数スレッドから使われても安全なように、接続は1本をロックで保護する。
+    """
+
+    def __init__(self, db_path: Path = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        キャッシュを開く（なければ作成する）。
+
+        Args:
+            db_path: SQLiteファイルのパス（省略時は DEFAULT_DB_PATH）
+            max_bytes: 保存する本文の合計サイズの上限
+        """
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # 認証付きで取得した本文を含むため、所有者以外から読めないようにする
+        os.close(os.open(self.db_path, os.O_CREAT | os.O_WRONLY, 0o600))
+        os.chmod(self.db_path, 0o600)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key           TEXT PRIMARY KEY,
+                site          TEXT NOT NULL,
+                route         TEXT NOT NULL,
+                headers       TEXT NOT NULL,
+                body          BLOB NOT NULL,
+                etag          TEXT,
+                last_modified TEXT,
+                size          INTEGER NOT NULL,
+                expires_at    REAL NOT NULL,
+                accessed_at   REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_route ON responses (site, route)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """キャッシュを閉じる。"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def key(user: str, url: str, params: dict = None) -> str:
+        """
+        キャッシュキーを作る。
+
+        認証ユーザーによって返る内容（非公開の投稿など）が変わるため、ユーザー名も含める。
+        クエリパラメータは順序に依存しないよう並べ替える。
+        """
+        query = urlencode(sorted((params or {}).items()))
+        return f"{user}\n{url}?{query}" if query else f"{user}\n{url}"
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """
+        保存済みのレスポンスを返す。
+
+        Returns:
+            dict: {"headers", "body", "etag", "last_modified", "expires_at"}。
+                  未保存なら None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body, etag, last_modified, expires_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "headers": json.loads(row[0]),
+            "body": row[1],
+            "etag": row[2],
+            "last_modified": row[3],
+            "expires_at": row[4],
+        }
+
+    @staticmethod
+    def is_fresh(entry: dict) -> bool:
+        """max-age の期限内で、再検証せずに使えるなら True。"""
+        return time.time() < entry["expires_at"]
+
+    @staticmethod
+    def conditional_headers(entry: Optional[dict]) -> dict:
+        """再検証リクエストに付けるヘッダーを返す。"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def to_response(entry: dict, url: str) -> httpx.Response:
+        """保存済みのエントリを httpx.Response に戻す。"""
+        return httpx.Response(
+            200,
+            headers=entry["headers"],
+            content=entry["body"],
+            request=httpx.Request("GET", url),
+        )
+
+    def store(self, key: str, site: str, route: str, resp: httpx.Response) -> None:
+        """
+        レスポンスを保存する。検証子（ETag / Last-Modified）のない 200 以外は保存しない。
+
+        Args:
+            key: key() で作ったキャッシュキー
+            site: サイトURL
+            route: cache_route() で求めたコレクション
+            resp: GET のレスポンス（本文は読み込み済みであること）
+        """
+        cache_control = resp.headers.get("Cache-Control", "").lower()
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.status_code != 200 or "no-store" in cache_control:
+            return
+        if not etag and not last_modified:
+            return
+
+        body = resp.content
+        if len(body) > self.max_bytes:
+            return
+        headers = {
+            k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS
+        }
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, site, route, headers, body, etag, last_modified, size, "
+                "expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, site, route, json.dumps(headers), body, etag, last_modified,
+                 len(body), now + _max_age(cache_control), now),
+            )
+            evict_lru(self._conn, "responses", self.max_bytes)
+            self._conn.commit()
+
+    def revalidated(self, key: str, resp: httpx.Response) -> None:
+        """304 を受け取ったエントリの有効期限と最終使用時刻を更新する。"""
+        cache_control = resp.headers.get("Cache-Control", "").lower()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (now + _max_age(cache_control), now, key),
+            )
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """エントリの最終使用時刻を更新する（LRU用）。"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key),
+            )
+            self._conn.commit()
+
+    def invalidate(self, site: str, route: str) -> None:
+        """コレクションに属するエントリをすべて破棄する（書き込み後に呼ぶ）。"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM responses WHERE site = ? AND route = ?", (site, route),
+            )
+            self._conn.commit()
+
+
+def _max_age(cache_control: str) -> float:
+    """Cache-Control から再検証不要な秒数を返す（no-cache や指定なしは 0）。"""
+    if "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE_RE.search(cache_control)
+    return float(match.group(1)) if match else 0.0
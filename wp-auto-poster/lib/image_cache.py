@@ -0,0 +1,134 @@
+"""
+Gemini で生成した画像のローカルキャッシュ
+
+生成に使った条件（モデル・補足指示を含むプロンプト全文・アスペクト比・画像サイズ）の
+ハッシュをキーに、生成された画像のバイト列を SQLite に保存する。
+同じ条件の画像を再び生成しようとしたときは API を呼ばずに保存済みの画像を書き出すため、
+失敗後の再実行や一部のプロンプトだけ直した再生成で、変わっていない画像の費用と時間がかからない。
+
+容量は max_bytes を上限とし、超えた分は最後に使われた時刻が古い順に捨てる（LRU）。
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from lib.config import CACHE_DIR, GEMINI_IMAGE_CACHE_MB
+    from lib.sqlite_lru import evict_lru
+except ImportError:
+    from config import CACHE_DIR, GEMINI_IMAGE_CACHE_MB
+    from sqlite_lru import evict_lru
+
+# キャッシュファイルのデフォルトパス
+DEFAULT_DB_PATH: Path = CACHE_DIR / "image_cache.sqlite3"
+
+# キャッシュ全体の容量上限（バイト）
+DEFAULT_MAX_BYTES = GEMINI_IMAGE_CACHE_MB * 1024 * 1024
+
+
+def generation_key(model: str, prompt: str, aspect_ratio: str,
+                   image_size: str = None) -> str:
+    """生成条件からキャッシュキー（SHA-256）を作る。"""
+    data = json.dumps(
+        [model, prompt, aspect_ratio, image_size], ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """
+    生成した画像のキャッシュ。
+
+    並行生成のスレッドから使われても安全なように、接続は1本をロックで保護する。
+    """
+
+    def __init__(self, db_path: Path = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        キャッシュを開く（なければ作成する）。
+
+        Args:
+            db_path: SQLiteファイルのパス（省略時は DEFAULT_DB_PATH）
+            max_bytes: 保存する画像の合計サイズの上限
+        """
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS images (
+                key         TEXT PRIMARY KEY,
+                model       TEXT NOT NULL,
+                body        BLOB NOT NULL,
+                size        INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                hits        INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS images_accessed ON images (accessed_at)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """キャッシュを閉じる。"""
+        with self._lock:
+            self._conn.close()
+
+    def contains(self, key: str) -> bool:
+        """画像が保存されているか（最終使用時刻は更新しない）。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM images WHERE key = ?", (key,),
+            ).fetchone()
+        return row is not None
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        """
+        保存済みの画像を返し、最終使用時刻とヒット数を更新する。
+
+        Returns:
+            bytes: 画像のバイト列。未保存なら None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM images WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE images SET accessed_at = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+        return row[0]
+
+    def store(self, key: str, model: str, body: bytes) -> None:
+        """生成した画像を保存する。上限を超える大きさの画像は保存しない。"""
+        if not body or len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images "
+                "(key, model, body, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, body, len(body), now, now),
+            )
+            evict_lru(self._conn, "images", self.max_bytes)
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """保存枚数・合計サイズ・累計ヒット数。"""
+        with self._lock:
+            count, total, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM images"
+            ).fetchone()
+        return {"images": count, "bytes": total, "hits": hits}
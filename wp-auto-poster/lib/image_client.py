@@ -8,6 +8,9 @@ Google Gemini API（Nano Banana / Nano Banana Pro）を使用して、
     # image_requests.json から一括生成
     python lib/image_client.py --request drafts/slug/image_requests.json --output drafts/slug/images/
 
+    # キャッシュを使わずにすべて生成し直す
+    python lib/image_client.py --request drafts/slug/image_requests.json --output drafts/slug/images/ --no-cache
+
     # APIキーの動作確認テスト
     python lib/image_client.py --test
 """
@@ -15,8 +18,12 @@ Google Gemini API（Nano Banana / Nano Banana Pro）を使用して、
 import argparse
 import json
 import logging
+import sqlite3
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from google import genai
@@ -28,6 +35,7 @@ if str(_lib_dir.parent) not in sys.path:
     sys.path.insert(0, str(_lib_dir.parent))
 
 from lib import config  # noqa: E402
+from lib.image_cache import ImageCache, generation_key  # noqa: E402
 from lib.usage_tracker import UsageTracker  # noqa: E402
 
 # ロガー設定
@@ -39,6 +47,55 @@ class ImageGenerationError(Exception):
     pass
 
 
+class RateLimiter:
+    """スレッド間で共有するスライディングウィンドウ方式のレートリミッター。
+
+    直近 60 秒間に送ったリクエストの時刻を保持し、その件数が
+    requests_per_minute に達していれば、最も古いものが窓から外れるまで待つ。
+    どの 60 秒間を取っても requests_per_minute 回を超えない
+    （1 未満の RPM は 60 / RPM 秒に1回）。
+    """
+
+    def __init__(self, requests_per_minute: float):
+        """
+        Args:
+            requests_per_minute: 1分あたりに許可するリクエスト数。0 以下なら制限しない。
+        """
+        self.requests_per_minute = requests_per_minute
+        if requests_per_minute > 0:
+            self._limit = max(1, int(requests_per_minute))
+            self._window = 60.0 * self._limit / requests_per_minute
+        self._sent: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """リクエスト1回分の枠を確保する。
+
+        Returns:
+            待機した秒数。
+        """
+        if self.requests_per_minute <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and self._sent[0] <= now - self._window:
+                    self._sent.popleft()
+                if len(self._sent) < self._limit:
+                    self._sent.append(now)
+                    return waited
+                wait = self._sent[0] + self._window - now
+            time.sleep(wait)
+            waited += wait
+
+    def describe(self) -> str:
+        """ログ用の設定の説明。"""
+        if self.requests_per_minute <= 0:
+            return "流量制限なし"
+        return f"{self.requests_per_minute:g}回/分まで"
+
+
 class BlogImageGenerator:
     """Google Gemini API を使ったブログ画像生成クライアント。
 
@@ -63,14 +120,20 @@ class BlogImageGenerator:
         "テキストや文字は含めないでください。"
     )
 
-    # リクエスト間のクールダウン（レート制限対策）
-    _REQUEST_INTERVAL: float = 2.0
-
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        requests_per_minute: float = None,
+        concurrency: int = None,
+        use_cache: bool = True,
+    ):
         """Google Gemini API クライアントを初期化する。
 
         Args:
             api_key: Google API キー。省略時は config.GOOGLE_API_KEY を使用。
+            requests_per_minute: API の割り当て（RPM）。省略時は config.GEMINI_IMAGE_RPM。
+            concurrency: 同時に生成する枚数。省略時は config.GEMINI_IMAGE_CONCURRENCY。
+            use_cache: False にすると生成キャッシュを参照・保存せず、毎回 API で生成する。
 
         Raises:
             ValueError: APIキーが設定されていない場合。
@@ -84,6 +147,14 @@ class BlogImageGenerator:
             )
         self._client = genai.Client(api_key=self._api_key)
         self._tracker = UsageTracker()
+        # 使用量ファイルは読み込み→書き込みで更新するため、並行生成中は1スレッドずつ記録する
+        self._tracker_lock = threading.Lock()
+        self._concurrency = max(1, concurrency or config.GEMINI_IMAGE_CONCURRENCY)
+        self._limiter = RateLimiter(
+            requests_per_minute if requests_per_minute is not None else config.GEMINI_IMAGE_RPM,
+        )
+        # 同じ条件（モデル・プロンプト全文・アスペクト比・サイズ）の画像は API を呼ばずに再利用する
+        self._cache = ImageCache() if use_cache else None
         logger.info("BlogImageGenerator を初期化しました")
 
     # ──────────────────────────────────────────────
@@ -106,18 +177,9 @@ class BlogImageGenerator:
         Returns:
             保存先の絶対パス文字列。
         """
-        # プロンプトにスタイルと補足指示を付加
-        full_prompt = f"{prompt}\nスタイル: {style}\n{self._EYECATCH_SUFFIX}"
-
-        result = self._generate(
-            prompt=full_prompt,
-            output_path=output_path,
-            model=config.EYECATCH_MODEL,
-            aspect_ratio=config.EYECATCH_ASPECT,
-            image_size=config.EYECATCH_SIZE,
+        return self._generate_cached(
+            output_path=output_path, **self._eyecatch_params(prompt, style),
         )
-        self._tracker.record("eyecatch", config.EYECATCH_MODEL, config.EYECATCH_SIZE)
-        return result
 
     def generate_illustration(self, prompt: str, output_path: str) -> str:
         """記事内挿絵を生成する（Nano Banana Flash 使用）。
@@ -129,29 +191,31 @@ class BlogImageGenerator:
         Returns:
             保存先の絶対パス文字列。
         """
-        # プロンプトに補足指示を付加
-        full_prompt = f"{prompt}\n{self._ILLUSTRATION_SUFFIX}"
-
-        result = self._generate(
-            prompt=full_prompt,
-            output_path=output_path,
-            model=config.ILLUSTRATION_MODEL,
-            aspect_ratio=config.ILLUSTRATION_ASPECT,
+        return self._generate_cached(
+            output_path=output_path, **self._illustration_params(prompt),
         )
-        self._tracker.record("illustration", config.ILLUSTRATION_MODEL)
-        return result
 
     def generate_from_requests(
-        self, requests_path: str, output_dir: str
+        self, requests_path: str, output_dir: str, concurrency: int = None
     ) -> dict:
         """image_requests.json を読み込み、全画像を一括生成する。
 
+        アイキャッチと挿絵は最大 concurrency 枚ずつ並行して生成し、
+        API の呼び出しはレートリミッター（GEMINI_IMAGE_RPM）の範囲に収める。
+        以前と同じ条件の画像は生成キャッシュから書き出し、API を呼ばない。
+        出力ファイル名と image_results.json の並びはリクエスト順のまま。
+        1枚でも失敗した場合は未着手の生成を取り消し、生成できた分と
+        失敗・取り消した画像ID（"failed"）を image_results.json に書いてから例外を送出する。
+
         月次予算を超過している場合は API 生成をスキップし、
         プロンプトのみを image_prompts_manual.md に出力する。
+        ただし、すべての画像が生成キャッシュにあれば API を呼ばないため、そのまま書き出す。
 
         Args:
             requests_path: image_requests.json のパス。
             output_dir: 画像出力先ディレクトリ。
+            concurrency: 同時に生成する枚数。省略時はコンストラクタの値。
+                1 にすると1枚ずつ生成する。
 
         Returns:
             生成結果の辞書:
@@ -170,18 +234,33 @@ class BlogImageGenerator:
         with open(requests_path, "r", encoding="utf-8") as f:
             image_requests = json.load(f)
 
+        # ── 生成する画像をリクエスト順に並べる（出力ファイル名は従来どおり固定） ──
+        jobs = []  # (種類, リクエスト, 画像ID, 出力パス)
+        eyecatch_req = image_requests.get("eyecatch")
+        if eyecatch_req:
+            jobs.append(("eyecatch", eyecatch_req, "eyecatch", output_dir / "eyecatch.png"))
+        for i, illust_req in enumerate(image_requests.get("illustrations", [])):
+            illust_id = illust_req.get("id", f"illust_{i + 1}")
+            jobs.append(("illustration", illust_req, illust_id,
+                         output_dir / f"illustration_{i + 1}.png"))
+
         # ── 予算チェック ──
         budget = self._tracker.check_budget()
         if budget["should_warn"]:
             logger.warning(
-                f"Gemini API 予算警告: 今月 ${budget['total_cost_usd']:.4f} / "
-                f"予算 ${budget['budget_usd']:.2f} "
+                f"Gemini API 予算警告: 今月 ¥{budget['display_jpy']:,} / "
+                f"予算 ¥{budget['budget_jpy']:,} "
                 f"({budget['budget_used_pct']:.1f}%)"
             )
-        if budget["should_skip"]:
+        if budget["should_skip"] and self._all_cached(jobs):
+            logger.warning(
+                "Gemini API 予算超過ですが、すべての画像が生成キャッシュにあるため、"
+                "API を呼ばずに書き出します。"
+            )
+        elif budget["should_skip"]:
             logger.error(
-                f"Gemini API 予算超過: ${budget['total_cost_usd']:.4f} >= "
-                f"${budget['budget_usd']:.2f}。API 生成をスキップします。"
+                f"Gemini API 予算超過: ¥{budget['display_jpy']:,} >= "
+                f"¥{budget['budget_jpy']:,}。API 生成をスキップします。"
             )
             prompts_file = self._write_prompts_only(
                 image_requests=image_requests,
@@ -196,73 +275,81 @@ class BlogImageGenerator:
                 "budget_stats": budget,
             }
 
+        # ── 並行して生成（API 呼び出しの間隔はレートリミッターが調整する） ──
+        workers = max(1, min(concurrency or self._concurrency, len(jobs) or 1))
+        logger.info(
+            f"画像を生成中... ({len(jobs)}枚、同時{workers}枚、"
+            f"{self._limiter.describe()})"
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._generate_request, *job) for job in jobs]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            # 1枚でも失敗したら、まだ始まっていない生成は取り消す（実行中のものは完了を待つ）
+            for future in futures:
+                future.cancel()
+
+        # ── 結果はリクエスト順に組み立てる ──
         results = {"eyecatch": None, "illustrations": []}
-
-        # ── アイキャッチ生成 ──
-        eyecatch_req = image_requests.get("eyecatch")
-        if eyecatch_req:
-            eyecatch_path = output_dir / "eyecatch.png"
-            style = eyecatch_req.get("style", "モダンでクリーンなデザイン")
-            logger.info("アイキャッチ画像を生成中...")
-
-            try:
-                saved_path = self.generate_eyecatch(
-                    prompt=eyecatch_req["prompt"],
-                    output_path=str(eyecatch_path),
-                    style=style,
-                )
-                # alt テキスト: リクエストに指定があればそれを使い、なければプロンプトから生成
-                alt_text = eyecatch_req.get("alt", eyecatch_req["prompt"][:100])
-                results["eyecatch"] = {
-                    "path": str(Path(saved_path).relative_to(output_dir.parent)),
-                    "alt": alt_text,
-                }
-                logger.info(f"アイキャッチ画像を保存しました: {saved_path}")
-            except ImageGenerationError as e:
-                logger.error(f"アイキャッチ画像の生成に失敗しました: {e}")
-                raise
-
-            # レート制限対策のクールダウン
-            time.sleep(self._REQUEST_INTERVAL)
-
-        # ── 挿絵を順次生成 ──
-        illustrations = image_requests.get("illustrations", [])
-        for i, illust_req in enumerate(illustrations):
-            illust_id = illust_req.get("id", f"illust_{i + 1}")
-            illust_filename = f"illustration_{i + 1}.png"
-            illust_path = output_dir / illust_filename
-
-            logger.info(f"挿絵 [{illust_id}] を生成中... ({i + 1}/{len(illustrations)})")
-
-            try:
-                saved_path = self.generate_illustration(
-                    prompt=illust_req["prompt"],
-                    output_path=str(illust_path),
-                )
-                results["illustrations"].append({
-                    "id": illust_id,
-                    "path": str(Path(saved_path).relative_to(output_dir.parent)),
-                    "alt": illust_req.get("alt", illust_req["prompt"][:100]),
-                    "caption": illust_req.get("caption", ""),
-                })
-                logger.info(f"挿絵 [{illust_id}] を保存しました: {saved_path}")
-            except ImageGenerationError as e:
-                logger.error(f"挿絵 [{illust_id}] の生成に失敗しました: {e}")
-                raise
-
-            # 最後の画像以外はクールダウンを挿入
-            if i < len(illustrations) - 1:
-                time.sleep(self._REQUEST_INTERVAL)
-
-        # ── 結果を image_results.json として保存 ──
+        error = None
+        failed = []
+        for (kind, _, image_id, _), future in zip(jobs, futures):
+            if future.cancelled():
+                failed.append(image_id)
+                continue
+            if future.exception() is not None:
+                logger.error(f"画像 [{image_id}] の生成に失敗しました: {future.exception()}")
+                error = error or future.exception()
+                failed.append(image_id)
+                continue
+            if kind == "eyecatch":
+                results["eyecatch"] = future.result()
+            else:
+                results["illustrations"].append(future.result())
+
+        # ── 結果を image_results.json として保存（失敗時も生成できた分は残す） ──
         results["budget_skipped"] = False
+        if failed:
+            results["failed"] = failed
         results_path = output_dir.parent / "image_results.json"
         with open(results_path, "w", encoding="utf-8") as f:
             json.dump(results, f, ensure_ascii=False, indent=2)
         logger.info(f"画像生成結果を保存しました: {results_path}")
 
+        if error is not None:
+            raise error
         return results
 
+    def _generate_request(
+        self, kind: str, request: dict, image_id: str, output_path: Path
+    ) -> dict:
+        """generate_from_requests の1枚分。image_results.json に入れるエントリを返す。"""
+        if kind == "eyecatch":
+            logger.info("アイキャッチ画像を生成中...")
+            saved_path = self.generate_eyecatch(
+                prompt=request["prompt"],
+                output_path=str(output_path),
+                style=request.get("style", "モダンでクリーンなデザイン"),
+            )
+            logger.info(f"アイキャッチ画像を保存しました: {saved_path}")
+            # alt テキスト: リクエストに指定があればそれを使い、なければプロンプトから生成
+            return {
+                "path": str(Path(saved_path).relative_to(output_path.parent.parent)),
+                "alt": request.get("alt", request["prompt"][:100]),
+            }
+
+        logger.info(f"挿絵 [{image_id}] を生成中...")
+        saved_path = self.generate_illustration(
+            prompt=request["prompt"],
+            output_path=str(output_path),
+        )
+        logger.info(f"挿絵 [{image_id}] を保存しました: {saved_path}")
+        return {
+            "id": image_id,
+            "path": str(Path(saved_path).relative_to(output_path.parent.parent)),
+            "alt": request.get("alt", request["prompt"][:100]),
+            "caption": request.get("caption", ""),
+        }
+
     def _write_prompts_only(
         self,
         image_requests: dict,
@@ -281,8 +368,8 @@ class BlogImageGenerator:
             "# 画像生成プロンプト（手動生成用）",
             "",
             "> **Gemini API 月次予算超過のため、自動生成をスキップしました。**",
-            f"> 今月の累計コスト: **${budget_stats['total_cost_usd']:.4f}**"
-            f" / 予算: ${budget_stats['budget_usd']:.2f}",
+            f"> 今月の累計コスト: **¥{budget_stats['display_jpy']:,}**"
+            f" / 予算: ¥{budget_stats['budget_jpy']:,}",
             ">",
             "> 以下のプロンプトを [Google AI Studio](https://aistudio.google.com/) に貼り付けて手動生成してください。",
             "> モデル: `gemini-3.1-flash-image-preview`（または `gemini-2.0-flash-exp`）",
@@ -402,6 +489,101 @@ class BlogImageGenerator:
     # 内部メソッド
     # ──────────────────────────────────────────────
 
+    def _eyecatch_params(self, prompt: str, style: str) -> dict:
+        """アイキャッチ画像の生成条件（_generate_cached の引数）。"""
+        return {
+            "image_type": "eyecatch",
+            # プロンプトにスタイルと補足指示を付加
+            "prompt": f"{prompt}\nスタイル: {style}\n{self._EYECATCH_SUFFIX}",
+            "model": config.EYECATCH_MODEL,
+            "aspect_ratio": config.EYECATCH_ASPECT,
+            "image_size": config.EYECATCH_SIZE,
+        }
+
+    def _illustration_params(self, prompt: str) -> dict:
+        """挿絵の生成条件（_generate_cached の引数）。"""
+        return {
+            "image_type": "illustration",
+            # プロンプトに補足指示を付加
+            "prompt": f"{prompt}\n{self._ILLUSTRATION_SUFFIX}",
+            "model": config.ILLUSTRATION_MODEL,
+            "aspect_ratio": config.ILLUSTRATION_ASPECT,
+        }
+
+    def _request_params(self, kind: str, request: dict) -> dict:
+        """image_requests.json の1件の生成条件。"""
+        if kind == "eyecatch":
+            return self._eyecatch_params(
+                request["prompt"], request.get("style", "モダンでクリーンなデザイン"),
+            )
+        return self._illustration_params(request["prompt"])
+
+    def _all_cached(self, jobs: list) -> bool:
+        """generate_from_requests のすべての画像が生成キャッシュにあるか。"""
+        if self._cache is None or not jobs:
+            return False
+        for kind, request, _, _ in jobs:
+            params = self._request_params(kind, request)
+            key = generation_key(params["model"], params["prompt"],
+                                 params["aspect_ratio"], params.get("image_size"))
+            if not self._cache.contains(key):
+                return False
+        return True
+
+    def _generate_cached(
+        self,
+        image_type: str,
+        prompt: str,
+        output_path: str,
+        model: str,
+        aspect_ratio: str,
+        image_size: str = None,
+    ) -> str:
+        """生成キャッシュを確認してから画像を生成し、使用量を記録する。
+
+        キャッシュにあれば API を呼ばずにその画像を書き出し、UsageTracker には
+        キャッシュヒットとして記録する（生成枚数・概算コストには含めない）。
+
+        Args:
+            image_type: "eyecatch" / "illustration"（使用量の記録用）。
+            prompt: 補足指示まで付加したプロンプト全文。
+            output_path: 保存先ファイルパス。
+            model: 使用するモデル名。
+            aspect_ratio: アスペクト比。
+            image_size: 画像サイズ（Nano Banana Pro のみ）。
+
+        Returns:
+            保存先の絶対パス文字列。
+        """
+        key = generation_key(model, prompt, aspect_ratio, image_size)
+        if self._cache is not None:
+            body = self._cache.lookup(key)
+            if body is not None:
+                output_path = Path(output_path)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                output_path.write_bytes(body)
+                logger.info(f"キャッシュから画像を書き出しました: {output_path}")
+                with self._tracker_lock:
+                    self._tracker.record_cache_hit(image_type, model, image_size)
+                return str(output_path.resolve())
+
+        result = self._generate(
+            prompt=prompt,
+            output_path=output_path,
+            model=model,
+            aspect_ratio=aspect_ratio,
+            image_size=image_size,
+        )
+        with self._tracker_lock:
+            self._tracker.record(image_type, model, image_size)
+        if self._cache is not None:
+            try:
+                self._cache.store(key, model, Path(result).read_bytes())
+            except sqlite3.Error as e:
+                # 生成した画像は保存済み。キャッシュに入らないだけなので処理は続ける
+                logger.warning(f"生成キャッシュに保存できませんでした: {e}")
+        return result
+
     def _generate(
         self,
         prompt: str,
@@ -448,6 +630,7 @@ class BlogImageGenerator:
                     f"model={model}, aspect={aspect_ratio}, size={image_size}"
                 )
 
+                self._limiter.acquire()
                 response = self._client.models.generate_content(
                     model=model,
                     contents=prompt,
@@ -592,6 +775,9 @@ def main():
   # image_requests.json から一括生成
   python lib/image_client.py --request drafts/slug/image_requests.json --output drafts/slug/images/
 
+  # キャッシュを使わずにすべて生成し直す
+  python lib/image_client.py --request drafts/slug/image_requests.json --output drafts/slug/images/ --no-cache
+
   # APIキーの動作確認テスト
   python lib/image_client.py --test
         """,
@@ -607,6 +793,17 @@ def main():
         type=str,
         help="画像出力先ディレクトリ",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="同時に生成する枚数（既定: .env の GEMINI_IMAGE_CONCURRENCY。1 で1枚ずつ）",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="生成キャッシュを使わず、すべての画像を API で生成し直す",
+    )
     parser.add_argument(
         "--test",
         action="store_true",
@@ -633,6 +830,12 @@ def main():
             [sys.executable, str(_lib_dir / "usage_tracker.py")],
             capture_output=False,
         )
+        cache = ImageCache()
+        stats = cache.stats()
+        print(f"  生成キャッシュ  : {stats['images']} 枚 "
+              f"{stats['bytes'] / 1024 / 1024:.1f}MB / 上限 {cache.max_bytes / 1024 / 1024:.0f}MB"
+              f"（累計ヒット {stats['hits']} 回）")
+        cache.close()
         sys.exit(result.returncode)
 
     # テストモード
@@ -650,10 +853,11 @@ def main():
             sys.exit(1)
 
         try:
-            generator = BlogImageGenerator()
+            generator = BlogImageGenerator(use_cache=not args.no_cache)
             results = generator.generate_from_requests(
                 requests_path=str(requests_path),
                 output_dir=str(output_dir),
+                concurrency=args.concurrency,
             )
             print(f"\n画像生成が完了しました:")
             if results["eyecatch"]:
@@ -0,0 +1,168 @@
+"""
+image_results.json の画像マニフェスト
+
+image_results.json を1回だけ読み込み、形式の違いを吸収した ImageRecord の索引にする。
+ファイル名・画像IDでの検索は dict の参照1回で済む。
+投稿・更新・一括処理はいずれも draft_build.build_draft からこの索引を使う。
+
+対応する形式:
+    新形式（image_client.py 出力）:
+        {
+            "eyecatch": {"path": "images/eyecatch.png", "alt": "..."},
+            "illustrations": [{"id": "illust_1", "path": "images/illustration_1.png", "alt": "...", "caption": "..."}],
+            "diagrams":      [{"id": "diagram_1",  "path": "images/diagram_1.png",  "alt": "...", "caption": "..."}],
+            "screenshots":   [...],
+            "uploaded_media": {"image_id": {"id": ..., "url": ...}}
+        }
+
+    旧形式（後方互換）:
+        {"images": [{"id": "eyecatch", "filename": "eyecatch.png", "alt": "...", "eyecatch": true}, ...]}
+        {"images": {"eyecatch": {"filename": "eyecatch.png", ...}}}
+
+    リスト形式:
+        [{"id": "diagram_1", "path": "images/diagram_1.png", ...}, ...]
+"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+# 新形式で画像のリストを持つキー
+_SECTION_KEYS = ("illustrations", "diagrams", "screenshots")
+
+
+class ImageRecord:
+    """マニフェストの画像1件（形式によらず同じ項目を持つ）。"""
+
+    __slots__ = ("id", "filename", "alt", "title", "caption", "eyecatch")
+
+    def __init__(self, id: Optional[str], filename: Optional[str], alt: str = "",
+                 title: str = "", caption: str = "", eyecatch: bool = False):
+        self.id = id
+        self.filename = filename
+        self.alt = alt
+        self.title = title
+        self.caption = caption
+        self.eyecatch = eyecatch
+
+    @classmethod
+    def from_entry(cls, entry: dict, default_id: str = None,
+                   eyecatch: bool = False) -> "ImageRecord":
+        """マニフェストの1エントリ（path または filename を持つ dict）から作る。"""
+        path = entry.get("path") or entry.get("filename")
+        return cls(
+            id=entry.get("id") or default_id,
+            filename=Path(path).name if path else None,
+            alt=entry.get("alt") or "",
+            title=entry.get("title") or "",
+            caption=entry.get("caption") or "",
+            eyecatch=bool(entry.get("eyecatch", eyecatch)),
+        )
+
+    def __repr__(self) -> str:
+        return f"ImageRecord(id={self.id!r}, filename={self.filename!r})"
+
+
+class ImageManifest:
+    """
+    画像マニフェストの索引。
+
+    使用例:
+        manifest = ImageManifest.load(draft_path / "image_results.json")
+        record = manifest.lookup("illustration_1.png")
+    """
+
+    __slots__ = ("records", "uploaded_media", "_by_filename", "_by_id",
+                 "_prefixed", "_prefixed_by_id")
+
+    def __init__(self, records: list[ImageRecord], uploaded_media: dict = None,
+                 prefixed: list[ImageRecord] = None):
+        """
+        Args:
+            records: 画像の一覧（優先度の高い順）
+            uploaded_media: アップロード済みメディア（image_id → {"id", "url"}）
+            prefixed: ファイル名が ID で始まるだけでも一致させる旧形式の画像
+        """
+        self.records = records
+        self.uploaded_media = uploaded_media or {}
+        self._by_filename: dict[str, ImageRecord] = {}
+        self._by_id: dict[str, ImageRecord] = {}
+        for record in records:
+            if record.filename:
+                self._by_filename.setdefault(record.filename, record)
+            if record.id:
+                self._by_id.setdefault(record.id, record)
+        self._prefixed = [r for r in (prefixed or ()) if r.id]
+        self._prefixed_by_id: dict[str, ImageRecord] = {}
+        for record in self._prefixed:
+            self._prefixed_by_id.setdefault(record.id, record)
+
+    @classmethod
+    def load(cls, path: Path) -> "ImageManifest":
+        """image_results.json を読み込む（ない場合は空のマニフェスト）。"""
+        path = Path(path)
+        if not path.exists():
+            return cls([])
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_data(json.load(f))
+
+    @classmethod
+    def from_data(cls, data) -> "ImageManifest":
+        """読み込み済みの image_results.json の内容から作る。"""
+        if isinstance(data, list):
+            records = [ImageRecord.from_entry(item) for item in data if isinstance(item, dict)]
+            return cls(records, prefixed=records)
+        if not isinstance(data, dict):
+            return cls([])
+
+        records = []
+        eyecatch = data.get("eyecatch")
+        if isinstance(eyecatch, dict):
+            records.append(ImageRecord.from_entry(eyecatch, default_id="eyecatch", eyecatch=True))
+        for key in _SECTION_KEYS:
+            items = data.get(key)
+            if isinstance(items, list):
+                records.extend(ImageRecord.from_entry(item) for item in items if isinstance(item, dict))
+
+        legacy = data.get("images", [])
+        prefixed = []
+        if isinstance(legacy, list):
+            prefixed = [ImageRecord.from_entry(item) for item in legacy if isinstance(item, dict)]
+            records.extend(prefixed)
+        elif isinstance(legacy, dict):
+            records.extend(
+                ImageRecord.from_entry(info, default_id=image_id)
+                for image_id, info in legacy.items() if isinstance(info, dict)
+            )
+
+        uploaded = data.get("uploaded_media")
+        return cls(records, uploaded if isinstance(uploaded, dict) else {}, prefixed)
+
+    def by_filename(self, filename: str) -> Optional[ImageRecord]:
+        """ファイル名が一致する画像。"""
+        return self._by_filename.get(filename)
+
+    def by_id(self, image_id: str) -> Optional[ImageRecord]:
+        """画像IDが一致する画像。"""
+        return self._by_id.get(image_id)
+
+    def lookup(self, filename: str) -> Optional[ImageRecord]:
+        """
+        images/ のファイル名に対応する画像を探す。
+
+        ファイル名の一致を優先し、なければ旧形式・リスト形式の
+        「ファイル名が画像IDで始まる」エントリ（例: ID "eyecatch" → eyecatch_v2.png）を探す。
+        """
+        record = self._by_filename.get(filename)
+        if record is not None or not self._prefixed:
+            return record
+        record = self._prefixed_by_id.get(Path(filename).stem)
+        if record is not None:
+            return record
+        for record in self._prefixed:
+            if filename.startswith(record.id):
+                return record
+        return None
+
+    def __len__(self) -> int:
+        return len(self.records)
@@ -0,0 +1,562 @@
+"""
+SQLite による永続ジョブキュー
+
+画像生成・スクリーンショット・図解レンダリング・投稿・更新を「ジョブ」として
+SQLite（config.JOBS_DB_PATH）に積み、ワーカープロセス（lib/job_worker.py）が取り出して実行する。
+外部サービスは使わず、複数の CLI やワーカーから同時に使っても1つのキューを共有する。
+
+バックエンド（Gemini / WordPress / Chromium）ごとに
+  - 同時に実行するジョブ数
+  - 1分あたりに開始するジョブ数（トークンバケット。状態は SQLite に持つので全プロセスで共有）
+を制限し、枠が空くまでジョブは取り出されない。
+
+失敗したジョブは間隔を空けて再試行し、max_attempts 回失敗すると dead（デッドレター）になる。
+dead のジョブは --action retry で再投入できる。
+
+使用方法:
+    # 下書きの画像生成と投稿を積む（投稿は画像生成の完了後に実行）
+    python lib/job_queue.py --action enqueue --type images --draft-dir drafts/slug/
+    python lib/job_queue.py --action enqueue --type publish --draft-dir drafts/slug/ --after 1
+
+    # ワーカーを4プロセス起動（--drain で実行できるジョブがなくなったら終了）
+    python lib/job_queue.py --action work --workers 4
+
+    # 状況の確認・dead の再投入
+    python lib/job_queue.py --action status
+    python lib/job_queue.py --action retry --job-id 12
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from lib.config import (
+        DRAFTS_DIR, JOBS_DB_PATH, JOB_WORKERS,
+        GEMINI_JOBS_PER_MINUTE, GEMINI_MAX_CONCURRENT,
+        WORDPRESS_JOBS_PER_MINUTE, WORDPRESS_MAX_CONCURRENT,
+        CHROMIUM_JOBS_PER_MINUTE, CHROMIUM_MAX_CONCURRENT,
+    )
+except ImportError:
+    from config import (
+        DRAFTS_DIR, JOBS_DB_PATH, JOB_WORKERS,
+        GEMINI_JOBS_PER_MINUTE, GEMINI_MAX_CONCURRENT,
+        WORDPRESS_JOBS_PER_MINUTE, WORDPRESS_MAX_CONCURRENT,
+        CHROMIUM_JOBS_PER_MINUTE, CHROMIUM_MAX_CONCURRENT,
+    )
+
+# ジョブの状態
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+JOB_STATUSES = (QUEUED, RUNNING, DONE, DEAD)
+
+# ジョブの種類 → 使うバックエンド
+JOB_TYPES = {
+    "images": "gemini",
+    "screenshots": "chromium",
+    "diagrams": "chromium",
+    "publish": "wordpress",
+    "update": "wordpress",
+}
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# 再試行までの待ち時間（秒）。RETRY_BASE_DELAY から失敗するたびに倍にする
+RETRY_BASE_DELAY = 30.0
+RETRY_MAX_DELAY = 600.0
+
+
+class BackendLimit:
+    """
+    1つのバックエンドの流量制限。
+
+    Attributes:
+        per_minute: 1分あたりに開始できるジョブ数（0 以下なら制限なし）
+        max_concurrent: 同時に実行できるジョブ数
+    """
+
+    def __init__(self, per_minute: float, max_concurrent: int):
+        self.per_minute = per_minute
+        self.max_concurrent = max(1, max_concurrent)
+
+
+DEFAULT_LIMITS = {
+    "gemini": BackendLimit(GEMINI_JOBS_PER_MINUTE, GEMINI_MAX_CONCURRENT),
+    "wordpress": BackendLimit(WORDPRESS_JOBS_PER_MINUTE, WORDPRESS_MAX_CONCURRENT),
+    "chromium": BackendLimit(CHROMIUM_JOBS_PER_MINUTE, CHROMIUM_MAX_CONCURRENT),
+}
+
+
+class Job:
+    """キューから取り出したジョブ1件。"""
+
+    def __init__(self, row: sqlite3.Row):
+        self.id: int = row["id"]
+        self.type: str = row["type"]
+        self.payload: dict = json.loads(row["payload"])
+        self.status: str = row["status"]
+        self.attempts: int = row["attempts"]
+        self.max_attempts: int = row["max_attempts"]
+        self.depends_on: Optional[int] = row["depends_on"]
+        self.created_at: float = row["created_at"]
+        self.finished_at: Optional[float] = row["finished_at"]
+        self.last_error: Optional[str] = row["last_error"]
+        self.result = json.loads(row["result"]) if row["result"] else None
+
+    @property
+    def backend(self) -> str:
+        return JOB_TYPES[self.type]
+
+    def describe(self) -> str:
+        """一覧表示用の短い説明（対象の下書き名など）。"""
+        draft = self.payload.get("draft_dir")
+        return Path(draft).name if draft else json.dumps(self.payload, ensure_ascii=False)
+
+    def __repr__(self) -> str:
+        return f"Job(id={self.id}, type={self.type!r}, status={self.status!r})"
+
+
+class JobQueue:
+    """
+    SQLite に保存するジョブキュー。
+
+    プロセスごとに1つ作って使う（接続はプロセス間で共有しない）。
+    取り出し（claim）は BEGIN IMMEDIATE のトランザクションで行うため、
+    複数のワーカープロセスが同じジョブを取ることはない。
+    """
+
+    def __init__(self, db_path: Path = None, limits: dict[str, BackendLimit] = None):
+        """
+        Args:
+            db_path: SQLiteファイルのパス（省略時は config.JOBS_DB_PATH）
+            limits: バックエンド名 → BackendLimit（省略時は config の値）
+        """
+        self.db_path = Path(db_path or JOBS_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        # トランザクションは明示的に BEGIN する（isolation_level=None）
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                type         TEXT NOT NULL,
+                payload      TEXT NOT NULL,
+                status       TEXT NOT NULL,
+                priority     INTEGER NOT NULL DEFAULT 0,
+                attempts     INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                depends_on   INTEGER,
+                run_after    REAL NOT NULL DEFAULT 0,
+                created_at   REAL NOT NULL,
+                started_at   REAL,
+                finished_at  REAL,
+                worker_pid   INTEGER,
+                last_error   TEXT,
+                result       TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority, id);
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                backend    TEXT PRIMARY KEY,
+                tokens     REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+
+    def close(self) -> None:
+        """接続を閉じる。"""
+        self._conn.close()
+
+    # ── 登録 ──
+
+    def enqueue(self, job_type: str, payload: dict,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                priority: int = 0, depends_on: int = None) -> int:
+        """
+        ジョブを登録する。
+
+        Args:
+            job_type: JOB_TYPES のキー
+            payload: ジョブの引数（JSON にできる dict）
+            max_attempts: dead にするまでの最大試行回数
+            priority: 大きいほど先に取り出される
+            depends_on: このジョブが done になるまで開始しない
+
+        Returns:
+            int: ジョブID
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"不明なジョブの種類: {job_type}（{', '.join(JOB_TYPES)}）")
+        if depends_on is not None and self.get(depends_on) is None:
+            raise ValueError(f"依存先のジョブがありません: #{depends_on}")
+        cur = self._conn.execute(
+            "INSERT INTO jobs (type, payload, status, priority, max_attempts, depends_on, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_type, json.dumps(payload, ensure_ascii=False), QUEUED, priority,
+             max(1, max_attempts), depends_on, time.time()),
+        )
+        return cur.lastrowid
+
+    # ── 取り出し ──
+
+    def claim(self, worker_pid: int, types: tuple = None) -> Optional[Job]:
+        """
+        実行できるジョブを1件取り出して running にする。
+
+        依存先が done で、再試行の待ち時間を過ぎていて、バックエンドの同時実行数と
+        流量の枠が空いているジョブのうち、優先度の高い順・登録順に選ぶ。
+
+        Args:
+            worker_pid: 取り出すワーカーのプロセスID
+            types: 取り出すジョブの種類（省略時はすべて）
+
+        Returns:
+            Job: 取り出したジョブ。実行できるものがなければ None
+        """
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 依存先が dead になったジョブは実行できないので dead にする
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, "
+                "last_error = '依存ジョブ #' || depends_on || ' が失敗しました' "
+                "WHERE status = ? AND depends_on IN (SELECT id FROM jobs WHERE status = ?)",
+                (DEAD, now, QUEUED, DEAD),
+            )
+            running: dict[str, int] = {}
+            for row in self._conn.execute(
+                "SELECT type, COUNT(*) AS n FROM jobs WHERE status = ? GROUP BY type", (RUNNING,),
+            ):
+                backend = JOB_TYPES.get(row["type"])
+                running[backend] = running.get(backend, 0) + row["n"]
+
+            candidates = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND run_after <= ? "
+                "AND (depends_on IS NULL OR depends_on IN (SELECT id FROM jobs WHERE status = ?)) "
+                "ORDER BY priority DESC, id LIMIT 100",
+                (QUEUED, now, DONE),
+            ).fetchall()
+            full = set()
+            for row in candidates:
+                backend = JOB_TYPES.get(row["type"])
+                if backend is None or backend in full or (types and row["type"] not in types):
+                    continue
+                limit = self.limits[backend]
+                if running.get(backend, 0) >= limit.max_concurrent or not self._take_token(backend, now):
+                    full.add(backend)
+                    continue
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, "
+                    "worker_pid = ? WHERE id = ?",
+                    (RUNNING, now, worker_pid, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+                return self.get(row["id"])
+            self._conn.execute("COMMIT")
+            return None
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _take_token(self, backend: str, now: float) -> bool:
+        """バックエンドの流量の枠（トークン）を1つ使う。トランザクション内で呼ぶこと。"""
+        limit = self.limits[backend]
+        if limit.per_minute <= 0:
+            return True
+        # 同時実行数ぶんまではまとめて開始できる
+        capacity = float(limit.max_concurrent)
+        row = self._conn.execute(
+            "SELECT tokens, updated_at FROM rate_buckets WHERE backend = ?", (backend,),
+        ).fetchone()
+        tokens = capacity if row is None else min(
+            capacity, row["tokens"] + (now - row["updated_at"]) * limit.per_minute / 60,
+        )
+        if tokens < 1:
+            return False
+        self._conn.execute(
+            "INSERT OR REPLACE INTO rate_buckets (backend, tokens, updated_at) VALUES (?, ?, ?)",
+            (backend, tokens - 1, now),
+        )
+        return True
+
+    # ── 結果の記録 ──
+
+    def complete(self, job_id: int, result=None) -> None:
+        """ジョブを done にする。"""
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, result = ?, worker_pid = NULL "
+            "WHERE id = ?",
+            (DONE, time.time(), json.dumps(result, ensure_ascii=False, default=str), job_id),
+        )
+
+    def fail(self, job_id: int, error: str, permanent: bool = False) -> str:
+        """
+        ジョブの失敗を記録する。
+
+        試行回数が残っていれば待ち時間を空けて queued に戻し、
+        残っていないか permanent なら dead にする。
+
+        Returns:
+            str: 変更後の状態（QUEUED または DEAD）
+        """
+        job = self.get(job_id)
+        now = time.time()
+        if permanent or job.attempts >= job.max_attempts:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, last_error = ?, worker_pid = NULL "
+                "WHERE id = ?",
+                (DEAD, now, error, job_id),
+            )
+            return DEAD
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (job.attempts - 1))
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, worker_pid = NULL "
+            "WHERE id = ?",
+            (QUEUED, now + delay, error, job_id),
+        )
+        return QUEUED
+
+    def release(self, job_id: int) -> None:
+        """中断したジョブを試行回数を戻して queued に戻す（ワーカー停止時）。"""
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), worker_pid = NULL "
+            "WHERE id = ? AND status = ?",
+            (QUEUED, job_id, RUNNING),
+        )
+
+    def requeue_orphans(self) -> int:
+        """
+        実行中のまま、実行していたワーカープロセスが存在しないジョブを queued に戻す。
+
+        Returns:
+            int: 戻した件数
+        """
+        rows = self._conn.execute(
+            "SELECT id, worker_pid FROM jobs WHERE status = ?", (RUNNING,),
+        ).fetchall()
+        orphans = [row["id"] for row in rows if not _process_alive(row["worker_pid"])]
+        for job_id in orphans:
+            self.release(job_id)
+        return len(orphans)
+
+    # ── 管理 ──
+
+    def retry(self, job_id: int = None) -> int:
+        """
+        dead のジョブを試行回数を0にして queued に戻す。
+
+        Args:
+            job_id: 戻すジョブ（省略時は dead のジョブすべて）
+
+        Returns:
+            int: 戻した件数
+        """
+        sql = ("UPDATE jobs SET status = ?, attempts = 0, run_after = 0, finished_at = NULL "
+               "WHERE status = ?")
+        params = [QUEUED, DEAD]
+        if job_id is not None:
+            sql += " AND id = ?"
+            params.append(job_id)
+        return self._conn.execute(sql, params).rowcount
+
+    def purge(self, older_than: float = 0) -> int:
+        """older_than 秒より前に done になったジョブを削除する。"""
+        return self._conn.execute(
+            "DELETE FROM jobs WHERE status = ? AND finished_at < ?",
+            (DONE, time.time() - older_than),
+        ).rowcount
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """ジョブを1件返す。"""
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(row) if row else None
+
+    def list_jobs(self, status: str = None, limit: int = 20) -> list[Job]:
+        """ジョブを新しい順に返す。"""
+        if status:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit),
+            )
+        else:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+        return [Job(row) for row in rows]
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        """ジョブの種類 → 状態 → 件数。"""
+        counts = {job_type: {status: 0 for status in JOB_STATUSES} for job_type in JOB_TYPES}
+        for row in self._conn.execute(
+            "SELECT type, status, COUNT(*) AS n FROM jobs GROUP BY type, status",
+        ):
+            counts.setdefault(row["type"], {s: 0 for s in JOB_STATUSES})[row["status"]] = row["n"]
+        return counts
+
+    def has_work(self, types: tuple = None) -> bool:
+        """queued / running のジョブが残っていれば True。"""
+        rows = self._conn.execute(
+            "SELECT type FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING),
+        )
+        return any(not types or row["type"] in types for row in rows)
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """同じホスト上でプロセスが生きていれば True。"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ──────────────────────────────────────────────
+# CLI インターフェース
+# ──────────────────────────────────────────────
+
+def print_status(queue: JobQueue, limit: int = 10) -> None:
+    """種類・状態ごとの件数と、直近の dead のジョブを表示する。"""
+    print(f"ジョブキュー: {queue.db_path}")
+    # 全角文字は幅がずれるため、見出しは半角で揃える
+    print(f"\n  {'type':<12} {'backend':<10}" + "".join(f"{s:>9}" for s in JOB_STATUSES))
+    for job_type, by_status in queue.counts().items():
+        print(f"  {job_type:<12} {JOB_TYPES.get(job_type, '?'):<10}"
+              + "".join(f"{by_status[s]:>9}" for s in JOB_STATUSES))
+
+    print("\n流量制限:")
+    for backend, backend_limit in queue.limits.items():
+        per_minute = backend_limit.per_minute
+        rate = f"{per_minute:g}件/分" if per_minute > 0 else "制限なし"
+        print(f"  {backend:<10} {rate}、同時{backend_limit.max_concurrent}件")
+
+    running = queue.list_jobs(RUNNING, limit)
+    if running:
+        print("\n実行中:")
+        for job in running:
+            print(f"  #{job.id} {job.type} {job.describe()} ({job.attempts}回目)")
+
+    dead = queue.list_jobs(DEAD, limit)
+    if dead:
+        print("\n失敗（dead、--action retry で再投入）:")
+        for job in dead:
+            print(f"  #{job.id} {job.type} {job.describe()} ({job.attempts}回) {job.last_error}")
+
+
+def main():
+    """コマンドラインからの実行エントリーポイント"""
+    parser = argparse.ArgumentParser(
+        description="ジョブキュー（画像生成・スクリーンショット・図解・投稿・更新）",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用例:
+  python lib/job_queue.py --action enqueue --type images --draft-dir drafts/slug/
+  python lib/job_queue.py --action enqueue --type publish --draft-dir drafts/slug/ --after 1
+  python lib/job_queue.py --action enqueue --type update --draft-dir drafts/slug/ --post-id 763
+  python lib/job_queue.py --action work --workers 4
+  python lib/job_queue.py --action work --only images diagrams --drain
+  python lib/job_queue.py --action status
+  python lib/job_queue.py --action retry            # dead のジョブをすべて再投入
+  python lib/job_queue.py --action purge --older-than-days 7
+        """,
+    )
+    parser.add_argument(
+        "--action",
+        required=True,
+        choices=["enqueue", "work", "status", "retry", "purge"],
+        help="実行するアクション",
+    )
+    parser.add_argument("--type", choices=list(JOB_TYPES), help="enqueue するジョブの種類")
+    parser.add_argument(
+        "--draft-dir",
+        nargs="+",
+        help="対象の下書きディレクトリ（複数指定で1件ずつジョブを登録）",
+    )
+    parser.add_argument("--post-id", type=int, help="update の対象の記事ID")
+    parser.add_argument("--site", help="publish / update の投稿先（sites.json のサイト名）")
+    parser.add_argument("--after", type=int, help="このジョブIDが done になってから実行する")
+    parser.add_argument("--priority", type=int, default=0, help="優先度（大きいほど先に実行）")
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"dead にするまでの最大試行回数（既定: {DEFAULT_MAX_ATTEMPTS}）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=JOB_WORKERS,
+        help=f"work で起動するワーカープロセス数（既定: .env の JOB_WORKERS={JOB_WORKERS}）",
+    )
+    parser.add_argument("--only", nargs="+", choices=list(JOB_TYPES), help="work で扱うジョブの種類")
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="work で実行できるジョブがなくなったら終了する",
+    )
+    parser.add_argument("--job-id", type=int, help="retry の対象（省略時は dead すべて）")
+    parser.add_argument(
+        "--older-than-days",
+        type=float,
+        default=7,
+        help="purge で削除する done ジョブの経過日数（既定: 7）",
+    )
+    args = parser.parse_args()
+
+    queue = JobQueue()
+
+    if args.action == "enqueue":
+        if not args.type or not args.draft_dir:
+            parser.error("enqueue には --type と --draft-dir が必要です")
+        if args.type == "update" and not args.post_id:
+            parser.error("update には --post-id が必要です")
+        for draft_dir in args.draft_dir:
+            draft_path = Path(draft_dir)
+            if not draft_path.is_dir():
+                draft_path = DRAFTS_DIR / draft_dir
+            if not draft_path.is_dir():
+                print(f"[エラー] 下書きディレクトリが見つかりません: {draft_dir}")
+                sys.exit(1)
+            payload = {"draft_dir": str(draft_path.resolve())}
+            if args.post_id:
+                payload["post_id"] = args.post_id
+            if args.site:
+                payload["site"] = args.site
+            job_id = queue.enqueue(
+                args.type, payload, max_attempts=args.max_attempts,
+                priority=args.priority, depends_on=args.after,
+            )
+            print(f"登録しました: #{job_id} {args.type} {draft_path.name}")
+
+    elif args.action == "work":
+        try:
+            from lib.job_worker import run_workers
+        except ImportError:
+            from job_worker import run_workers
+        queue.close()
+        run_workers(args.workers, types=tuple(args.only or ()), drain=args.drain)
+
+    elif args.action == "status":
+        print_status(queue)
+
+    elif args.action == "retry":
+        n = queue.retry(args.job_id)
+        print(f"再投入しました: {n}件")
+
+    elif args.action == "purge":
+        n = queue.purge(args.older_than_days * 24 * 60 * 60)
+        print(f"削除しました: {n}件")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+ジョブキューのワーカープロセス
+
+lib/job_queue.py に積まれたジョブを取り出して実行する。
+run_workers() で指定数のプロセスを起動し、各プロセスは worker_loop() で
+取り出し → 実行 → 結果の記録 を繰り返す。
+
+投稿・更新ジョブはサイトごとの WordPressClient をプロセス内で使い回すため、
+2件目以降はコネクション・タクソノミーキャッシュ・メディア索引が温まった状態で実行される。
+画像生成（Gemini）やブラウザ（Playwright）のライブラリは、そのジョブを初めて
+実行するときに読み込む。
+
+ジョブの引数（payload）:
+    images / screenshots / diagrams: {"draft_dir"}
+        draft_dir/image_requests.json から draft_dir/images/ に生成する
+    publish: {"draft_dir", "site"（省略可）}
+    update:  {"draft_dir", "post_id", "site"（省略可）}
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+try:
+    from lib.config import JOB_WORKERS
+    from lib.draft_build import BundleError
+    from lib.job_queue import DEAD, JobQueue, Job
+    from lib.site_registry import DEFAULT_SITE_NAME, SiteConfigError, load_sites
+except ImportError:
+    from config import JOB_WORKERS
+    from draft_build import BundleError
+    from job_queue import DEAD, JobQueue, Job
+    from site_registry import DEFAULT_SITE_NAME, SiteConfigError, load_sites
+
+
+class BudgetSkippedError(Exception):
+    """Gemini API の月次予算超過で画像が生成されなかった"""
+    pass
+
+
+# 再試行しても結果が変わらない失敗。発生したらすぐ dead にする
+# （ImportError は画像生成・ブラウザの依存パッケージが入っていない場合。
+#   予算超過は月が替わるか予算を見直してから job_queue.py --action retry で再実行する）
+PERMANENT_ERRORS = (FileNotFoundError, ValueError, ImportError, SiteConfigError, BundleError,
+                    BudgetSkippedError)
+
+# 実行できるジョブがないときの待ち時間（秒）
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+class JobRunner:
+    """
+    1つのワーカープロセス内でジョブを実行する。
+
+    サイトごとの WordPressClient や画像生成クライアントは初回に作り、
+    以降のジョブで使い回す。
+    """
+
+    def __init__(self):
+        self._wp_clients = {}
+        self._image_generator = None
+        self._capturer = None
+
+    def close(self) -> None:
+        """保持しているクライアントを閉じる。"""
+        for client in self._wp_clients.values():
+            client.close()
+        self._wp_clients.clear()
+
+    def run(self, job: Job):
+        """ジョブを種類に応じて実行し、結果（JSON にできる値）を返す。"""
+        handler = getattr(self, f"_run_{job.type}")
+        return handler(job.payload)
+
+    # ── 画像 ──
+
+    @staticmethod
+    def _requests_paths(payload: dict) -> tuple[str, str]:
+        """(image_requests.json のパス, 出力先ディレクトリ)。"""
+        draft_path = Path(payload["draft_dir"])
+        requests_path = draft_path / "image_requests.json"
+        if not requests_path.is_file():
+            raise FileNotFoundError(f"image_requests.json が見つかりません: {requests_path}")
+        return str(requests_path), str(draft_path / "images")
+
+    def _run_images(self, payload: dict):
+        if self._image_generator is None:
+            try:
+                from lib.image_client import BlogImageGenerator
+            except ImportError:
+                from image_client import BlogImageGenerator
+            self._image_generator = BlogImageGenerator()
+        results = self._image_generator.generate_from_requests(*self._requests_paths(payload))
+        if results.get("budget_skipped"):
+            # 画像がないまま後続の publish が実行されないよう、完了にしない
+            raise BudgetSkippedError(
+                f"Gemini API の月次予算超過のため画像を生成しませんでした"
+                f"（プロンプト: {results.get('prompts_file')}）"
+            )
+        return results
+
+    def _run_screenshots(self, payload: dict):
+        if self._capturer is None:
+            try:
+                from lib.screenshot_capturer import ScreenshotCapturer
+            except ImportError:
+                from screenshot_capturer import ScreenshotCapturer
+            self._capturer = ScreenshotCapturer()
+        requests_path, output_dir = self._requests_paths(payload)
+        results = self._capturer.capture_from_requests(requests_path, output_dir)
+        # 取得に失敗した項目はログに出るだけなので、リクエストと突き合わせる
+        with open(requests_path, "r", encoding="utf-8") as f:
+            screenshots = json.load(f).get("screenshots", [])
+        captured = {r["id"] for r in results}
+        missing = [
+            req.get("id", f"screenshot_{i + 1}") for i, req in enumerate(screenshots)
+            if req.get("url") and req.get("id", f"screenshot_{i + 1}") not in captured
+        ]
+        if missing:
+            # 再試行ではジョブ全体をやり直す（取得済みのスクリーンショットも取り直す）
+            raise RuntimeError(f"スクリーンショットの取得に失敗しました: {', '.join(missing)}")
+        return results
+
+    def _run_diagrams(self, payload: dict):
+        try:
+            from lib.mermaid_playwright import render_from_requests
+        except ImportError:
+            from mermaid_playwright import render_from_requests
+        results = render_from_requests(*self._requests_paths(payload))
+        failed = [r["id"] for r in results if r.get("error")]
+        if failed:
+            # 再試行ではジョブ全体をやり直す（成功した図解もレンダリングし直す）
+            raise RuntimeError(f"図解のレンダリングに失敗しました: {', '.join(failed)}")
+        return results
+
+    # ── WordPress ──
+
+    def _wp_client(self, site_name: str = None):
+        """サイトの WordPressClient（プロセス内で使い回す）。"""
+        site_name = site_name or DEFAULT_SITE_NAME
+        if site_name not in self._wp_clients:
+            try:
+                from lib.wp_client import WordPressClient
+            except ImportError:
+                from wp_client import WordPressClient
+            sites = load_sites()
+            if site_name not in sites:
+                raise SiteConfigError(
+                    f"登録されていないサイト: {site_name}（登録済み: {', '.join(sites)}）"
+                )
+            site = sites[site_name]
+            errors = site.validate()
+            if errors:
+                raise SiteConfigError("\n".join(errors))
+            self._wp_clients[site_name] = WordPressClient(
+                url=site.url, user=site.user, password=site.password,
+                upload_workers=site.upload_workers,
+            )
+        return self._wp_clients[site_name]
+
+    def _run_publish(self, payload: dict):
+        client = self._wp_client(payload.get("site"))
+        return client.publish_draft_from_dir(payload["draft_dir"])
+
+    def _run_update(self, payload: dict):
+        client = self._wp_client(payload.get("site"))
+        return client.update_post_from_dir(int(payload["post_id"]), payload["draft_dir"])
+
+
+def worker_loop(db_path: Path = None, types: tuple = (), drain: bool = False,
+                poll_interval: float = DEFAULT_POLL_INTERVAL) -> None:
+    """
+    ジョブを取り出して実行することを繰り返す（ワーカープロセスの本体）。
+
+    Args:
+        db_path: ジョブキューのSQLiteファイル（省略時は config.JOBS_DB_PATH）
+        types: 扱うジョブの種類（空ならすべて）
+        drain: True なら queued / running のジョブがなくなった時点で終了する
+        poll_interval: 実行できるジョブがないときの待ち時間（秒）
+    """
+    pid = os.getpid()
+    queue = JobQueue(db_path)
+    runner = JobRunner()
+    job = None
+    try:
+        while True:
+            job = queue.claim(pid, types)
+            if job is None:
+                if drain and not queue.has_work(types):
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            print(f"[worker {pid}] 開始: #{job.id} {job.type} {job.describe()} ({job.attempts}回目)")
+            started = time.monotonic()
+            try:
+                result = runner.run(job)
+            except Exception as e:
+                status = queue.fail(
+                    job.id, f"{type(e).__name__}: {e}",
+                    permanent=isinstance(e, PERMANENT_ERRORS),
+                )
+                label = "失敗（dead）" if status == DEAD else "失敗（再試行待ち）"
+                print(f"[worker {pid}] {label}: #{job.id} {job.type} {job.describe()}: {e}")
+            else:
+                queue.complete(job.id, result)
+                print(f"[worker {pid}] 完了: #{job.id} {job.type} {job.describe()} "
+                      f"({time.monotonic() - started:.1f}秒)")
+            job = None
+    except KeyboardInterrupt:
+        # 実行途中のジョブは試行回数に数えずキューに戻す
+        if job is not None:
+            queue.release(job.id)
+    finally:
+        runner.close()
+        queue.close()
+
+
+def run_workers(workers: int = JOB_WORKERS, types: tuple = (), drain: bool = False,
+                db_path: Path = None) -> None:
+    """
+    ワーカープロセスを起動し、すべて終了するまで待つ。
+
+    起動前に、停止したワーカーが実行中のまま残したジョブをキューに戻す。
+
+    Args:
+        workers: 起動するプロセス数
+        types: 扱うジョブの種類（空ならすべて）
+        drain: True なら実行できるジョブがなくなった時点で終了する
+        db_path: ジョブキューのSQLiteファイル（省略時は config.JOBS_DB_PATH）
+    """
+    queue = JobQueue(db_path)
+    orphans = queue.requeue_orphans()
+    queue.close()
+    if orphans:
+        print(f"中断されていたジョブをキューに戻しました: {orphans}件")
+
+    workers = max(1, workers)
+    print(f"ワーカーを起動します: {workers}プロセス"
+          f"（対象: {', '.join(types) if types else 'すべて'}"
+          f"{'、ジョブがなくなったら終了' if drain else '、Ctrl+C で終了'}）")
+    processes = [
+        multiprocessing.Process(target=worker_loop, args=(db_path, types, drain), daemon=False)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Ctrl+C は各ワーカーにも届き、実行中のジョブを戻してから終了する
+        for process in processes:
+            process.join()
+        print("\nワーカーを停止しました")
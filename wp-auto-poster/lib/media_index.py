@@ -0,0 +1,139 @@
+"""
+アップロード済みメディアのローカル索引
+
+画像ファイルの SHA-256 をキーに、サイトごとの media_id / source_url を
+SQLite に記録する。同じ内容のファイルは再アップロードせずに既存メディアを使い回し、
+再投稿や更新のたびにメディアライブラリが重複で埋まるのを防ぐ。
+
+索引が古くなっている可能性（WordPress側でメディアが削除された等）に備え、
+一定時間検証していないエントリは GET /media/{id} で存在を確認してから使う。
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from lib.config import CACHE_DIR
+except ImportError:
+    from config import CACHE_DIR
+
+# 索引ファイルのデフォルトパス
+DEFAULT_DB_PATH: Path = CACHE_DIR / "media_index.sqlite3"
+
+# この秒数以上検証していないエントリは、使う前にサーバーで存在確認する
+VERIFY_INTERVAL: float = 24 * 60 * 60
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """ファイルの SHA-256 を16進文字列で返す（チャンク単位で読み込む）。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaIndex:
+    """
+    SHA-256 → WordPressメディア の対応表（サイト単位）。
+
+    複数スレッドから使われても安全なように、接続は1本をロックで保護する。
+    """
+
+    def __init__(self, db_path: Path = None):
+        """
+        索引を開く（なければ作成する）。
+
+        Args:
+            db_path: SQLiteファイルのパス（省略時は DEFAULT_DB_PATH）
+        """
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS media (
+                site        TEXT NOT NULL,
+                sha256      TEXT NOT NULL,
+                media_id    INTEGER NOT NULL,
+                source_url  TEXT NOT NULL,
+                filename    TEXT,
+                size        INTEGER,
+                uploaded_at REAL NOT NULL,
+                verified_at REAL NOT NULL,
+                PRIMARY KEY (site, sha256)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """索引を閉じる。"""
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, site: str, sha256: str) -> Optional[dict]:
+        """
+        ファイルハッシュに対応するメディアを返す。
+
+        Returns:
+            dict: {"media_id", "source_url", "filename", "size", "verified_at"}。
+                  未登録なら None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT media_id, source_url, filename, size, verified_at "
+                "FROM media WHERE site = ? AND sha256 = ?",
+                (site, sha256),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "media_id": row[0],
+            "source_url": row[1],
+            "filename": row[2],
+            "size": row[3],
+            "verified_at": row[4],
+        }
+
+    def needs_verify(self, entry: dict) -> bool:
+        """エントリが VERIFY_INTERVAL 以上検証されていなければ True。"""
+        return time.time() - entry["verified_at"] >= VERIFY_INTERVAL
+
+    def record(self, site: str, sha256: str, media_id: int, source_url: str,
+               filename: str = None, size: int = None) -> None:
+        """アップロード結果を登録する（同じハッシュがあれば上書き）。"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media "
+                "(site, sha256, media_id, source_url, filename, size, uploaded_at, verified_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (site, sha256, media_id, source_url, filename, size, now, now),
+            )
+            self._conn.commit()
+
+    def mark_verified(self, site: str, sha256: str, source_url: str) -> None:
+        """サーバーで存在を確認したことを記録する（URLが変わっていれば更新）。"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE media SET verified_at = ?, source_url = ? "
+                "WHERE site = ? AND sha256 = ?",
+                (time.time(), source_url, site, sha256),
+            )
+            self._conn.commit()
+
+    def forget(self, site: str, sha256: str) -> None:
+        """エントリを削除する（サーバー側でメディアが消えていた場合など）。"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM media WHERE site = ? AND sha256 = ?", (site, sha256),
+            )
+            self._conn.commit()
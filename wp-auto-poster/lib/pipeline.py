@@ -0,0 +1,134 @@
+"""
+依存関係つきステージを並行実行する小さなパイプラインエンジン
+
+各ステージは名前・処理関数・依存するステージ名を宣言する。
+依存先がすべて終わったステージから順に開始するため、互いに独立したステージ
+（例: 画像アップロードとカテゴリ・タグ解決）は自動的に並行して実行される。
+ステージごとの開始時刻と所要時間を記録し、最後にまとめて表示できる。
+
+使用例:
+    pipeline = Pipeline([
+        Stage("meta", load_meta),
+        Stage("uploads", upload_images),
+        Stage("terms", resolve_terms, requires=("meta",)),
+        Stage("post", write_post, requires=("meta", "uploads", "terms")),
+    ])
+    ctx = await pipeline.run(PipelineContext(draft_path=path))
+    ctx["post"]  # post ステージの戻り値
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Union
+
+# ステージの処理関数: コンテキストを受け取り、結果を返す（同期関数でもよい）
+StageFunc = Callable[["PipelineContext"], Union[Any, Awaitable[Any]]]
+
+
+class PipelineError(Exception):
+    """パイプラインの定義が不正な場合のエラー"""
+    pass
+
+
+class Stage:
+    """
+    パイプラインの1ステージ。
+
+    Attributes:
+        name: ステージ名（結果の参照にも使う）
+        func: 処理関数。func(ctx) の戻り値が ctx[name] に入る
+        requires: 先に完了している必要があるステージ名
+    """
+
+    def __init__(self, name: str, func: StageFunc, requires: tuple = ()):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+
+
+class PipelineContext:
+    """
+    1回の実行の入力・各ステージの結果・所要時間を保持する。
+
+    入力は属性（ctx.draft_path 等）、ステージの結果は ctx["ステージ名"] で参照する。
+    """
+
+    def __init__(self, **inputs):
+        self.__dict__.update(inputs)
+        self.results: dict[str, Any] = {}
+        # ステージ名 → {"start": 開始時刻（実行開始からの秒）, "seconds": 所要秒数}
+        self.timings: dict[str, dict] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+
+class Pipeline:
+    """
+    宣言されたステージを依存関係に従って実行する。
+
+    依存先は自分より前に宣言されている必要がある（循環依存はここで弾かれる）。
+    どれかのステージが例外を送出した場合は、実行中の他のステージを
+    キャンセルしてその例外をそのまま送出する。
+    """
+
+    def __init__(self, stages: list[Stage]):
+        seen = set()
+        for stage in stages:
+            if stage.name in seen:
+                raise PipelineError(f"ステージ名が重複しています: {stage.name}")
+            missing = [name for name in stage.requires if name not in seen]
+            if missing:
+                raise PipelineError(
+                    f"ステージ '{stage.name}' の依存先が先に宣言されていません: "
+                    f"{', '.join(missing)}"
+                )
+            seen.add(stage.name)
+        self.stages = list(stages)
+
+    async def run(self, ctx: PipelineContext) -> PipelineContext:
+        """すべてのステージを実行し、結果と所要時間を記録したコンテキストを返す。"""
+        started = time.monotonic()
+        tasks: dict[str, asyncio.Task] = {}
+        for stage in self.stages:
+            deps = [tasks[name] for name in stage.requires]
+            tasks[stage.name] = asyncio.ensure_future(
+                self._run_stage(stage, deps, ctx, started)
+            )
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return ctx
+
+    @staticmethod
+    async def _run_stage(stage: Stage, deps: list[asyncio.Task],
+                         ctx: PipelineContext, started: float) -> None:
+        if deps:
+            await asyncio.gather(*deps)
+        stage_started = time.monotonic()
+        value = stage.func(ctx)
+        if inspect.isawaitable(value):
+            value = await value
+        ctx.results[stage.name] = value
+        ctx.timings[stage.name] = {
+            "start": round(stage_started - started, 6),
+            "seconds": round(time.monotonic() - stage_started, 6),
+        }
+
+
+def print_timings(ctx: PipelineContext) -> None:
+    """ステージごとの開始時刻と所要時間を開始順に表示する。"""
+    if not ctx.timings:
+        return
+    ordered = sorted(ctx.timings.items(), key=lambda kv: kv[1]["start"])
+    total = max(t["start"] + t["seconds"] for _, t in ordered)
+    print("\nステージ別所要時間:")
+    for name, timing in ordered:
+        print(f"  {name:<10} {timing['seconds']:>7.2f}秒  (開始 +{timing['start']:.2f}秒)")
+    print(f"  {'合計':<8} {total:>7.2f}秒")
@@ -0,0 +1,253 @@
+"""
+下書きディレクトリごとの投稿ジャーナル
+
+publish_draft_from_dir / update_post_from_dir の途中で失敗しても、
+それまでに済んだ作業（アップロードしたメディア・解決したカテゴリ/タグID・
+作成した記事ID）を失わないよう、各ステップの完了直後に
+下書きディレクトリの .publish_journal.json へ記録する。
+
+再実行時は記録済みのステップを飛ばし、残りの作業だけを行う。
+  - 画像: 内容（SHA-256）が記録時と同じなら、アップロードせず記録を使う
+  - カテゴリ・タグ: 名前の組み合わせが記録時と同じなら、記録したIDを使う
+  - 記事: 作成済みの記事IDがあれば、新規作成せずその記事を更新する。
+          送る内容（本文・タイトル・メタ等）のハッシュが前回と同じなら書き込まない
+
+投稿が成功すると下書きの元ファイル（article.html など）のハッシュも記録し、
+次回は前回からどのファイルが変わったかを表示する。
+
+同じ下書きを複数サイトに投稿できるよう、記録はサイトURLごとに分ける。
+ファイルは一時ファイル経由で置き換えるため、書き込み中に落ちても壊れない。
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from lib.media_index import file_sha256
+except ImportError:
+    from media_index import file_sha256
+
+# 下書きディレクトリ内のジャーナルのファイル名
+JOURNAL_FILENAME = ".publish_journal.json"
+
+JOURNAL_VERSION = 1
+
+# アップロード結果のうち画像ブロックの width/height に使う値
+IMAGE_SIZE_KEYS = ("width", "height")
+
+# 変更検出の対象にする下書きの元ファイル（画像は uploads で個別に扱う）
+SOURCE_FILES = ("article.html", "meta.json", "affiliate_section.html", "image_results.json")
+
+
+def content_hash(data) -> str:
+    """JSON にできる値の SHA-256（キー順に依存しない）。"""
+    text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def source_hashes(draft_path: Path) -> dict[str, str]:
+    """下書きの元ファイルのうち存在するものの SHA-256 を返す。"""
+    draft_path = Path(draft_path)
+    return {
+        name: file_sha256(draft_path / name)
+        for name in SOURCE_FILES if (draft_path / name).is_file()
+    }
+
+
+class PublishJournal:
+    """
+    1つの下書きディレクトリ × 1サイト分の投稿ジャーナル。
+
+    ファイルの構造:
+        {
+            "version": 1,
+            "sites": {
+                "https://example.com": {
+                    "uploads": {"eyecatch.png": {"size": ..., "mtime_ns": ..., "sha256": ...,
+                                                 "id": ..., "url": ..., "alt": ...,
+                                                 "width": ..., "height": ...}},
+                    "terms": {"categories": [...], "tags": [...],
+                              "category_ids": [...], "tag_ids": [...]},
+                    "post": {"post_id": ..., "edit_url": ..., "preview_url": ...,
+                             "content_hash": ...},
+                    "sources": {"article.html": SHA-256, ...},
+                    "updated_at": ...
+                }
+            }
+        }
+    """
+
+    def __init__(self, draft_path: Path, site_url: str):
+        """
+        Args:
+            draft_path: 下書きディレクトリのパス
+            site_url: 投稿先サイトのURL（記録を分けるキー）
+        """
+        self.path = Path(draft_path) / JOURNAL_FILENAME
+        self.site_url = site_url.rstrip("/")
+        self._entry = self._load().get("sites", {}).get(self.site_url, {})
+
+    def _load(self) -> dict:
+        """ファイル全体を読み込む。ない・壊れている場合は空として扱う。"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != JOURNAL_VERSION:
+            return {}
+        return data
+
+    def _save(self) -> None:
+        """
+        このサイトの記録をファイルに書き出す（一時ファイル経由で置き換える）。
+
+        他サイトの記録を消さないよう、書き出す直前にファイルを読み直して
+        自分のサイトのエントリだけを差し替える。
+        """
+        self._entry["updated_at"] = round(time.time(), 3)
+        data = self._load()
+        data["version"] = JOURNAL_VERSION
+        data.setdefault("sites", {})[self.site_url] = self._entry
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+    def is_empty(self) -> bool:
+        """このサイトの記録が1つもなければ True。"""
+        return not any(self._entry.get(k) for k in ("uploads", "terms", "post"))
+
+    # ── 画像 ──
+
+    def has_uploads(self) -> bool:
+        """アップロード済みの画像の記録があれば True。"""
+        return bool(self._entry.get("uploads"))
+
+    def upload(self, file_path: Path) -> Optional[dict]:
+        """
+        アップロード済みの記録を返す。
+
+        サイズと更新時刻が記録時と同じならそのまま、違えば SHA-256 を計算して比較し、
+        内容が変わっていれば（画像を作り直した場合など）None。
+
+        Returns:
+            dict: {"id": メディアID, "url": ..., "alt": ..., "width", "height"}
+                  （寸法は記録されている場合のみ）。記録がなければ None
+        """
+        saved = self._entry.get("uploads", {}).get(Path(file_path).name)
+        if not saved:
+            return None
+        stat = Path(file_path).stat()
+        if saved.get("size") != stat.st_size or saved.get("mtime_ns") != stat.st_mtime_ns:
+            if not saved.get("sha256") or saved["sha256"] != file_sha256(file_path):
+                return None
+            # 内容は同じ（コピーし直した等）なので、次回はハッシュを計算しなくて済むようにする
+            saved["size"] = stat.st_size
+            saved["mtime_ns"] = stat.st_mtime_ns
+        result = {"id": saved["id"], "url": saved["url"], "alt": saved.get("alt", "")}
+        for key in IMAGE_SIZE_KEYS:
+            if key in saved:
+                result[key] = saved[key]
+        return result
+
+    def record_upload(self, file_path: Path, result: dict) -> None:
+        """アップロードが完了した画像を記録する。"""
+        stat = Path(file_path).stat()
+        self._entry.setdefault("uploads", {})[Path(file_path).name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(file_path),
+            "id": result["id"],
+            "url": result["url"],
+            "alt": result.get("alt", ""),
+            **{key: result[key] for key in IMAGE_SIZE_KEYS if key in result},
+        }
+        self._save()
+
+    # ── カテゴリ・タグ ──
+
+    def terms(self, category_names: list[str],
+              tag_names: list[str]) -> Optional[tuple[list[int], list[int]]]:
+        """名前の組み合わせが記録時と同じなら (category_ids, tag_ids) を返す。"""
+        saved = self._entry.get("terms")
+        if not saved:
+            return None
+        if saved.get("categories") != list(category_names) or saved.get("tags") != list(tag_names):
+            return None
+        return list(saved["category_ids"]), list(saved["tag_ids"])
+
+    def record_terms(self, category_names: list[str], tag_names: list[str],
+                     category_ids: list[int], tag_ids: list[int]) -> None:
+        """解決したカテゴリ・タグIDを記録する。"""
+        self._entry["terms"] = {
+            "categories": list(category_names),
+            "tags": list(tag_names),
+            "category_ids": list(category_ids),
+            "tag_ids": list(tag_ids),
+        }
+        self._save()
+
+    # ── 記事 ──
+
+    @property
+    def post_id(self) -> Optional[int]:
+        """作成済みの記事ID（なければ None）。"""
+        post = self._entry.get("post") or {}
+        return post.get("post_id")
+
+    def unchanged_post(self, post_id: int, post_hash: str) -> Optional[dict]:
+        """
+        前回 post_id に書き込んだ内容のハッシュが post_hash と同じなら、その記録を返す。
+
+        Returns:
+            dict: {"post_id", "edit_url", "preview_url", ...}。書き込みが必要なら None
+        """
+        post = self._entry.get("post") or {}
+        if post.get("post_id") != post_id or post.get("content_hash") != post_hash:
+            return None
+        return dict(post)
+
+    def record_post(self, post_id: int, edit_url: str, preview_url: str = "",
+                    post_hash: str = None, sources: dict[str, str] = None) -> None:
+        """
+        作成・更新した記事を記録する。
+
+        Args:
+            post_id: 記事ID
+            edit_url: 編集画面のURL
+            preview_url: プレビューURL
+            post_hash: 書き込んだ内容のハッシュ（content_hash）
+            sources: 書き込んだ時点の元ファイルのハッシュ（source_hashes）
+        """
+        self._entry["post"] = {
+            "post_id": post_id,
+            "edit_url": edit_url,
+            "preview_url": preview_url,
+            "content_hash": post_hash,
+        }
+        if sources is not None:
+            self._entry["sources"] = sources
+        self._save()
+
+    # ── 元ファイル ──
+
+    def changed_sources(self, draft_path: Path) -> Optional[list[str]]:
+        """
+        前回の投稿から変わった元ファイル名を返す（追加・削除も含む）。
+
+        Returns:
+            list: 変わったファイル名。前回の記録がなければ None
+        """
+        saved = self._entry.get("sources")
+        if saved is None:
+            return None
+        current = source_hashes(draft_path)
+        return sorted(
+            name for name in set(saved) | set(current)
+            if saved.get(name) != current.get(name)
+        )
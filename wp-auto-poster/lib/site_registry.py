@@ -0,0 +1,150 @@
+"""
+WordPressサイトの登録簿
+
+複数のブログを1つのCLIから扱うため、サイトごとのURL・認証情報・同時実行数を
+sites.json（config.WP_SITES_FILE）にまとめる。
+ファイルがない場合は .env の WP_URL / WP_USER / WP_APP_PASSWORD を
+"default" サイトとして扱うので、単一サイトの運用はこれまでどおり動く。
+
+認証情報はファイルに直接書くほか、"user_env" / "app_password_env" で
+環境変数名を指定して .env 側に置くこともできる（sites.example.json 参照）。
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    from lib.config import WP_URL, WP_USER, WP_APP_PASSWORD, WP_UPLOAD_WORKERS, WP_SITES_FILE
+except ImportError:
+    from config import WP_URL, WP_USER, WP_APP_PASSWORD, WP_UPLOAD_WORKERS, WP_SITES_FILE
+
+# 1サイトで同時に処理する記事数のデフォルト
+DEFAULT_MAX_CONCURRENT_POSTS = 2
+
+# 登録簿がない場合のサイト名
+DEFAULT_SITE_NAME = "default"
+
+
+class SiteConfigError(Exception):
+    """サイト登録簿の読み込み・指定に関するエラー"""
+    pass
+
+
+class SiteConfig:
+    """
+    1サイト分の接続設定。
+
+    Attributes:
+        name: 登録簿上のサイト名
+        url: WordPressサイトのURL
+        user: ユーザー名
+        password: アプリケーションパスワード
+        upload_workers: メディアの同時アップロード数
+        max_concurrent_posts: このサイトで同時に処理する記事数
+    """
+
+    def __init__(self, name: str, url: str, user: str, password: str,
+                 upload_workers: int = None,
+                 max_concurrent_posts: int = DEFAULT_MAX_CONCURRENT_POSTS):
+        self.name = name
+        self.url = url.rstrip("/")
+        self.user = user
+        self.password = password
+        self.upload_workers = upload_workers or WP_UPLOAD_WORKERS
+        self.max_concurrent_posts = max(1, max_concurrent_posts)
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> "SiteConfig":
+        """
+        登録簿の1エントリから設定を作る。
+
+        "user" / "app_password" の代わりに "user_env" / "app_password_env" があれば
+        その名前の環境変数から読み込む。
+        """
+        if "url" not in data:
+            raise SiteConfigError(f"サイト '{name}' に url がありません")
+        return cls(
+            name=name,
+            url=data["url"],
+            user=_value_or_env(data, "user"),
+            password=_value_or_env(data, "app_password"),
+            upload_workers=data.get("upload_workers"),
+            max_concurrent_posts=data.get("max_concurrent_posts", DEFAULT_MAX_CONCURRENT_POSTS),
+        )
+
+    def validate(self) -> list[str]:
+        """設定のバリデーション。不足項目をリストで返す。"""
+        errors = []
+        if not self.user:
+            errors.append(f"[{self.name}] ユーザー名が設定されていません")
+        if not self.password:
+            errors.append(f"[{self.name}] アプリケーションパスワードが設定されていません")
+        if not self.url.startswith("https://"):
+            errors.append(f"[{self.name}] URLがHTTPSではありません: {self.url}")
+        return errors
+
+    def __repr__(self) -> str:
+        return f"SiteConfig(name={self.name!r}, url={self.url!r})"
+
+
+def load_sites(path: Path = None) -> dict[str, SiteConfig]:
+    """
+    サイト登録簿を読み込む。
+
+    Args:
+        path: 登録簿のパス（省略時は config.WP_SITES_FILE）
+
+    Returns:
+        dict: サイト名 → SiteConfig（ファイル順）。
+              ファイルがなければ .env の設定による "default" サイトのみ
+
+    Raises:
+        SiteConfigError: ファイルが壊れている場合
+    """
+    path = Path(path or WP_SITES_FILE)
+    if not path.exists():
+        return {DEFAULT_SITE_NAME: default_site()}
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (ValueError, OSError) as e:
+        raise SiteConfigError(f"サイト登録簿を読み込めません: {path}\n詳細: {e}")
+
+    entries = data.get("sites", {})
+    if not isinstance(entries, dict) or not entries:
+        raise SiteConfigError(f"サイト登録簿にサイトがありません: {path}")
+    return {name: SiteConfig.from_dict(name, entry) for name, entry in entries.items()}
+
+
+def default_site() -> SiteConfig:
+    """.env の WP_URL / WP_USER / WP_APP_PASSWORD によるサイト設定を返す。"""
+    return SiteConfig(DEFAULT_SITE_NAME, WP_URL, WP_USER, WP_APP_PASSWORD)
+
+
+def select_sites(sites: dict[str, SiteConfig], names: list[str]) -> list[SiteConfig]:
+    """
+    名前でサイトを選ぶ（"all" で全サイト）。
+
+    Raises:
+        SiteConfigError: 登録されていない名前が含まれる場合
+    """
+    if "all" in names:
+        return list(sites.values())
+    unknown = [name for name in names if name not in sites]
+    if unknown:
+        raise SiteConfigError(
+            f"登録されていないサイト: {', '.join(unknown)}"
+            f"（登録済み: {', '.join(sites)}）"
+        )
+    # 重複指定は1回にまとめる
+    return [sites[name] for name in dict.fromkeys(names)]
+
+
+def _value_or_env(data: dict, key: str) -> Optional[str]:
+    """data[key]、なければ data[key + "_env"] が指す環境変数の値を返す。"""
+    if data.get(key):
+        return data[key]
+    env_name = data.get(f"{key}_env")
+    return os.getenv(env_name, "") if env_name else ""
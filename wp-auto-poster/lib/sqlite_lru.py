@@ -0,0 +1,36 @@
+"""
+SQLite キャッシュ共通の容量制限（LRU）
+
+size 列（バイト数）と accessed_at 列（最終使用時刻）を持つテーブルについて、
+合計サイズが上限を超えた分を最後に使われた時刻が古い順に削除する。
+lib/http_cache.py と lib/image_cache.py が使う。
+"""
+
+import sqlite3
+
+
+def evict_lru(conn: sqlite3.Connection, table: str, max_bytes: int) -> int:
+    """
+    合計サイズが max_bytes を超えていれば、古いエントリから削除する。
+
+    コミットは呼び出し側で行う（保存と同じトランザクションで削除するため）。
+
+    Args:
+        conn: キャッシュの接続
+        table: key / size / accessed_at 列を持つテーブル名
+        max_bytes: 合計サイズの上限
+
+    Returns:
+        int: 削除したエントリ数
+    """
+    total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    stale = []
+    for key, size in conn.execute(f"SELECT key, size FROM {table} ORDER BY accessed_at"):
+        if total <= max_bytes:
+            break
+        stale.append((key,))
+        total -= size
+    conn.executemany(f"DELETE FROM {table} WHERE key = ?", stale)
+    return len(stale)
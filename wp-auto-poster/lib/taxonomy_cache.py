@@ -0,0 +1,111 @@
+"""
+カテゴリ・タグのローカルキャッシュ
+
+サイトの全カテゴリ・全タグを一度に取得し、名前（大文字小文字を区別しない）→ ID の
+辞書としてディスクに保存する。有効期限内は名前解決にネットワークを使わない。
+新しく作成したタームはその場でキャッシュに追加される。
+キャッシュにあるIDがサーバー側で削除されていたときは invalidate() で捨てて取り直す。
+"""
+
+import html
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+try:
+    from lib.config import CACHE_DIR
+except ImportError:
+    from config import CACHE_DIR
+
+# キャッシュの有効期限（秒）。期限切れのタクソノミーは次回の名前解決時に取り直す
+DEFAULT_TTL: float = 6 * 60 * 60
+
+TAXONOMIES = ("categories", "tags")
+
+
+def term_key(name: str) -> str:
+    """ターム名を比較用のキーに正規化する（HTMLエンティティを戻して casefold）。"""
+    return html.unescape(name).strip().casefold()
+
+
+class TaxonomyCache:
+    """
+    1サイト分のカテゴリ・タグ名 → ID 辞書。
+
+    ファイルは CACHE_DIR/taxonomy/{サイトのホスト名}.json に保存される。
+    """
+
+    def __init__(self, site_url: str, cache_dir: Path = None, ttl: float = DEFAULT_TTL):
+        """
+        キャッシュを読み込む（ファイルがなければ空で始める）。
+
+        Args:
+            site_url: WordPressサイトのURL
+            cache_dir: キャッシュディレクトリ（省略時は config.CACHE_DIR）
+            ttl: 有効期限（秒）
+        """
+        parsed = urlparse(site_url)
+        site_key = re.sub(r"[^A-Za-z0-9.-]", "_", parsed.netloc + parsed.path.rstrip("/"))
+        self.path = Path(cache_dir or CACHE_DIR) / "taxonomy" / f"{site_key}.json"
+        self.ttl = ttl
+        self._data = {tax: {"fetched_at": 0.0, "terms": {}} for tax in TAXONOMIES}
+
+        if self.path.exists():
+            try:
+                saved = json.loads(self.path.read_text(encoding="utf-8"))
+                for tax in TAXONOMIES:
+                    if tax in saved:
+                        self._data[tax] = saved[tax]
+            except (ValueError, OSError):
+                # 壊れたキャッシュは捨てて取り直す
+                pass
+
+    def is_fresh(self, taxonomy: str) -> bool:
+        """タクソノミーの全件データが有効期限内なら True。"""
+        return time.time() - self._data[taxonomy]["fetched_at"] < self.ttl
+
+    def get(self, taxonomy: str, name: str) -> Optional[int]:
+        """名前に一致するタームIDを返す。なければ None。"""
+        return self._data[taxonomy]["terms"].get(term_key(name))
+
+    def replace(self, taxonomy: str, terms: list[dict]) -> None:
+        """
+        サーバーから取得した全タームでキャッシュを置き換えて保存する。
+
+        Args:
+            taxonomy: "categories" または "tags"
+            terms: [{"id": ..., "name": ...}, ...]
+        """
+        self._data[taxonomy] = {
+            "fetched_at": time.time(),
+            "terms": {term_key(t["name"]): t["id"] for t in terms},
+        }
+        self._save()
+
+    def add(self, taxonomy: str, name: str, term_id: int) -> None:
+        """作成・発見したタームを1件追加して保存する。"""
+        self._data[taxonomy]["terms"][term_key(name)] = term_id
+        self._save()
+
+    def invalidate(self) -> None:
+        """
+        全タクソノミーのキャッシュを捨てて保存する。
+
+        サーバー側で削除されたタームのIDが残っていた場合（rest_invalid_term）に呼び、
+        次回の名前解決で全件を取り直させる。
+        """
+        self._data = {tax: {"fetched_at": 0.0, "terms": {}} for tax in TAXONOMIES}
+        self._save()
+
+    def _save(self) -> None:
+        """キャッシュファイルを書き出す（一時ファイル経由で置き換える）。"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(self._data, ensure_ascii=False, indent=2), encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
@@ -4,6 +4,7 @@ Gemini API 使用量トラッカー
 実際の請求額は https://aistudio.google.com/spend で確認できる（円建て）。
 このスクリプトは:
   - 画像生成ごとの概算コストをローカルに記録（枚数ベース）
+  - 生成キャッシュ（lib/image_cache.py）で API を呼ばずに済んだ枚数を別枠で記録
   - 実際のGoogle請求額（円）を手動記録できる
   - 月次予算超過の場合に API 生成スキップを指示する
 
@@ -64,6 +65,7 @@ class UsageTracker:
     def _load(self) -> dict:
         data = json.loads(self.log_path.read_text(encoding="utf-8"))
         data.setdefault("actual_costs", {})
+        data.setdefault("cache_hits", [])
         return data
 
     def _save(self, data: dict) -> None:
@@ -76,10 +78,14 @@ class UsageTracker:
 
     # ── 記録 ──────────────────────────────────
 
+    @staticmethod
+    def _cost(image_type: str, size: Optional[str]) -> int:
+        return COST_TABLE_JPY.get((image_type, size)) \
+            or COST_TABLE_JPY.get((image_type, None), 10)
+
     def record(self, image_type: str, model: str, size: Optional[str] = None) -> int:
         """画像1枚の生成を記録し、概算コスト（円）を返す。"""
-        cost = COST_TABLE_JPY.get((image_type, size)) \
-            or COST_TABLE_JPY.get((image_type, None), 10)
+        cost = self._cost(image_type, size)
 
         data = self._load()
         data["records"].append({
@@ -92,6 +98,24 @@ class UsageTracker:
         self._save(data)
         return cost
 
+    def record_cache_hit(self, image_type: str, model: str, size: Optional[str] = None) -> int:
+        """生成キャッシュから画像1枚を取り出したことを記録し、節約できた概算コスト（円）を返す。
+
+        キャッシュヒットは API を呼んでいないため、生成枚数・概算コストには含めない。
+        """
+        saved = self._cost(image_type, size)
+
+        data = self._load()
+        data["cache_hits"].append({
+            "date":       datetime.now().isoformat(),
+            "image_type": image_type,
+            "model":      model,
+            "size":       size,
+            "saved_jpy":  saved,
+        })
+        self._save(data)
+        return saved
+
     def record_actual(self, amount_jpy: int, year: int = None, month: int = None) -> None:
         """Google の請求画面で確認した実績額（円）を記録する。"""
         now = datetime.now()
@@ -114,6 +138,8 @@ class UsageTracker:
             actual_jpy      手動記録した実績額（None = 未記録）
             display_jpy     表示用コスト（実績優先、なければ概算）
             total_images    生成枚数
+            cache_hits      生成キャッシュから取り出した枚数
+            saved_jpy       キャッシュで節約できた概算コスト（円）
             projected_jpy   月末予測（概算ベース）
             budget_jpy      月次予算
             budget_used_pct 予算消費率 (%)
@@ -130,6 +156,11 @@ class UsageTracker:
             if datetime.fromisoformat(r["date"]).year  == year
             and datetime.fromisoformat(r["date"]).month == month
         ]
+        hits = [
+            r for r in data["cache_hits"]
+            if datetime.fromisoformat(r["date"]).year  == year
+            and datetime.fromisoformat(r["date"]).month == month
+        ]
 
         estimated = sum(r.get("cost_jpy", 10) for r in monthly)
         total_images = len(monthly)
@@ -148,6 +179,8 @@ class UsageTracker:
             "actual_jpy":    actual_jpy,
             "display_jpy":   display_jpy,
             "total_images":  total_images,
+            "cache_hits":    len(hits),
+            "saved_jpy":     sum(r.get("saved_jpy", 0) for r in hits),
             "projected_jpy": projected,
             "budget_jpy":    MONTHLY_BUDGET_JPY,
             "budget_used_pct": round(display_jpy / MONTHLY_BUDGET_JPY * 100, 1),
@@ -163,7 +196,7 @@ class UsageTracker:
         return stats
 
     def reset_month(self, year: int = None, month: int = None) -> int:
-        """指定月の推定記録（画像ログ）を削除する。実績額は保持。"""
+        """指定月の推定記録（画像ログ・キャッシュヒット）を削除する。実績額は保持。"""
         now   = datetime.now()
         year  = year  or now.year
         month = month or now.month
@@ -178,6 +211,13 @@ class UsageTracker:
             )
         ]
         deleted = before - len(data["records"])
+        data["cache_hits"] = [
+            r for r in data["cache_hits"]
+            if not (
+                datetime.fromisoformat(r["date"]).year  == year and
+                datetime.fromisoformat(r["date"]).month == month
+            )
+        ]
         self._save(data)
         return deleted
 
@@ -192,6 +232,8 @@ def _print_stats(stats: dict) -> None:
     print(f"  Gemini API 使用量  {year}/{month:02d}")
     print("=" * 52)
     print(f"  生成枚数        : {stats['total_images']} 枚")
+    if stats.get("cache_hits"):
+        print(f"  キャッシュ      : {stats['cache_hits']} 枚（¥{stats['saved_jpy']:,} 節約）")
     if stats["actual_jpy"] is not None:
         print(f"  実績額（確認済）: ¥{stats['actual_jpy']:,}")
         print(f"  概算額          : ¥{stats['estimated_jpy']:,}（参考）")
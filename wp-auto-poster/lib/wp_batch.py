@@ -0,0 +1,156 @@
+"""
+WordPress バッチAPI（/wp-json/batch/v1）によるリクエストの集約
+
+WordPress 5.6 以降は、最大25件の書き込みリクエストを1回のHTTP通信で実行できる。
+BatchCollector は短い時間窓の間に投入されたサブリクエストを溜めてまとめて送り、
+各サブレスポンスを投入元の Future に返す。
+
+AsyncWordPressClient.batch() のコンテキスト内で発行された書き込み
+（タームの作成、メディアのメタ更新、記事フィールドの更新など）が自動的に対象になる。
+"""
+
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+# 1回のバッチに含められるサブリクエスト数（WordPress のデフォルト上限）
+BATCH_MAX_REQUESTS = 25
+
+# 最初のサブリクエストが投入されてから送信するまでの待ち時間（秒）
+# 同じタイミングで並行発行されたリクエストを1つのバッチにまとめるための猶予
+BATCH_WINDOW = 0.005
+
+# バッチAPIが受け付けるHTTPメソッド
+BATCH_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# batch() コンテキスト内かどうか（gather で生成した子タスクにも引き継がれる）
+batching_enabled: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "wp_batching_enabled", default=False,
+)
+
+
+class BatchUnsupported(Exception):
+    """サブリクエストをバッチで送れなかった（個別リクエストで送り直すべき）ことを示す"""
+    pass
+
+
+# send_batch(サブリクエストのリスト) -> サブレスポンスのリスト。
+# サーバーがバッチAPIに対応していなければ None を返す。
+SendBatch = Callable[[list[dict]], Awaitable[Optional[list[dict]]]]
+
+
+class BatchCollector:
+    """
+    サブリクエストを溜めて batch/v1 にまとめて送るコレクター。
+
+    サブリクエストは BATCH_WINDOW 秒待つか BATCH_MAX_REQUESTS 件たまった時点で送られる。
+    サーバーがバッチAPIに対応していない場合や、ルートがバッチ非対応の場合は
+    Future に BatchUnsupported を設定し、呼び出し元に個別送信させる。
+    """
+
+    def __init__(self, send_batch: SendBatch, rest_root: str):
+        """
+        Args:
+            send_batch: サブリクエストのリストを batch/v1 に送るコルーチン関数
+            rest_root: REST APIのルートURL（例: https://example.com/wp-json）
+        """
+        self._send_batch = send_batch
+        self._rest_root = rest_root.rstrip("/")
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # None: 未確認 / True: 対応 / False: 非対応（以後はバッチを使わない）
+        self.supported: Optional[bool] = None
+        # バッチ非対応と分かったルート（例: "/wp/v2/media"）
+        self._unbatchable_routes: set[str] = set()
+
+    def accepts(self, path: str) -> bool:
+        """このパスのサブリクエストをバッチに入れてよいかどうか。"""
+        return self.supported is not False and _route_of(path) not in self._unbatchable_routes
+
+    def submit(self, method: str, path: str, body: dict = None,
+               params: dict = None) -> asyncio.Future:
+        """
+        サブリクエストを投入する。
+
+        Args:
+            method: HTTPメソッド（POST / PUT / PATCH / DELETE）
+            path: REST ルートからのパス（例: /wp/v2/tags）
+            body: JSONボディ
+            params: クエリパラメータ
+
+        Returns:
+            asyncio.Future: httpx.Response（BatchUnsupported の場合もある）が設定される
+        """
+        loop = asyncio.get_running_loop()
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        sub_request = {"method": method, "path": path}
+        if body is not None:
+            sub_request["body"] = body
+
+        future = loop.create_future()
+        self._pending.append((sub_request, future))
+
+        if len(self._pending) >= BATCH_MAX_REQUESTS:
+            self._cancel_timer()
+            loop.create_task(self.flush())
+        elif self._timer is None:
+            self._timer = loop.call_later(
+                BATCH_WINDOW, lambda: loop.create_task(self.flush()),
+            )
+        return future
+
+    async def flush(self) -> None:
+        """溜まっているサブリクエストを送信し、各 Future に結果を設定する。"""
+        self._cancel_timer()
+        while self._pending:
+            chunk = self._pending[:BATCH_MAX_REQUESTS]
+            del self._pending[:BATCH_MAX_REQUESTS]
+            await self._send_chunk(chunk)
+
+    async def _send_chunk(self, chunk: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            responses = await self._send_batch([sub for sub, _ in chunk])
+        except Exception as e:
+            for _, future in chunk:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if responses is None:
+            self.supported = False
+            for _, future in chunk:
+                if not future.done():
+                    future.set_exception(BatchUnsupported("batch/v1 に対応していません"))
+            return
+
+        self.supported = True
+        for (sub, future), sub_resp in zip(chunk, responses):
+            if future.done():
+                continue
+            body = sub_resp.get("body")
+            if isinstance(body, dict) and body.get("code") == "rest_batch_not_allowed":
+                self._unbatchable_routes.add(_route_of(sub["path"]))
+                future.set_exception(BatchUnsupported(f"バッチ非対応のルート: {sub['path']}"))
+                continue
+            future.set_result(httpx.Response(
+                sub_resp.get("status", 500),
+                headers=sub_resp.get("headers") or {},
+                json=body,
+                request=httpx.Request(sub["method"], f"{self._rest_root}{sub['path']}"),
+            ))
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+def _route_of(path: str) -> str:
+    """サブリクエストのパスからID部分とクエリを除いたルートを返す（/wp/v2/media/12 → /wp/v2/media）。"""
+    path = path.split("?", 1)[0].rstrip("/")
+    head, _, last = path.rpartition("/")
+    return head if last.isdigit() else path
@@ -3,55 +3,71 @@ WordPress REST API クライアント
 
 m-totsu.com（とつブログ）への記事投稿・メディアアップロードを行う。
 認証にはアプリケーションパスワード方式（Basic認証）を使用する。
+
+実際のAPI処理は lib/async_wp_client.py の AsyncWordPressClient が担い、
+このモジュールの WordPressClient はそれを同期的に呼び出す薄いラッパーである。
 """
 
 import argparse
-import json
-import mimetypes
+import asyncio
 import sys
 from pathlib import Path
+from typing import Optional
 
-import requests
+import httpx
 
 # ──────────────────────────────────────────────
 # config読み込み（直接実行 / パッケージインポート両対応）
 # ──────────────────────────────────────────────
 try:
-    from lib.config import (
-        WP_URL, WP_USER, WP_APP_PASSWORD, WP_REST_BASE,
-        DRAFTS_DIR, validate_wp_config,
+    from lib.config import DRAFTS_DIR, validate_wp_config
+    from lib.bulk_publish import (
+        BULK_ACTIONS, DEFAULT_BULK_WORKERS, find_draft_dirs, print_bulk_report, run_bulk,
+    )
+    from lib.client_pool import ClientPool
+    from lib.draft_watcher import DEFAULT_DEBOUNCE, DraftWatcher
+    from lib.draft_build import BundleError, build_drafts, print_build_report
+    from lib.site_registry import SiteConfigError, load_sites, select_sites
+    from lib.wp_retry import RetryPolicy
+    from lib.async_wp_client import (
+        AsyncWordPressClient, ProgressCallback,
+        WordPressClientError, WordPressAuthError, WordPressAPIError,
     )
 except ImportError:
-    from config import (
-        WP_URL, WP_USER, WP_APP_PASSWORD, WP_REST_BASE,
-        DRAFTS_DIR, validate_wp_config,
+    from config import DRAFTS_DIR, validate_wp_config
+    from bulk_publish import (
+        BULK_ACTIONS, DEFAULT_BULK_WORKERS, find_draft_dirs, print_bulk_report, run_bulk,
+    )
+    from client_pool import ClientPool
+    from draft_watcher import DEFAULT_DEBOUNCE, DraftWatcher
+    from draft_build import BundleError, build_drafts, print_build_report
+    from site_registry import SiteConfigError, load_sites, select_sites
+    from wp_retry import RetryPolicy
+    from async_wp_client import (
+        AsyncWordPressClient, ProgressCallback,
+        WordPressClientError, WordPressAuthError, WordPressAPIError,
     )
-
-
-class WordPressClientError(Exception):
-    """WordPress API操作で発生するエラーの基底クラス"""
-    pass
-
-
-class WordPressAuthError(WordPressClientError):
-    """認証エラー"""
-    pass
-
-
-class WordPressAPIError(WordPressClientError):
-    """APIリクエストエラー"""
-    pass
 
 
 class WordPressClient:
     """
-    WordPress REST API クライアント
+    WordPress REST API クライアント（同期版）
 
     Basic認証を使い、記事の下書き作成・メディアアップロードなどを行う。
     デフォルト値は config.py から読み込まれるが、引数で上書きも可能。
+
+    内部に専用のイベントループを1つ持ち、AsyncWordPressClient の
+    コルーチンをその上で実行する。コネクションはループ内で使い回される。
+    イベントループ実行中のコードからは AsyncWordPressClient を直接使うこと。
     """
 
-    def __init__(self, url: str = None, user: str = None, password: str = None):
+    def __init__(self, url: str = None, user: str = None, password: str = None,
+                 upload_workers: int = None,
+                 retry_policies: dict[str, RetryPolicy] = None,
+                 use_media_index: bool = True,
+                 use_taxonomy_cache: bool = True,
+                 use_http_cache: bool = True,
+                 use_journal: bool = True):
         """
         クライアントを初期化する。
 
@@ -59,241 +75,97 @@ class WordPressClient:
             url: WordPressサイトのURL（省略時は config.WP_URL）
             user: ユーザー名（省略時は config.WP_USER）
             password: アプリケーションパスワード（省略時は config.WP_APP_PASSWORD）
+            upload_workers: メディアの同時アップロード数（省略時は config.WP_UPLOAD_WORKERS）
+            retry_policies: リクエスト種別ごとのリトライ方針（lib/wp_retry.py 参照）
+            use_media_index: False にするとメディア索引を使わず常にアップロードする
+            use_taxonomy_cache: False にするとカテゴリ・タグを毎回検索APIで解決する
+            use_http_cache: False にすると GET レスポンスのキャッシュ（条件付きリクエスト）を使わない
+            use_journal: False にすると下書きディレクトリの投稿ジャーナルを使わない
         """
-        self.site_url = (url or WP_URL).rstrip("/")
-        self.user = user or WP_USER
-        self.password = password or WP_APP_PASSWORD
-        self.rest_base = f"{self.site_url}/wp-json/wp/v2"
-        self.auth = (self.user, self.password)
-
-        # セッションを使い回してコネクションを効率化
-        self.session = requests.Session()
-        self.session.auth = self.auth
-        self.session.headers.update({
-            "User-Agent": "wp-auto-poster/1.0",
-        })
+        self._loop = asyncio.new_event_loop()
+        self.aclient = AsyncWordPressClient(
+            url=url, user=user, password=password,
+            upload_workers=upload_workers, retry_policies=retry_policies,
+            use_media_index=use_media_index,
+            use_taxonomy_cache=use_taxonomy_cache,
+            use_http_cache=use_http_cache,
+            use_journal=use_journal,
+        )
+        self.site_url = self.aclient.site_url
+        self.user = self.aclient.user
+        self.password = self.aclient.password
+        self.rest_base = self.aclient.rest_base
+        self.auth = self.aclient.auth
+        self.upload_workers = self.aclient.upload_workers
+        self.metrics = self.aclient.metrics
+
+    def __enter__(self) -> "WordPressClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """コネクションとイベントループを閉じる。"""
+        if self._loop.is_closed():
+            return
+        self._run(self.aclient.aclose())
+        self._loop.close()
+
+    def _run(self, coro):
+        """コルーチンを内部イベントループで完了まで実行する。"""
+        return self._loop.run_until_complete(coro)
 
     # ──────────────────────────────────────────
     # 内部ヘルパー
     # ──────────────────────────────────────────
 
-    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        """
-        REST APIへのリクエストを送り、レスポンスを検証して返す。
-
-        Args:
-            method: HTTPメソッド（GET, POST, PUT, DELETE）
-            endpoint: エンドポイントパス（例: /posts）
-            **kwargs: requests に渡す追加引数
-
-        Returns:
-            requests.Response オブジェクト
+    def _request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """AsyncWordPressClient._request の同期版。"""
+        return self._run(self.aclient._request(method, endpoint, **kwargs))
 
-        Raises:
-            WordPressAuthError: 401/403 エラー時
-            WordPressAPIError: その他のHTTPエラー時
-        """
-        url = f"{self.rest_base}{endpoint}"
-        try:
-            resp = self.session.request(method, url, timeout=30, **kwargs)
-        except requests.ConnectionError as e:
-            raise WordPressClientError(
-                f"接続エラー: {self.site_url} に接続できません。\n詳細: {e}"
-            )
-        except requests.Timeout:
-            raise WordPressClientError(
-                f"タイムアウト: {url} からの応答がありません。"
-            )
-
-        if resp.status_code in (401, 403):
-            raise WordPressAuthError(
-                f"認証エラー ({resp.status_code}): "
-                f"ユーザー名またはアプリケーションパスワードを確認してください。\n"
-                f"レスポンス: {resp.text[:300]}"
-            )
-
-        if not resp.ok:
-            # APIが返すエラーメッセージを抽出
-            try:
-                err_data = resp.json()
-                msg = err_data.get("message", resp.text[:300])
-            except (ValueError, KeyError):
-                msg = resp.text[:300]
-            raise WordPressAPIError(
-                f"APIエラー ({resp.status_code}): {msg}\n"
-                f"エンドポイント: {method} {url}"
-            )
-
-        return resp
-
-    def _get(self, endpoint: str, params: dict = None) -> requests.Response:
+    def _get(self, endpoint: str, params: dict = None) -> httpx.Response:
         """GETリクエストのショートカット"""
-        return self._request("GET", endpoint, params=params)
+        return self._run(self.aclient._get(endpoint, params=params))
 
-    def _post(self, endpoint: str, **kwargs) -> requests.Response:
+    def _post(self, endpoint: str, **kwargs) -> httpx.Response:
         """POSTリクエストのショートカット"""
-        return self._request("POST", endpoint, **kwargs)
+        return self._run(self.aclient._post(endpoint, **kwargs))
+
+    def batch_requests(self, requests: list[dict]) -> list:
+        """複数の書き込みリクエストを batch/v1 でまとめて実行する。"""
+        return self._run(self.aclient.batch_requests(requests))
 
     # ──────────────────────────────────────────
     # 接続・認証テスト
     # ──────────────────────────────────────────
 
     def check_connection(self) -> bool:
-        """
-        REST APIへの接続を確認する。
-
-        Returns:
-            True: 接続成功
-            False: 接続失敗
-
-        Note:
-            認証なしで /wp-json/ にアクセスし、APIの存在を確認する。
-        """
-        url = f"{self.site_url}/wp-json/"
-        try:
-            resp = requests.get(url, timeout=10)
-            if resp.ok:
-                data = resp.json()
-                site_name = data.get("name", "(不明)")
-                print(f"[OK] REST API接続成功: {site_name} ({self.site_url})")
-                return True
-            else:
-                print(f"[NG] REST API応答エラー: HTTP {resp.status_code}")
-                return False
-        except requests.ConnectionError:
-            print(f"[NG] 接続失敗: {self.site_url} に到達できません")
-            return False
-        except Exception as e:
-            print(f"[NG] 予期しないエラー: {e}")
-            return False
+        """REST APIへの接続を確認する。"""
+        return self._run(self.aclient.check_connection())
 
     def check_authentication(self) -> dict:
-        """
-        認証テストを行い、ログインユーザーの情報を返す。
-
-        Returns:
-            dict: {"id": user_id, "name": display_name, "roles": [...]}
-
-        Raises:
-            WordPressAuthError: 認証失敗時
-        """
-        resp = self._get("/users/me", params={"context": "edit"})
-        user_data = resp.json()
-
-        result = {
-            "id": user_data.get("id"),
-            "name": user_data.get("name", ""),
-            "slug": user_data.get("slug", ""),
-            "roles": user_data.get("roles", []),
-        }
-        print(f"[OK] 認証成功: {result['name']} (ID: {result['id']}, "
-              f"権限: {', '.join(result['roles'])})")
-        return result
+        """認証テストを行い、ログインユーザーの情報を返す。"""
+        return self._run(self.aclient.check_authentication())
 
     # ──────────────────────────────────────────
     # メディアアップロード
     # ──────────────────────────────────────────
 
     def upload_media(self, file_path: str, alt_text: str = "",
-                     title: str = "", caption: str = "") -> dict:
-        """
-        画像をメディアライブラリにアップロードする。
-
-        Args:
-            file_path: アップロードするファイルのパス
-            alt_text: 代替テキスト（SEO用）
-            title: メディアのタイトル
-            caption: キャプション
-
-        Returns:
-            dict: {"id": media_id, "url": source_url, "alt": alt_text}
-
-        Raises:
-            FileNotFoundError: ファイルが存在しない場合
-            WordPressAPIError: アップロード失敗時
-        """
-        path = Path(file_path)
-        if not path.exists():
-            raise FileNotFoundError(f"ファイルが見つかりません: {file_path}")
-
-        # MIMEタイプを推定
-        mime_type, _ = mimetypes.guess_type(str(path))
-        if mime_type is None:
-            mime_type = "application/octet-stream"
-
-        # ファイルを読み込んでアップロード
-        with open(path, "rb") as f:
-            file_data = f.read()
-
-        headers = {
-            "Content-Type": mime_type,
-            "Content-Disposition": f'attachment; filename="{path.name}"',
-        }
-
-        print(f"  アップロード中: {path.name} ({len(file_data) / 1024:.1f} KB)")
-
-        resp = self._post("/media", headers=headers, data=file_data)
-        media = resp.json()
-        media_id = media["id"]
-        source_url = media.get("source_url", "")
-
-        # alt_text, title, caption を更新（指定がある場合）
-        update_data = {}
-        if alt_text:
-            update_data["alt_text"] = alt_text
-        if title:
-            update_data["title"] = title
-        if caption:
-            update_data["caption"] = caption
-
-        if update_data:
-            self._request("POST", f"/media/{media_id}", json=update_data)
-
-        result = {
-            "id": media_id,
-            "url": source_url,
-            "alt": alt_text or media.get("alt_text", ""),
-        }
-        print(f"  [OK] アップロード完了: ID={media_id}")
-        return result
-
-    def upload_multiple_media(self, files: list[dict]) -> list[dict]:
-        """
-        複数の画像を一括アップロードする。
-
-        Args:
-            files: アップロードファイルのリスト
-                   [{"path": "...", "alt": "...", "title": "...", "caption": "..."}]
-
-        Returns:
-            list[dict]: 各ファイルのアップロード結果リスト
-        """
-        results = []
-        total = len(files)
-
-        print(f"画像アップロード開始（全{total}件）")
-        for i, file_info in enumerate(files, 1):
-            print(f"  [{i}/{total}] ", end="")
-            try:
-                result = self.upload_media(
-                    file_path=file_info["path"],
-                    alt_text=file_info.get("alt", ""),
-                    title=file_info.get("title", ""),
-                    caption=file_info.get("caption", ""),
-                )
-                results.append(result)
-            except Exception as e:
-                print(f"  [NG] 失敗: {file_info['path']} - {e}")
-                results.append({
-                    "id": None,
-                    "url": None,
-                    "alt": file_info.get("alt", ""),
-                    "error": str(e),
-                })
-
-        success_count = sum(1 for r in results if r.get("id") is not None)
-        print(f"画像アップロード完了: {success_count}/{total} 件成功")
-        return results
+                     title: str = "", caption: str = "",
+                     progress: Optional[ProgressCallback] = None,
+                     fields: tuple = None) -> dict:
+        """画像をメディアライブラリにアップロードする（ファイルはストリーム送信）。"""
+        return self._run(self.aclient.upload_media(
+            file_path, alt_text=alt_text, title=title, caption=caption,
+            progress=progress, fields=fields,
+        ))
+
+    def upload_multiple_media(self, files: list[dict],
+                              progress: Optional[ProgressCallback] = None) -> list[dict]:
+        """複数の画像を一括アップロードする（最大 upload_workers 件を並行実行）。"""
+        return self._run(self.aclient.upload_multiple_media(files, progress=progress))
 
     # ──────────────────────────────────────────
     # 記事投稿
@@ -304,766 +176,64 @@ class WordPressClient:
                      categories: list[int] = None,
                      tags: list[int] = None,
                      meta: dict = None,
-                     slug: str = None) -> dict:
-        """
-        下書き記事を作成する。
+                     slug: str = None,
+                     fields: tuple = None) -> dict:
+        """下書き記事を作成する。"""
+        return self._run(self.aclient.create_draft(
+            title, content,
+            featured_media_id=featured_media_id,
+            categories=categories,
+            tags=tags,
+            meta=meta,
+            slug=slug,
+            fields=fields,
+        ))
 
-        Args:
-            title: 記事タイトル
-            content: 記事本文（Gutenbergブロック形式HTML）
-            featured_media_id: アイキャッチ画像のメディアID
-            categories: カテゴリIDのリスト
-            tags: タグIDのリスト
-            meta: メタフィールド（Yoast SEO等）
-            slug: URLスラッグ
-
-        Returns:
-            dict: {"id": post_id, "url": edit_url, "preview_url": preview_url}
-
-        Note:
-            status は常に 'draft' で投稿される。
-            meta に Yoast SEO フィールドを含めることが可能:
-            - _yoast_wpseo_title: SEOタイトル
-            - _yoast_wpseo_metadesc: メタディスクリプション
-            - _yoast_wpseo_focuskw: フォーカスキーワード
-        """
-        post_data = {
-            "title": title,
-            "content": content,
-            "status": "draft",
-        }
-
-        if featured_media_id:
-            post_data["featured_media"] = featured_media_id
-        if categories:
-            post_data["categories"] = categories
-        if tags:
-            post_data["tags"] = tags
-        if slug:
-            post_data["slug"] = slug
-
-        # Yoast SEO メタフィールド
-        if meta:
-            post_data["meta"] = {}
-            yoast_fields = [
-                "_yoast_wpseo_title",
-                "_yoast_wpseo_metadesc",
-                "_yoast_wpseo_focuskw",
-            ]
-            for field in yoast_fields:
-                if field in meta:
-                    post_data["meta"][field] = meta[field]
-            # その他のカスタムメタフィールドもそのまま渡す
-            for key, value in meta.items():
-                if key not in yoast_fields:
-                    post_data["meta"][key] = value
-
-        print(f"下書き投稿中: 「{title}」")
-        resp = self._post("/posts", json=post_data)
-        post = resp.json()
-
-        post_id = post["id"]
-        # WordPress管理画面の編集URL
-        edit_url = f"{self.site_url}/wp-admin/post.php?post={post_id}&action=edit"
-        # プレビューURL
-        preview_url = post.get("link", "")
-        if preview_url:
-            preview_url += "?preview=true" if "?" not in preview_url else "&preview=true"
-
-        result = {
-            "id": post_id,
-            "url": edit_url,
-            "preview_url": preview_url,
-        }
-        print(f"[OK] 下書き作成完了: ID={post_id}")
-        print(f"     編集URL: {edit_url}")
-        return result
-
-    def update_post(self, post_id: int, content: str,
+    def update_post(self, post_id: int, content: str = None,
                     title: str = None,
                     featured_media_id: int = None,
                     categories: list[int] = None,
                     tags: list[int] = None,
                     meta: dict = None,
-                    slug: str = None) -> dict:
-        """
-        既存の記事を更新する（本文・タイトル・メタ等）。
-
-        Args:
-            post_id: 更新対象の記事ID
-            content: 新しい記事本文（Gutenbergブロック形式HTML）
-            title: 新しいタイトル（省略時は変更しない）
-            featured_media_id: アイキャッチ画像のメディアID（省略時は変更しない）
-            categories: カテゴリIDのリスト（省略時は変更しない）
-            tags: タグIDのリスト（省略時は変更しない）
-            meta: メタフィールド（Yoast SEO等）
-            slug: URLスラッグ（省略時は変更しない）
-
-        Returns:
-            dict: {"id": post_id, "url": edit_url, "preview_url": preview_url}
-
-        Note:
-            status は変更しない（現在のステータスを維持する）。
-        """
-        post_data: dict = {"content": content}
-
-        if title is not None:
-            post_data["title"] = title
-        if featured_media_id is not None:
-            post_data["featured_media"] = featured_media_id
-        if categories is not None:
-            post_data["categories"] = categories
-        if tags is not None:
-            post_data["tags"] = tags
-        if slug is not None:
-            post_data["slug"] = slug
-
-        # Yoast SEO メタフィールド
-        if meta:
-            post_data["meta"] = {}
-            yoast_fields = [
-                "_yoast_wpseo_title",
-                "_yoast_wpseo_metadesc",
-                "_yoast_wpseo_focuskw",
-            ]
-            for field in yoast_fields:
-                if field in meta:
-                    post_data["meta"][field] = meta[field]
-            for key, value in meta.items():
-                if key not in yoast_fields:
-                    post_data["meta"][key] = value
-
-        print(f"記事更新中: ID={post_id}" + (f" 「{title}」" if title else ""))
-        resp = self._request("POST", f"/posts/{post_id}", json=post_data)
-        post = resp.json()
-
-        edit_url = f"{self.site_url}/wp-admin/post.php?post={post_id}&action=edit"
-        preview_url = post.get("link", "")
-        if preview_url:
-            preview_url += "?preview=true" if "?" not in preview_url else "&preview=true"
-
-        result = {
-            "id": post_id,
-            "url": edit_url,
-            "preview_url": preview_url,
-        }
-        print(f"[OK] 記事更新完了: ID={post_id}")
-        print(f"     編集URL: {edit_url}")
-        return result
-
-    def update_post_from_dir(self, post_id: int, draft_dir: str) -> dict:
-        """
-        drafts/{slug}/ ディレクトリの内容で既存の記事を更新する。
-
-        既存画像（images/）は再アップロードせず、image_results.json の
-        アップロード済み情報（media_id / url）を再利用する。
-        新しい画像がある場合のみアップロードする。
-
-        Args:
-            post_id: 更新対象の記事ID
-            draft_dir: 下書きディレクトリのパス
-
-        Returns:
-            dict: {"post_id": ..., "edit_url": ..., "media_ids": [...]}
-        """
-        draft_path = Path(draft_dir)
-        if not draft_path.is_dir():
-            raise FileNotFoundError(f"下書きディレクトリが見つかりません: {draft_dir}")
-
-        print(f"{'='*60}")
-        print(f"記事更新開始: ID={post_id} / {draft_path.name}")
-        print(f"{'='*60}")
-
-        # ── 1. meta.json を読み込み ──
-        meta_file = draft_path / "meta.json"
-        if not meta_file.exists():
-            raise FileNotFoundError(f"meta.json が見つかりません: {meta_file}")
-
-        with open(meta_file, "r", encoding="utf-8") as f:
-            meta = json.load(f)
-
-        title = meta.get("title")
-        slug = meta.get("slug")
-        category_names = meta.get("categories", [])
-        tag_names = meta.get("tags", [])
-        seo_meta = {}
-        if "seo_title" in meta:
-            seo_meta["_yoast_wpseo_title"] = meta["seo_title"]
-        if "seo_description" in meta:
-            seo_meta["_yoast_wpseo_metadesc"] = meta["seo_description"]
-        if "focus_keyword" in meta:
-            seo_meta["_yoast_wpseo_focuskw"] = meta["focus_keyword"]
-        # yoast_seo フィールドも直接読み込む
-        yoast = meta.get("yoast_seo", {})
-        for k, v in yoast.items():
-            seo_meta[k] = v
-
-        print(f"タイトル: {title}")
-
-        # ── 2. 画像マップの構築（アップロード済み情報を再利用） ──
-        image_map = {}
-        featured_media_id = None
-        media_ids = []
-
-        image_results_file = draft_path / "image_results.json"
-        image_results = {}
-        if image_results_file.exists():
-            with open(image_results_file, "r", encoding="utf-8") as f:
-                image_results = json.load(f)
-
-        # image_results.json に uploaded_media が記録されていれば再利用
-        uploaded = image_results.get("uploaded_media", {})
-        if uploaded:
-            print("\n画像: アップロード済み情報を再利用します")
-            for img_id, img_data in uploaded.items():
-                image_map[img_id] = img_data
-                media_ids.append(img_data.get("media_id"))
-                if img_data.get("eyecatch"):
-                    featured_media_id = img_data.get("media_id")
-            if featured_media_id is None and media_ids:
-                featured_media_id = media_ids[0]
-        else:
-            # 既存画像ディレクトリがある場合は再アップロード（フォールバック）
-            images_dir = draft_path / "images"
-            if images_dir.is_dir():
-                image_files = sorted(
-                    p for p in images_dir.iterdir()
-                    if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg")
-                )
-                if image_files:
-                    print(f"\n画像再アップロード（{len(image_files)}件）:")
-                    for img_path in image_files:
-                        img_info = _find_image_info(image_results, img_path.name)
-                        alt_text = img_info.get("alt", "")
-                        image_id = img_info.get("id", img_path.stem)
-                        result = self.upload_media(
-                            file_path=str(img_path),
-                            alt_text=alt_text,
-                            title=img_info.get("title", ""),
-                            caption=img_info.get("caption", ""),
-                        )
-                        if result.get("id"):
-                            image_map[image_id] = {
-                                "url": result["url"],
-                                "media_id": result["id"],
-                                "alt": result.get("alt", alt_text),
-                            }
-                            media_ids.append(result["id"])
-                            is_eyecatch = img_info.get("eyecatch", False)
-                            if is_eyecatch or (
-                                featured_media_id is None and "eyecatch" in img_path.stem.lower()
-                            ):
-                                featured_media_id = result["id"]
-                    if featured_media_id is None and media_ids:
-                        featured_media_id = media_ids[0]
-
-        # ── 3. article.html を読み込み、プレースホルダーを置換 ──
-        article_file = draft_path / "article.html"
-        if not article_file.exists():
-            raise FileNotFoundError(f"article.html が見つかりません: {article_file}")
-
-        with open(article_file, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        content = _replace_image_placeholders(content, image_map)
-
-        # ── 3.5. アフィリエイトプレースホルダーを置換 ──
-        affiliate_section_file = draft_path / "affiliate_section.html"
-        if affiliate_section_file.exists():
-            with open(affiliate_section_file, "r", encoding="utf-8") as f:
-                affiliate_html = f.read()
-            if affiliate_html.strip():
-                content = _replace_affiliate_placeholders(content, affiliate_html)
-                print(f"  アフィリエイトリンク挿入完了")
-            else:
-                content = _replace_affiliate_placeholders(content, "")
-        else:
-            content = _replace_affiliate_placeholders(content, "")
-
-        print(f"\n記事本文: {len(content)} 文字")
-
-        # ── 4. カテゴリ・タグのID解決 ──
-        category_ids = []
-        if category_names:
-            print(f"\nカテゴリ解決:")
-            for name in category_names:
-                cat_id = self.get_or_create_category(name)
-                category_ids.append(cat_id)
-
-        tag_ids = []
-        if tag_names:
-            print(f"\nタグ解決:")
-            for name in tag_names:
-                tag_id = self.get_or_create_tag(name)
-                tag_ids.append(tag_id)
-
-        # ── 5. 記事更新 ──
-        print(f"\n更新処理:")
-        post_result = self.update_post(
-            post_id=post_id,
-            content=content,
+                    slug: str = None,
+                    fields: tuple = None,
+                    only_changed: bool = True) -> dict:
+        """既存の記事を更新する（現在値と異なるフィールドだけを送る）。"""
+        return self._run(self.aclient.update_post(
+            post_id, content,
             title=title,
             featured_media_id=featured_media_id,
-            categories=category_ids if category_ids else None,
-            tags=tag_ids if tag_ids else None,
-            meta=seo_meta if seo_meta else None,
+            categories=categories,
+            tags=tags,
+            meta=meta,
             slug=slug,
-        )
-
-        result = {
-            "post_id": post_result["id"],
-            "edit_url": post_result["url"],
-            "preview_url": post_result.get("preview_url", ""),
-            "media_ids": media_ids,
-        }
+            fields=fields,
+            only_changed=only_changed,
+        ))
 
-        print(f"\n{'='*60}")
-        print(f"更新完了!")
-        print(f"  記事ID: {result['post_id']}")
-        print(f"  編集URL: {result['edit_url']}")
-        print(f"{'='*60}")
-
-        return result
+    def update_post_from_dir(self, post_id: int, draft_dir: str) -> dict:
+        """drafts/{slug}/ ディレクトリの内容で既存の記事を更新する。"""
+        return self._run(self.aclient.update_post_from_dir(post_id, draft_dir))
 
     # ──────────────────────────────────────────
     # カテゴリ・タグ管理
     # ──────────────────────────────────────────
 
     def get_or_create_category(self, name: str) -> int:
-        """
-        カテゴリ名からIDを取得する。存在しなければ新規作成する。
-
-        Args:
-            name: カテゴリ名
-
-        Returns:
-            int: カテゴリID
-        """
-        # まず既存カテゴリを検索
-        resp = self._get("/categories", params={"search": name, "per_page": 100})
-        categories = resp.json()
-
-        for cat in categories:
-            if cat["name"].lower() == name.lower():
-                print(f"  カテゴリ取得: 「{name}」 (ID: {cat['id']})")
-                return cat["id"]
-
-        # 見つからなければ作成
-        resp = self._post("/categories", json={"name": name})
-        new_cat = resp.json()
-        print(f"  カテゴリ作成: 「{name}」 (ID: {new_cat['id']})")
-        return new_cat["id"]
+        """カテゴリ名からIDを取得する。存在しなければ新規作成する。"""
+        return self._run(self.aclient.get_or_create_category(name))
 
     def get_or_create_tag(self, name: str) -> int:
-        """
-        タグ名からIDを取得する。存在しなければ新規作成する。
-
-        Args:
-            name: タグ名
-
-        Returns:
-            int: タグID
-        """
-        # まず既存タグを検索
-        resp = self._get("/tags", params={"search": name, "per_page": 100})
-        tags = resp.json()
-
-        for tag in tags:
-            if tag["name"].lower() == name.lower():
-                print(f"  タグ取得: 「{name}」 (ID: {tag['id']})")
-                return tag["id"]
-
-        # 見つからなければ作成
-        resp = self._post("/tags", json={"name": name})
-        new_tag = resp.json()
-        print(f"  タグ作成: 「{name}」 (ID: {new_tag['id']})")
-        return new_tag["id"]
+        """タグ名からIDを取得する。存在しなければ新規作成する。"""
+        return self._run(self.aclient.get_or_create_tag(name))
 
     # ──────────────────────────────────────────
     # ディレクトリからの一括投稿
     # ──────────────────────────────────────────
 
-    def publish_draft_from_dir(self, draft_dir: str) -> dict:
-        """
-        drafts/{slug}/ ディレクトリから一括で下書き投稿を行う。
-
-        ディレクトリ構成:
-            drafts/{slug}/
-                article.html       - 記事本文（Gutenbergブロック形式）
-                meta.json          - メタ情報（タイトル、カテゴリ等）
-                images/            - アップロードする画像
-                image_results.json - 画像生成結果（IDとファイル名のマッピング）
-
-        処理手順:
-            1. meta.json を読み込み
-            2. images/ 内の画像をアップロード
-            3. article.html を読み込み、画像プレースホルダーを実URLに置換
-            4. カテゴリ・タグのID解決
-            5. 下書き投稿
-
-        Args:
-            draft_dir: 下書きディレクトリのパス
-
-        Returns:
-            dict: {"post_id": ..., "edit_url": ..., "media_ids": [...]}
-        """
-        draft_path = Path(draft_dir)
-        if not draft_path.is_dir():
-            raise FileNotFoundError(f"下書きディレクトリが見つかりません: {draft_dir}")
-
-        print(f"{'='*60}")
-        print(f"下書き投稿開始: {draft_path.name}")
-        print(f"{'='*60}")
-
-        # ── 1. meta.json を読み込み ──
-        meta_file = draft_path / "meta.json"
-        if not meta_file.exists():
-            raise FileNotFoundError(f"meta.json が見つかりません: {meta_file}")
-
-        with open(meta_file, "r", encoding="utf-8") as f:
-            meta = json.load(f)
-
-        title = meta.get("title", draft_path.name)
-        slug = meta.get("slug", "")
-        category_names = meta.get("categories", [])
-        tag_names = meta.get("tags", [])
-        seo_meta = {}
-        if "seo_title" in meta:
-            seo_meta["_yoast_wpseo_title"] = meta["seo_title"]
-        if "seo_description" in meta:
-            seo_meta["_yoast_wpseo_metadesc"] = meta["seo_description"]
-        if "focus_keyword" in meta:
-            seo_meta["_yoast_wpseo_focuskw"] = meta["focus_keyword"]
-
-        print(f"タイトル: {title}")
-
-        # ── 2. 画像アップロード ──
-        images_dir = draft_path / "images"
-        image_map = {}  # image_id -> {"url": ..., "media_id": ...}
-        media_ids = []
-        featured_media_id = None
-
-        # image_results.json がある場合はそこから画像IDとファイル名のマッピングを取得
-        image_results_file = draft_path / "image_results.json"
-        image_results = {}
-        if image_results_file.exists():
-            with open(image_results_file, "r", encoding="utf-8") as f:
-                image_results = json.load(f)
-
-        if images_dir.is_dir():
-            image_files = sorted(
-                p for p in images_dir.iterdir()
-                if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg")
-            )
-
-            if image_files:
-                print(f"\n画像アップロード（{len(image_files)}件）:")
-
-                for img_path in image_files:
-                    # image_results.json からマッピング情報を取得
-                    img_info = _find_image_info(image_results, img_path.name)
-                    alt_text = img_info.get("alt", "")
-                    image_id = img_info.get("id", img_path.stem)
-
-                    result = self.upload_media(
-                        file_path=str(img_path),
-                        alt_text=alt_text,
-                        title=img_info.get("title", ""),
-                        caption=img_info.get("caption", ""),
-                    )
-
-                    if result.get("id"):
-                        image_map[image_id] = {
-                            "url": result["url"],
-                            "media_id": result["id"],
-                            "alt": result.get("alt", alt_text),
-                        }
-                        media_ids.append(result["id"])
-
-                        # 最初の画像またはeyecatch指定をアイキャッチにする
-                        is_eyecatch = img_info.get("eyecatch", False)
-                        if is_eyecatch or (featured_media_id is None and "eyecatch" in img_path.stem.lower()):
-                            featured_media_id = result["id"]
-
-                # アイキャッチが見つからなかった場合、最初の画像を使用
-                if featured_media_id is None and media_ids:
-                    featured_media_id = media_ids[0]
-
-        # ── 3. article.html を読み込み、プレースホルダーを置換 ──
-        article_file = draft_path / "article.html"
-        if not article_file.exists():
-            raise FileNotFoundError(f"article.html が見つかりません: {article_file}")
-
-        with open(article_file, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        # <!-- IMAGE: {image_id} --> 形式のプレースホルダーを置換
-        content = _replace_image_placeholders(content, image_map)
-
-        # ── 3.5. アフィリエイトプレースホルダーを置換 ──
-        affiliate_section_file = draft_path / "affiliate_section.html"
-        if affiliate_section_file.exists():
-            with open(affiliate_section_file, "r", encoding="utf-8") as f:
-                affiliate_html = f.read()
-            if affiliate_html.strip():
-                content = _replace_affiliate_placeholders(content, affiliate_html)
-                print(f"  アフィリエイトリンク挿入完了")
-            else:
-                content = _replace_affiliate_placeholders(content, "")
-                print(f"  アフィリエイトリンク: なし（空ファイル）")
-        else:
-            # affiliate_section.htmlがない場合、プレースホルダーを削除
-            content = _replace_affiliate_placeholders(content, "")
-
-        print(f"\n記事本文: {len(content)} 文字")
-
-        # ── 4. カテゴリ・タグのID解決 ──
-        category_ids = []
-        if category_names:
-            print(f"\nカテゴリ解決:")
-            for name in category_names:
-                cat_id = self.get_or_create_category(name)
-                category_ids.append(cat_id)
-
-        tag_ids = []
-        if tag_names:
-            print(f"\nタグ解決:")
-            for name in tag_names:
-                tag_id = self.get_or_create_tag(name)
-                tag_ids.append(tag_id)
-
-        # ── 5. 下書き投稿 ──
-        print(f"\n投稿処理:")
-        post_result = self.create_draft(
-            title=title,
-            content=content,
-            featured_media_id=featured_media_id,
-            categories=category_ids if category_ids else None,
-            tags=tag_ids if tag_ids else None,
-            meta=seo_meta if seo_meta else None,
-            slug=slug if slug else None,
-        )
-
-        result = {
-            "post_id": post_result["id"],
-            "edit_url": post_result["url"],
-            "preview_url": post_result.get("preview_url", ""),
-            "media_ids": media_ids,
-        }
-
-        print(f"\n{'='*60}")
-        print(f"投稿完了!")
-        print(f"  記事ID: {result['post_id']}")
-        print(f"  編集URL: {result['edit_url']}")
-        print(f"  画像数: {len(media_ids)}")
-        print(f"{'='*60}")
-
-        return result
-
-
-# ──────────────────────────────────────────────
-# ユーティリティ関数
-# ──────────────────────────────────────────────
-
-def _find_image_info(image_results, filename: str) -> dict:
-    """
-    image_results.json から画像ファイル名に対応する情報を検索する。
-
-    新形式（image_client.py 出力）:
-        {
-            "eyecatch": {"path": "images/eyecatch.png", "alt": "..."},
-            "illustrations": [{"id": "illust_1", "path": "images/illustration_1.png", "alt": "...", "caption": "..."}],
-            "diagrams":      [{"id": "diagram_1",  "path": "images/diagram_1.png",  "alt": "...", "caption": "..."}]
-        }
-
-    旧形式（後方互換）:
-        {
-            "images": [{"id": "eyecatch", "filename": "eyecatch.png", "alt": "...", "eyecatch": true}, ...]
-        }
-
-    Args:
-        image_results: image_results.json の内容（dict）
-        filename: 検索するファイル名
-
-    Returns:
-        dict: 画像情報。見つからなければ空のdict
-    """
-    from pathlib import Path as _Path
-
-    # ── リスト形式の場合 ──
-    if isinstance(image_results, list):
-        for item in image_results:
-            if not isinstance(item, dict):
-                continue
-            # path フィールドでマッチ
-            item_path = item.get("path", "")
-            if item_path and (_Path(item_path).name == filename or item_path == filename):
-                result = dict(item)
-                result["filename"] = filename
-                return result
-            # id フィールド（拡張子なし）でマッチ
-            if item.get("id") and filename.startswith(item["id"]):
-                result = dict(item)
-                result["filename"] = filename
-                return result
-        return {}
-
-    # 以下は dict 形式の処理
-    if not isinstance(image_results, dict):
-        return {}
-
-    # ── 新形式: eyecatch ──
-    eyecatch = image_results.get("eyecatch")
-    if eyecatch and isinstance(eyecatch, dict):
-        ec_path = eyecatch.get("path", "")
-        if _Path(ec_path).name == filename or ec_path == filename:
-            result = dict(eyecatch)
-            result.setdefault("id", "eyecatch")
-            result["eyecatch"] = True
-            result["filename"] = filename
-            return result
-
-    # ── 新形式: illustrations / diagrams ──
-    for key in ("illustrations", "diagrams", "screenshots"):
-        items = image_results.get(key, [])
-        if not isinstance(items, list):
-            continue
-        for item in items:
-            item_path = item.get("path", "")
-            # path のファイル名部分でマッチ
-            if _Path(item_path).name == filename or item_path == filename:
-                result = dict(item)
-                result["filename"] = filename
-                return result
-
-    # ── 旧形式: images 配列 ──
-    images = image_results.get("images", [])
-
-    if isinstance(images, list):
-        for img in images:
-            if img.get("filename") == filename:
-                return img
-            # 拡張子なしのIDでもマッチ
-            if img.get("id") and filename.startswith(img["id"]):
-                return img
-
-    # dict形式（キーがimage_id）の場合
-    if isinstance(images, dict):
-        for img_id, img_info in images.items():
-            if img_info.get("filename") == filename:
-                result = dict(img_info)
-                result.setdefault("id", img_id)
-                return result
-
-    return {}
-
-
-def _replace_affiliate_placeholders(content: str, affiliate_section_html: str) -> str:
-    """
-    記事HTML内のアフィリエイトプレースホルダーを実際のHTMLに置換する。
-
-    プレースホルダー形式:
-        <!-- AFFILIATE_BOOKS -->
-
-    Args:
-        content: 記事HTML
-        affiliate_section_html: 挿入するアフィリエイトセクションのHTML
-
-    Returns:
-        str: 置換後の記事HTML
-    """
-    import re
-
-    placeholder_pattern = r'<!-- AFFILIATE_BOOKS -->'
-
-    if not affiliate_section_html or not affiliate_section_html.strip():
-        # アフィリエイトHTMLが空の場合、プレースホルダーを削除
-        result = re.sub(placeholder_pattern, '', content)
-        return result
-
-    # プレースホルダーを実際のHTMLに置換
-    result = re.sub(placeholder_pattern, affiliate_section_html, content)
-
-    if result == content and '<!-- AFFILIATE_BOOKS -->' in content:
-        # 正規表現で置換できなかった場合のフォールバック
-        result = content.replace('<!-- AFFILIATE_BOOKS -->', affiliate_section_html)
-
-    return result
-
-
-def _replace_image_placeholders(content: str, image_map: dict) -> str:
-    """
-    記事HTML内の画像プレースホルダーを実際の画像ブロックに置換する。
-
-    プレースホルダー形式:
-        <!-- IMAGE: {image_id} -->
-        <!-- IMAGE: {image_id} alt="説明文" caption="キャプション" -->
-
-    Args:
-        content: 記事HTML
-        image_map: image_id -> {"url": ..., "media_id": ..., "alt": ...} のマッピング
-
-    Returns:
-        str: 置換後の記事HTML
-    """
-    import re
-
-    def replace_match(match):
-        full_match = match.group(0)
-        image_id = match.group(1).strip()
-        attrs_str = match.group(2) or ""
-
-        if image_id not in image_map:
-            print(f"  [警告] 画像ID '{image_id}' のマッピングが見つかりません。"
-                  f"プレースホルダーをそのまま残します。")
-            return full_match
-
-        img_data = image_map[image_id]
-        url = img_data["url"]
-        media_id = img_data.get("media_id", "")
-        alt = img_data.get("alt", "")
-        caption = ""
-
-        # 属性文字列からalt, captionを抽出（プレースホルダー側の指定を優先）
-        alt_match = re.search(r'alt="([^"]*)"', attrs_str)
-        if alt_match:
-            alt = alt_match.group(1)
-        caption_match = re.search(r'caption="([^"]*)"', attrs_str)
-        if caption_match:
-            caption = caption_match.group(1)
-
-        # Gutenberg画像ブロックを生成
-        block_attrs = {"id": media_id} if media_id else {}
-        attrs_json = json.dumps(block_attrs) if block_attrs else ""
-        block_comment_open = f"<!-- wp:image {attrs_json} -->" if attrs_json else "<!-- wp:image -->"
-
-        figure_class = f'wp-block-image'
-        if media_id:
-            figure_class += f' wp-image-{media_id}'
-
-        img_tag = f'<img src="{url}" alt="{alt}" class="wp-image-{media_id}"/>' if media_id else f'<img src="{url}" alt="{alt}"/>'
-
-        if caption:
-            inner_html = (
-                f'<figure class="{figure_class}">'
-                f'{img_tag}'
-                f'<figcaption class="wp-element-caption">{caption}</figcaption>'
-                f'</figure>'
-            )
-        else:
-            inner_html = (
-                f'<figure class="{figure_class}">'
-                f'{img_tag}'
-                f'</figure>'
-            )
-
-        return f'{block_comment_open}\n{inner_html}\n<!-- /wp:image -->'
-
-    # <!-- IMAGE: image_id --> 形式のプレースホルダーを検索・置換
-    pattern = r'<!-- IMAGE:\s*(\S+)((?:\s+\w+="[^"]*")*)\s*-->'
-    result = re.sub(pattern, replace_match, content)
-
-    return result
+    def publish_draft_from_dir(self, draft_dir: str, require_built: bool = False) -> dict:
+        """drafts/{slug}/ ディレクトリから一括で下書き投稿を行う。"""
+        return self._run(self.aclient.publish_draft_from_dir(draft_dir, require_built=require_built))
 
 
 # ──────────────────────────────────────────────
@@ -1080,26 +250,119 @@ def main():
   python lib/wp_client.py --action check
   python lib/wp_client.py --action publish --draft-dir drafts/2026-02-22_test/
   python lib/wp_client.py --action update --post-id 763 --draft-dir drafts/2026-02-23_claude/
+
+  # sites.json に登録した複数サイトへ、複数の下書きを並行投稿
+  python lib/wp_client.py --action publish --site totsu second-blog \\
+      --draft-dir drafts/2026-02-22_test/ drafts/2026-02-23_claude/
+  python lib/wp_client.py --action check --site all
+
+  # DRAFTS_DIR 以下の下書きを一括投稿（グロブ指定可、同時3件）
+  python lib/wp_client.py --action publish-all --draft-dir "2026-03-*" --workers 3
+  # meta.json に post_id がある下書きを一括更新
+  python lib/wp_client.py --action update-all
+
+  # 通信せずに下書きをバンドルへビルド（4プロセス）し、後で投稿だけを行う
+  python lib/wp_client.py --action build --draft-dir "2026-03-*" --workers 4
+  python lib/wp_client.py --action push --draft-dir drafts/2026-03-01_test/
+
+  # DRAFTS_DIR を監視し、保存された下書きの記事をその都度更新する
+  python lib/wp_client.py --action watch
+  # 複数サイトの記事（meta.json の post_ids）をまとめて監視・更新する
+  python lib/wp_client.py --action watch --site totsu second-blog
         """,
     )
     parser.add_argument(
         "--action",
         required=True,
-        choices=["check", "publish", "update"],
-        help="実行するアクション（check: 接続テスト, publish: 下書き投稿, update: 既存記事更新）",
+        choices=["check", "publish", "update", *BULK_ACTIONS, "build", "push", "watch"],
+        help="実行するアクション（check: 接続テスト, publish: 下書き投稿, update: 既存記事更新, "
+             "publish-all / update-all: 複数の下書きを一括処理, "
+             "build: 通信せずに下書きをバンドルへ変換, push: ビルド済みのバンドルを投稿, "
+             "watch: 下書きの変更を監視して記事を更新し続ける）",
     )
     parser.add_argument(
         "--draft-dir",
-        help="下書きディレクトリのパス（publish/update時に必須）",
+        nargs="+",
+        help="下書きディレクトリのパス（publish/push/update時に必須。publish/push は複数指定可）。"
+             "publish-all / update-all / build では DRAFTS_DIR からのグロブも可（省略時は全下書き）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help=f"publish-all / update-all で同時に処理する下書き数（既定: {DEFAULT_BULK_WORKERS}）。"
+             "--site 指定時はサイトごとの同時処理数（既定: sites.json の max_concurrent_posts）。"
+             "build ではプロセス数（既定: CPU数）",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"watch で連続した変更をまとめる待ち時間（秒、既定: {DEFAULT_DEBOUNCE:g}）",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="watch で watchdog を使わず、ファイルの更新時刻のポーリングで監視する",
+    )
+    parser.add_argument(
+        "--site",
+        nargs="+",
+        help="sites.json に登録したサイト名（複数指定可、all で全サイト）。"
+             "省略時は .env の WP_URL のサイト",
     )
     parser.add_argument(
         "--post-id",
         type=int,
         help="更新対象の記事ID（update時に必須）",
     )
+    parser.add_argument(
+        "--upload-workers",
+        type=int,
+        help="メディアの同時アップロード数（省略時は .env の WP_UPLOAD_WORKERS、既定: 4。"
+             "--site 指定時は sites.json の upload_workers）",
+    )
+    parser.add_argument(
+        "--no-media-index",
+        action="store_true",
+        help="メディア索引（同一内容の画像の再利用）を使わず、常にアップロードする",
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="GETレスポンスのキャッシュ（ETagによる条件付きリクエスト）を使わない",
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="下書きディレクトリの投稿ジャーナル（.publish_journal.json）を使わず、"
+             "途中から再開せずに最初から処理する",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        help="終了時にリクエストの計測結果（全件の記録と集計）をJSONで書き出すパス",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        help="終了時に計測結果を Prometheus の textfile 形式で書き出すパス",
+    )
 
     args = parser.parse_args()
 
+    if args.action == "build":
+        # 通信しないので WordPress の設定は不要
+        report = build_drafts(_find_bulk_drafts(args), workers=args.workers)
+        print_build_report(report)
+        sys.exit(0 if all(r["ok"] for r in report["results"]) else 1)
+
+    if args.site:
+        try:
+            ok = asyncio.run(_run_sites(args))
+        except KeyboardInterrupt:
+            # watch は Ctrl+C で終了する
+            print("\n監視を終了しました")
+            ok = True
+        sys.exit(0 if ok else 1)
+
     # 設定のバリデーション
     errors = validate_wp_config()
     if errors:
@@ -1108,8 +371,220 @@ def main():
             print(f"  - {err}")
         sys.exit(1)
 
-    client = WordPressClient()
+    with WordPressClient(
+        upload_workers=args.upload_workers,
+        use_media_index=not args.no_media_index,
+        use_http_cache=not args.no_http_cache,
+        use_journal=not args.no_journal,
+    ) as client:
+        try:
+            _run_action(args, client)
+        finally:
+            _export_metrics(args, client)
+
+
+def _export_metrics(args, client, site_name: str = None) -> None:
+    """
+    --metrics-json / --metrics-prom が指定されていれば計測結果を書き出す。
+
+    site_name を指定すると、ファイル名に「.サイト名」を付けてサイトごとに書き出す。
+    """
+    if not (args.metrics_json or args.metrics_prom):
+        return
+
+    def site_path(path: str) -> str:
+        if site_name is None:
+            return path
+        p = Path(path)
+        return str(p.with_name(f"{p.stem}.{site_name}{p.suffix}"))
+
+    if site_name is not None:
+        print(f"\n[{site_name}]", end="")
+    client.metrics.print_summary()
+    if args.metrics_json:
+        client.metrics.write_json(site_path(args.metrics_json))
+        print(f"計測結果(JSON): {site_path(args.metrics_json)}")
+    if args.metrics_prom:
+        client.metrics.write_prometheus(site_path(args.metrics_prom))
+        print(f"計測結果(Prometheus): {site_path(args.metrics_prom)}")
+
+
+def _client_pool(args, sites) -> ClientPool:
+    """
+    --site 用の ClientPool を作る。
+
+    --upload-workers / --workers が指定されていれば、sites.json の
+    upload_workers / max_concurrent_posts より優先して全サイトに適用する。
+    """
+    return ClientPool(
+        sites,
+        upload_workers=args.upload_workers,
+        max_concurrent_posts=args.workers,
+        use_media_index=not args.no_media_index,
+        use_http_cache=not args.no_http_cache,
+        use_journal=not args.no_journal,
+    )
+
+
+async def _run_sites_bulk(args, sites) -> bool:
+    """
+    publish-all / update-all をサイトごとに並行実行する。
+
+    各サイトでは max_concurrent_posts 件（--workers で上書き）ずつ下書きを処理する。
+    update-all の記事IDは meta.json の post_ids[サイト名]（なければ post_id）を使う。
+    """
+    draft_paths = _find_bulk_drafts(args)
+
+    async with _client_pool(args, sites) as pool:
+        reports = await asyncio.gather(*(
+            run_bulk(
+                pool.client(site.name), args.action, draft_paths,
+                workers=pool.max_concurrent_posts(site.name), site_name=site.name,
+            )
+            for site in sites
+        ))
+        for site, report in zip(sites, reports):
+            print_bulk_report(report, title=f"一括処理の結果: {site.name}")
+        for name, client in pool.clients().items():
+            _export_metrics(args, client, site_name=name)
+
+    return all(r["ok"] for report in reports for r in report["results"])
+
+
+async def _run_sites_watch(args, sites) -> None:
+    """
+    watch をサイトごとに並行実行する（キャンセルされるまで戻らない）。
+
+    各サイトの DraftWatcher は記事IDを meta.json の post_ids[サイト名]
+    （なければ post_id）から引き、そのサイトのクライアントで更新する。
+    """
+    async with _client_pool(args, sites) as pool:
+        try:
+            await asyncio.gather(*(
+                DraftWatcher(
+                    pool.client(site.name), debounce=args.debounce,
+                    use_watchdog=not args.poll, site_name=site.name,
+                ).run()
+                for site in sites
+            ))
+        finally:
+            for name, client in pool.clients().items():
+                _export_metrics(args, client, site_name=name)
+
+
+def _find_bulk_drafts(args) -> list[Path]:
+    """publish-all / update-all / build の対象の下書きを探す。見つからなければエラー終了する。"""
+    draft_paths = find_draft_dirs(args.draft_dir or ["*"])
+    if not draft_paths:
+        print(f"[エラー] 下書きディレクトリが見つかりません: "
+              f"{' '.join(args.draft_dir or ['*'])}（基準: {DRAFTS_DIR}）")
+        sys.exit(1)
+    print(f"対象の下書き: {len(draft_paths)}件")
+    return draft_paths
+
+
+def _resolve_draft_dir(draft_dir: str) -> Path:
+    """
+    下書きディレクトリのパスを解決する。見つからなければエラー終了する。
+
+    相対パスはカレントディレクトリ、次に DRAFTS_DIR からの相対パスとして探す。
+    """
+    draft_path = Path(draft_dir)
+    if not draft_path.is_absolute():
+        if not draft_path.is_dir():
+            draft_path = DRAFTS_DIR / draft_dir
+        if not draft_path.is_dir():
+            print(f"[エラー] 下書きディレクトリが見つかりません: {draft_dir}")
+            sys.exit(1)
+    return draft_path
+
+
+async def _run_sites(args) -> bool:
+    """
+    --site で指定した複数サイトに対してアクションを並行実行する。
+
+    サイトごとに1つのクライアントを ClientPool で共有し、各サイトの同時処理数は
+    sites.json の max_concurrent_posts（--workers で上書き）で制限する。あるサイトの失敗は
+    他のサイトの処理に影響しない。
+
+    Returns:
+        bool: すべて成功すれば True
+    """
+    try:
+        sites = select_sites(load_sites(), args.site)
+    except SiteConfigError as e:
+        print(f"[エラー] {e}")
+        return False
+
+    errors = [err for site in sites for err in site.validate()]
+    if errors:
+        print("[エラー] WordPress設定に問題があります:")
+        for err in errors:
+            print(f"  - {err}")
+        return False
+
+    if args.action in ("publish", "push", "update") and not args.draft_dir:
+        print("[エラー] --draft-dir を指定してください")
+        return False
+    if args.action in BULK_ACTIONS:
+        return await _run_sites_bulk(args, sites)
+    if args.action == "watch":
+        await _run_sites_watch(args, sites)
+        return True
+    if args.action == "update":
+        if not args.post_id:
+            print("[エラー] --post-id を指定してください")
+            return False
+        if len(sites) != 1 or len(args.draft_dir) != 1:
+            print("[エラー] update はサイトと下書きディレクトリを1つずつ指定してください")
+            return False
+    draft_paths = [_resolve_draft_dir(d) for d in args.draft_dir or []]
+
+    async def check(client: AsyncWordPressClient) -> dict:
+        if not await client.check_connection():
+            raise WordPressClientError(f"REST APIに接続できません: {client.site_url}")
+        return await client.check_authentication()
 
+    if args.action == "check":
+        jobs = [(site.name, check) for site in sites]
+        labels = [site.name for site in sites]
+    elif args.action in ("publish", "push"):
+        require_built = args.action == "push"
+        jobs = [
+            (site.name,
+             lambda c, d=str(d): c.publish_draft_from_dir(d, require_built=require_built))
+            for site in sites for d in draft_paths
+        ]
+        labels = [f"{site.name} {d.name}" for site in sites for d in draft_paths]
+    else:
+        jobs = [(
+            sites[0].name,
+            lambda c: c.update_post_from_dir(args.post_id, str(draft_paths[0])),
+        )]
+        labels = [f"{sites[0].name} {draft_paths[0].name}"]
+
+    async with _client_pool(args, sites) as pool:
+        results = await pool.run_all(jobs)
+
+        print("\n" + "=" * 60)
+        print("サイト別の結果")
+        print("=" * 60)
+        for label, result in zip(labels, results):
+            if isinstance(result, BaseException):
+                print(f"  [NG] {label}: {result}")
+            elif args.action == "check":
+                print(f"  [OK] {label}: {result['name']}")
+            else:
+                print(f"  [OK] {label}: {result['edit_url']}")
+
+        for name, client in pool.clients().items():
+            _export_metrics(args, client, site_name=name)
+
+    return not any(isinstance(r, BaseException) for r in results)
+
+
+def _run_action(args, client: "WordPressClient") -> None:
+    """CLIのアクションを1つ実行する。"""
     if args.action == "check":
         # 接続・認証テスト
         print("=" * 60)
@@ -1129,29 +604,22 @@ def main():
 
         print("\n全テスト合格!")
 
-    elif args.action == "publish":
-        # 下書き投稿
+    elif args.action in ("publish", "push"):
+        # 下書き投稿（push はビルド済みのバンドルのみ）
         if not args.draft_dir:
             print("[エラー] --draft-dir を指定してください")
             sys.exit(1)
 
-        draft_path = Path(args.draft_dir)
-        # 相対パスの場合、DRAFTS_DIRからの相対パスとして解決
-        if not draft_path.is_absolute():
-            # まずカレントディレクトリからの相対パスを試す
-            if not draft_path.is_dir():
-                draft_path = DRAFTS_DIR / args.draft_dir
-            if not draft_path.is_dir():
-                print(f"[エラー] 下書きディレクトリが見つかりません: {args.draft_dir}")
+        for draft_path in [_resolve_draft_dir(d) for d in args.draft_dir]:
+            try:
+                result = client.publish_draft_from_dir(
+                    str(draft_path), require_built=args.action == "push",
+                )
+                print(f"\n投稿成功! 編集URL: {result['edit_url']}")
+            except (WordPressClientError, FileNotFoundError, BundleError) as e:
+                print(f"\n[エラー] 投稿に失敗しました: {e}")
                 sys.exit(1)
 
-        try:
-            result = client.publish_draft_from_dir(str(draft_path))
-            print(f"\n投稿成功! 編集URL: {result['edit_url']}")
-        except (WordPressClientError, FileNotFoundError) as e:
-            print(f"\n[エラー] 投稿に失敗しました: {e}")
-            sys.exit(1)
-
     elif args.action == "update":
         # 既存記事の更新
         if not args.post_id:
@@ -1161,13 +629,10 @@ def main():
             print("[エラー] --draft-dir を指定してください")
             sys.exit(1)
 
-        draft_path = Path(args.draft_dir)
-        if not draft_path.is_absolute():
-            if not draft_path.is_dir():
-                draft_path = DRAFTS_DIR / args.draft_dir
-            if not draft_path.is_dir():
-                print(f"[エラー] 下書きディレクトリが見つかりません: {args.draft_dir}")
-                sys.exit(1)
+        if len(args.draft_dir) != 1:
+            print("[エラー] update では --draft-dir を1つだけ指定してください")
+            sys.exit(1)
+        draft_path = _resolve_draft_dir(args.draft_dir[0])
 
         try:
             result = client.update_post_from_dir(args.post_id, str(draft_path))
@@ -1176,6 +641,28 @@ def main():
             print(f"\n[エラー] 更新に失敗しました: {e}")
             sys.exit(1)
 
+    elif args.action == "watch":
+        # 1つのクライアントを使い回し、変更のあった下書きだけを更新し続ける
+        watcher = DraftWatcher(client.aclient, debounce=args.debounce, use_watchdog=not args.poll)
+        task = client._loop.create_task(watcher.run())
+        try:
+            client._run(task)
+        except KeyboardInterrupt:
+            task.cancel()
+            client._run(asyncio.gather(task, return_exceptions=True))
+            print("\n監視を終了しました")
+
+    elif args.action in BULK_ACTIONS:
+        # 複数の下書きを1つのセッションで一括処理
+        draft_paths = _find_bulk_drafts(args)
+        report = client._run(run_bulk(
+            client.aclient, args.action, draft_paths,
+            workers=args.workers or DEFAULT_BULK_WORKERS,
+        ))
+        print_bulk_report(report)
+        if not all(r["ok"] for r in report["results"]):
+            sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
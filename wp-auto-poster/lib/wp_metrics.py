@@ -0,0 +1,256 @@
+"""
+WordPress REST API リクエストの計測
+
+AsyncWordPressClient が送ったリクエストを1件ずつ記録し、
+「メソッド + エンドポイントのテンプレート」（例: POST /media/{id}）ごとに
+件数・ステータス・レイテンシのヒストグラム・送受信バイト数・リトライ回数を集計する。
+
+集計結果は実行の最後に JSON と Prometheus の textfile 形式
+（node_exporter の textfile collector で読み込める形式）で書き出せる。
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+# レイテンシのヒストグラムの上限値（秒）。最後に +Inf が付く
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ID_SEGMENT_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    エンドポイントのID部分とクエリを取り除き、集計用のテンプレートにする。
+
+    例: /posts/123?_fields=id → /posts/{id}
+    """
+    return _ID_SEGMENT_RE.sub("/{id}", endpoint.split("?", 1)[0]) or "/"
+
+
+class Histogram:
+    """累積バケット方式のヒストグラム（Prometheus の histogram と同じ形）"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """値を1つ記録する。"""
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+
+    def quantile(self, q: float) -> float:
+        """バケットから分位点を概算する（該当バケットの上限値を返す）。"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        for upper, cumulative in zip(self.buckets, self.counts):
+            if cumulative >= rank:
+                return upper
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": {str(upper): n for upper, n in zip(self.buckets, self.counts)},
+        }
+
+
+class RequestMetrics:
+    """
+    リクエストの記録と集計。
+
+    使用例:
+        metrics = RequestMetrics()
+        metrics.record("POST", "/media", 201, 1.23, sent=204800, received=512)
+        metrics.write_json("metrics.json")
+        metrics.write_prometheus("/var/lib/node_exporter/wp_auto_poster.prom")
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        # 1リクエスト1件の生の記録
+        self.records: list[dict] = []
+        # (メソッド, テンプレート) → 集計値
+        self._series: dict[tuple[str, str], dict] = {}
+        # max-age の期限内で、通信せずにキャッシュから返した件数（テンプレートごと）
+        self.cache_hits: dict[str, int] = {}
+
+    def record(self, method: str, endpoint: str, status: int, latency: float,
+               sent: int = 0, received: int = 0, retries: int = 0) -> None:
+        """
+        リクエストを1件記録する。
+
+        Args:
+            method: HTTPメソッド
+            endpoint: エンドポイントパス（テンプレート化して集計する）
+            status: 最終的なHTTPステータス（通信エラーで終わった場合は 0）
+            latency: リトライの待機を含む、最初の送信から完了までの秒数
+            sent: 送信したボディのバイト数
+            received: 受信したボディのバイト数
+            retries: 再試行した回数
+        """
+        method = method.upper()
+        template = endpoint_template(endpoint)
+        self.records.append({
+            "time": round(time.time(), 3),
+            "method": method,
+            "endpoint": template,
+            "status": status,
+            "latency": round(latency, 6),
+            "sent": sent,
+            "received": received,
+            "retries": retries,
+        })
+
+        series = self._series.get((method, template))
+        if series is None:
+            series = self._series[(method, template)] = {
+                "statuses": {},
+                "latency": Histogram(),
+                "sent": 0,
+                "received": 0,
+                "retries": 0,
+            }
+        series["statuses"][status] = series["statuses"].get(status, 0) + 1
+        series["latency"].observe(latency)
+        series["sent"] += sent
+        series["received"] += received
+        series["retries"] += retries
+
+    def record_cache_hit(self, endpoint: str) -> None:
+        """通信せずにキャッシュから返したリクエストを記録する。"""
+        template = endpoint_template(endpoint)
+        self.cache_hits[template] = self.cache_hits.get(template, 0) + 1
+
+    def summary(self) -> dict:
+        """集計結果を辞書で返す（キーは "メソッド テンプレート"）。"""
+        return {
+            f"{method} {template}": {
+                "count": series["latency"].count,
+                "statuses": {str(k): v for k, v in sorted(series["statuses"].items())},
+                "latency": series["latency"].to_dict(),
+                "sent_bytes": series["sent"],
+                "received_bytes": series["received"],
+                "retries": series["retries"],
+            }
+            for (method, template), series in sorted(self._series.items())
+        }
+
+    def print_summary(self) -> None:
+        """エンドポイントごとの所要時間を合計の大きい順に表示する。"""
+        if not self._series:
+            return
+        total = sum(s["latency"].sum for s in self._series.values())
+        print("\nリクエスト計測:")
+        # 全角文字は幅がずれるため、見出しは半角で揃える
+        print(f"  {'endpoint':<32} {'count':>5} {'total_s':>8} {'p50':>6} "
+              f"{'p95':>6} {'sent_KB':>9} {'recv_KB':>9} {'retry':>6}")
+        ordered = sorted(self._series.items(), key=lambda kv: -kv[1]["latency"].sum)
+        for (method, template), series in ordered:
+            hist = series["latency"]
+            print(f"  {method + ' ' + template:<32} {hist.count:>5} {hist.sum:>8.2f} "
+                  f"{hist.quantile(0.5):>6g} {hist.quantile(0.95):>6g} "
+                  f"{series['sent'] / 1024:>9.1f} {series['received'] / 1024:>9.1f} "
+                  f"{series['retries']:>6}")
+        print(f"  合計: {len(self.records)}件 / {total:.2f}秒"
+              + (f" / キャッシュヒット {sum(self.cache_hits.values())}件"
+                 if self.cache_hits else ""))
+
+    def write_json(self, path: str) -> None:
+        """記録と集計を JSON で書き出す。"""
+        data = {
+            "started_at": round(self.started_at, 3),
+            "finished_at": round(time.time(), 3),
+            "summary": self.summary(),
+            "cache_hits": self.cache_hits,
+            "requests": self.records,
+        }
+        _write_atomic(Path(path), json.dumps(data, ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        """集計を Prometheus の textfile 形式で書き出す。"""
+        lines = [
+            "# HELP wp_requests_total WordPress REST API requests by final status.",
+            "# TYPE wp_requests_total counter",
+        ]
+        for (method, template), series in sorted(self._series.items()):
+            for status, n in sorted(series["statuses"].items()):
+                lines.append(
+                    f"wp_requests_total{_labels(method, template, status=status)} {n}"
+                )
+
+        lines += [
+            "# HELP wp_request_duration_seconds WordPress REST API request latency including retries.",
+            "# TYPE wp_request_duration_seconds histogram",
+        ]
+        for (method, template), series in sorted(self._series.items()):
+            hist = series["latency"]
+            for upper, n in zip(hist.buckets, hist.counts):
+                lines.append(
+                    f"wp_request_duration_seconds_bucket"
+                    f"{_labels(method, template, le=upper)} {n}"
+                )
+            lines.append(
+                f"wp_request_duration_seconds_bucket"
+                f"{_labels(method, template, le='+Inf')} {hist.count}"
+            )
+            lines.append(f"wp_request_duration_seconds_sum{_labels(method, template)} {hist.sum:.6f}")
+            lines.append(f"wp_request_duration_seconds_count{_labels(method, template)} {hist.count}")
+
+        lines += [
+            "# HELP wp_request_bytes_total WordPress REST API body bytes sent and received.",
+            "# TYPE wp_request_bytes_total counter",
+        ]
+        for (method, template), series in sorted(self._series.items()):
+            lines.append(
+                f"wp_request_bytes_total{_labels(method, template, direction='sent')} {series['sent']}"
+            )
+            lines.append(
+                f"wp_request_bytes_total{_labels(method, template, direction='received')} "
+                f"{series['received']}"
+            )
+
+        lines += [
+            "# HELP wp_request_retries_total WordPress REST API retry attempts.",
+            "# TYPE wp_request_retries_total counter",
+        ]
+        for (method, template), series in sorted(self._series.items()):
+            lines.append(f"wp_request_retries_total{_labels(method, template)} {series['retries']}")
+
+        lines += [
+            "# HELP wp_cache_hits_total GET requests answered from the local cache without a round trip.",
+            "# TYPE wp_cache_hits_total counter",
+        ]
+        for template, n in sorted(self.cache_hits.items()):
+            lines.append(f"wp_cache_hits_total{_labels('GET', template)} {n}")
+
+        _write_atomic(Path(path), "\n".join(lines) + "\n")
+
+
+def _labels(method: str, template: str, **extra) -> str:
+    """Prometheus のラベル文字列を作る。"""
+    pairs = {"method": method, "endpoint": template, **extra}
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + "}"
+
+
+def _escape(value) -> str:
+    """ラベル値の \\ と " と改行をエスケープする。"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """一時ファイル経由で書き出す（textfile collector が書きかけを読まないように）。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
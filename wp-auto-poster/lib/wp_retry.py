@@ -0,0 +1,148 @@
+"""
+WordPress REST API リクエストのリトライ制御
+
+共有ホスティングで起きがちな一時的障害（接続失敗・タイムアウト・429・5xx）に対し、
+リクエストの種類ごとのポリシーに従って、ジッター付き指数バックオフで再試行する。
+
+リクエストの種類:
+    read   : GET / HEAD / OPTIONS
+    update : 既存リソースへの POST / PUT / PATCH / DELETE（例: POST /posts/123）
+             同じ内容を何度送っても結果は変わらないため、通常どおり再試行する。
+    create : コレクションへの POST（例: POST /media, POST /posts, POST /tags）
+             再送すると重複作成になり得るため、サーバーが処理していないことが
+             確実な場合（送信前の接続失敗・429・503）に限って再試行する。
+"""
+
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+# 一時的な障害とみなすHTTPステータス
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+
+# サーバーがリクエストを処理せずに拒否したことを示すステータス
+# （レート制限・過負荷。WordPress本体は実行されていない）
+REJECTED_STATUSES = (429, 503)
+
+# リクエスト送信前に失敗したことが確実な例外（サーバーには何も届いていない）
+PRE_SEND_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class RetryPolicy:
+    """
+    1種類のリクエストに適用するリトライ方針。
+
+    Attributes:
+        max_attempts: 最大試行回数（初回を含む）
+        base_delay: バックオフの基準秒数（2回目は最大 base、3回目は最大 base×2 ...）
+        max_delay: 1回あたりの待機秒数の上限
+        deadline: 初回送信からの合計時間の上限（秒）。超える待機は行わない
+        retry_statuses: 再試行するHTTPステータス
+        retry_after_send: 送信後に起きた通信エラー（読み取りタイムアウト等）も再試行するか
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 30.0, deadline: float = 120.0,
+                 retry_statuses: tuple = TRANSIENT_STATUSES,
+                 retry_after_send: bool = True):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = retry_statuses
+        self.retry_after_send = retry_after_send
+
+    def can_retry_error(self, error: Exception) -> bool:
+        """通信エラーが再試行可能かどうかを返す。"""
+        if isinstance(error, PRE_SEND_ERRORS):
+            return True
+        return self.retry_after_send and isinstance(error, httpx.TransportError)
+
+    def can_retry_status(self, status_code: int) -> bool:
+        """HTTPステータスが再試行可能かどうかを返す。"""
+        return status_code in self.retry_statuses
+
+    def next_delay(self, attempt: int, elapsed: float,
+                   retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        次の試行までの待機秒数を返す。再試行しない場合は None。
+
+        Args:
+            attempt: 完了した試行回数（1 始まり）
+            elapsed: 初回送信からの経過秒数
+            retry_after: サーバーが Retry-After で指定した秒数
+
+        Returns:
+            float: 待機秒数。試行回数か deadline を超える場合は None
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        # フルジッター: 0〜(base × 2^(attempt-1)) の一様乱数
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            # サーバーの指示より早く再送しても断られるだけなので、指示を優先する
+            delay = max(delay, retry_after)
+
+        if elapsed + delay > self.deadline:
+            return None
+        return delay
+
+
+# デフォルトのポリシー（AsyncWordPressClient の retry_policies で上書き可能）
+DEFAULT_RETRY_POLICIES = {
+    "read": RetryPolicy(),
+    "update": RetryPolicy(),
+    "create": RetryPolicy(retry_statuses=REJECTED_STATUSES, retry_after_send=False),
+}
+
+
+def classify_request(method: str, endpoint: str) -> str:
+    """
+    リクエストを read / update / create のいずれかに分類する。
+
+    Args:
+        method: HTTPメソッド
+        endpoint: エンドポイントパス（例: /posts, /posts/123）
+
+    Returns:
+        str: "read" / "update" / "create"
+    """
+    method = method.upper()
+    if method in ("GET", "HEAD", "OPTIONS"):
+        return "read"
+    if method == "POST":
+        last_segment = endpoint.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+        if not last_segment.isdigit():
+            return "create"
+    return "update"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After ヘッダーの値を秒数に変換する。
+
+    秒数形式（"120"）とHTTP日付形式（"Wed, 21 Oct 2026 07:28:00 GMT"）の両方に対応する。
+
+    Args:
+        value: ヘッダーの値（なければ None）
+
+    Returns:
+        float: 待機秒数。解釈できない場合は None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -60,16 +60,20 @@ def paragraph_block(text: str) -> str:
 
 
 def image_block(url: str, alt: str = "", caption: str = "",
-                media_id: int = None, width: int = None) -> str:
+                media_id: int = None, width: int = None, height: int = None) -> str:
     """
     画像ブロックを生成する（WordPress標準画像ブロック形式）。
 
+    width と height はブロック属性と <img> に入り、読み込み中のレイアウトのずれ（CLS）を防ぐ。
+    srcset・loading などは WordPress が表示時に付けるため、ここでは出力しない。
+
     Args:
         url: 画像のURL
         alt: 代替テキスト
         caption: キャプション
         media_id: WordPressメディアID
-        width: 画像の表示幅（ピクセル）
+        width: 画像の幅（ピクセル）
+        height: 画像の高さ（ピクセル）
 
     Returns:
         str: Gutenberg画像ブロックHTML
@@ -80,6 +84,9 @@ def image_block(url: str, alt: str = "", caption: str = "",
         block_attrs["id"] = media_id
     if width:
         block_attrs["width"] = width
+    if height:
+        block_attrs["height"] = height
+    block_attrs["sizeSlug"] = "large"
 
     attrs_str = f" {json.dumps(block_attrs)}" if block_attrs else ""
 
@@ -89,8 +96,10 @@ def image_block(url: str, alt: str = "", caption: str = "",
         img_classes.append(f"wp-image-{media_id}")
     class_attr = f' class="{" ".join(img_classes)}"' if img_classes else ""
 
-    width_attr = f' width="{width}"' if width else ""
-    img_tag = f'<img src="{escape(url)}" alt="{escape(alt)}"{class_attr}{width_attr}/>'
+    size_attrs = f' width="{width}"' if width else ""
+    if height:
+        size_attrs += f' height="{height}"'
+    img_tag = f'<img src="{escape(url)}" alt="{escape(alt)}"{class_attr}{size_attrs}/>'
 
     # <figure> タグ
     figure_class = "wp-block-image size-large"
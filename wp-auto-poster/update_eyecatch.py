@@ -41,21 +41,9 @@ except Exception as e:
 # 投稿のアイキャッチを更新
 print(f"\n2. 投稿ID {post_id} のアイキャッチを更新中...")
 try:
-    # update_post呼び出し時に featured_media_id のみを更新
-    # 本文は変更しないために、実際には変更を反映させない工夫が必要
-    # wp_client.py の update_post は content を必須にしているため、
-    # 実際には POST /posts/{id} に featured_media_id のみを送信する必要がある
-    
-    # 直接 _request を使ってAPIを呼び出し
-    import json as json_module
-    resp = client._request(
-        "POST",
-        f"/posts/{post_id}",
-        json={"featured_media": media_id}
-    )
-    post = resp.json()
-    
-    edit_url = f"{client.site_url}/wp-admin/post.php?post={post_id}&action=edit"
+    # 変更のあるフィールド（featured_media）だけが送られ、本文は送り直さない
+    post_result = client.update_post(post_id, featured_media_id=media_id)
+    edit_url = post_result["url"]
     print(f"[OK] 更新完了")
     print(f"     編集URL: {edit_url}")
 except Exception as e: